@@ -1,23 +1,117 @@
 import heapq
+import itertools
 import random
+import threading
 import time
-from typing import List, Tuple, Optional, Set
-from snake_game import SnakeGame, Direction
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Optional, Set
+from game_engine import SnakeEngine, Direction, neighbor_table
 from config import game_config
+from ai_search import LookaheadSearch
+from ai_rollout import encode_state, evaluate_moves
+
+# 坐标增量 -> 方向
+DIRECTION_BY_DELTA = {direction.value: direction for direction in Direction}
+
+# 哈密顿策略走捷径时，为蛇尾保留的最少回路格子数
+HAMILTONIAN_BUFFER = 3
+
+@lru_cache(maxsize=8)
+def hamiltonian_cycle(width: int, height: int) -> Optional[Tuple[int, ...]]:
+    """
+    为网格构造一条哈密顿回路（按网格尺寸缓存）
+    
+    在偶数行的方向上蛇形来回扫过第1列及之后的格子，再沿第0列回到起点。
+    网格宽高都为奇数时不存在哈密顿回路。
+    
+    Args:
+        width: 网格宽度
+        height: 网格高度
+        
+    Returns:
+        以格子编号（y * width + x）为下标的回路序号，无解时返回None
+    """
+    if width < 2 or height < 2 or (width * height) % 2:
+        return None
+    
+    # 行数需要为偶数，高度为奇数时转置构造
+    transpose = height % 2 == 1
+    rows, cols = (width, height) if transpose else (height, width)
+    
+    path = []
+    for row in range(rows):
+        columns = range(1, cols) if row % 2 == 0 else range(cols - 1, 0, -1)
+        path.extend((col, row) for col in columns)
+    path.extend((0, row) for row in range(rows - 1, -1, -1))
+    
+    order = [0] * (width * height)
+    for index, (col, row) in enumerate(path):
+        x, y = (row, col) if transpose else (col, row)
+        order[y * width + x] = index
+    return tuple(order)
 
 class AIController:
-    def __init__(self, game: SnakeGame):
+    def __init__(self, game: SnakeEngine, watch_config: bool = True):
         """
         AI控制器初始化
 
         Args:
-            game: 贪吃蛇游戏实例
+            game: 贪吃蛇游戏实例（无界面的SnakeEngine，或包装它的SnakeGame）
+            watch_config: 是否订阅配置热重载（后台规划的工作线程AI由包装类转发变化）
         """
         self.game = game
         self.algorithm = game_config.get("ai.algorithm", "astar")
         self.difficulty = game_config.get("ai.difficulty", "normal")
         self.think_time = game_config.get("ai.think_time", 0.0)
         self.last_think_time = 0
+        
+        # 底层引擎（传入SnakeGame时取其包装的引擎）
+        self.engine = getattr(game, 'engine', game)
+        
+        # 可达空间计算的预分配缓冲区
+        cell_count = game.grid_width * game.grid_height
+        self._visit_mark = array('I', [0]) * cell_count
+        self._labels = array('i', [0]) * cell_count
+        self._bfs_queue = array('i', [0]) * cell_count
+        self._bfs_distance = array('i', [0]) * cell_count
+        self._generation = 0
+        self._area_cache_key = None
+        self._area_cache = {}
+        
+        # A*路径缓存：剩余路径（格子编号）、对应的食物、上次决策时的状态版本号
+        self._plan = deque()
+        self._plan_food = None
+        self._plan_version = -1
+        self._plan_safe = False
+        self.plan_cache_hits = 0
+        self.plan_cache_misses = 0
+        
+        # 上次吃到食物时的得分和步数，用于发现追蛇尾绕圈
+        self._meal_score = 0
+        self._meal_move = 0
+        
+        # 前瞻搜索器（第一次使用lookahead策略时创建）
+        self._lookahead = None
+        
+        # 配置热重载：切换策略等无需重启
+        if watch_config:
+            game_config.subscribe("ai", self.on_config_changed)
+    
+    def on_config_changed(self, changes: Dict[str, object]):
+        """响应AI配置的变化（策略、难度、思考延迟、前瞻搜索参数）"""
+        if "ai.algorithm" in changes:
+            self.algorithm = game_config.get("ai.algorithm", "astar")
+            self._plan.clear()
+        if "ai.difficulty" in changes:
+            self.difficulty = game_config.get("ai.difficulty", "normal")
+        if "ai.think_time" in changes:
+            self.think_time = game_config.get("ai.think_time", 0.0)
+        if "ai.lookahead_table_size" in changes:
+            # 置换表容量变化时重建搜索器
+            self._lookahead = None
     
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         """计算曼哈顿距离"""
@@ -34,49 +128,159 @@ class AIController:
             obstacles: 障碍物位置集合
             
         Returns:
-            路径列表，如果无法到达则返回None
+            路径列表（包含起点和终点），如果无法到达则返回None
         """
         if start == goal:
             return [start]
         
-        # 优先队列：(f_score, g_score, position, path)
-        open_set = [(0, 0, start, [start])]
-        closed_set = set()
+        width = self.game.grid_width
+        blocked = bytearray(width * self.game.grid_height)
+        for x, y in obstacles:
+            if 0 <= x < width and 0 <= y < self.game.grid_height:
+                blocked[y * width + x] = 1
+        
+        cells = self.a_star_cells(start[1] * width + start[0], goal[1] * width + goal[0], blocked)
+        if cells is None:
+            return None
+        return [(cell % width, cell // width) for cell in cells]
+    
+    def a_star_cells(self, start: int, goal: int, blocked: bytearray,
+                     heuristic: Optional[array] = None) -> Optional[List[int]]:
+        """
+        基于扁平格子编号（y * grid_width + x）的A*寻路
+        
+        不在堆中复制路径：用came_from数组记录父节点，best_g数组记录
+        每个格子的最优代价，重复入堆的劣解直接跳过。堆元素是把
+        (f, g, cell) 打包成的单个整数。
         
-        while open_set:
-            _, g_score, current, path = heapq.heappop(open_set)
+        Args:
+            start: 起始格子编号
+            goal: 目标格子编号
+            blocked: 障碍物表（非0表示不可通行）
+            heuristic: 到goal的距离下界表（如食物距离场），值为格子总数的
+                格子视为到不了、直接剪掉；为None时使用曼哈顿距离
             
-            if current in closed_set:
+        Returns:
+            格子编号路径（包含起点和终点），如果无法到达则返回None
+        """
+        if start == goal:
+            return [start]
+        
+        width = self.game.grid_width
+        cell_count = width * self.game.grid_height
+        neighbors = neighbor_table(width, self.game.grid_height)
+        goal_x, goal_y = goal % width, goal // width
+        if heuristic is not None and all(blocked[neighbor] or heuristic[neighbor] >= cell_count
+                                         for neighbor in neighbors[start]):
+            # 距离场里起点周围都到不了目标，不用分配搜索数组
+            return None
+        
+        came_from = array('i', [-1]) * cell_count
+        best_g = array('i', [cell_count]) * cell_count
+        closed = bytearray(cell_count)
+        best_g[start] = 0
+        
+        # 堆键：(f * cell_count + g) * cell_count + cell，排序等价于 (f, g, cell)
+        open_heap = [start]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        
+        while open_heap:
+            key = heappop(open_heap)
+            current = key % cell_count
+            if closed[current]:
                 continue
-                
-            closed_set.add(current)
+            closed[current] = 1
             
             if current == goal:
+                path = [goal]
+                while current != start:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
                 return path
             
-            # 检查四个方向
-            for direction in Direction:
-                dx, dy = direction.value
-                next_pos = (current[0] + dx, current[1] + dy)
-                
-                # 检查边界
-                if (next_pos[0] < 0 or next_pos[0] >= self.game.grid_width or
-                    next_pos[1] < 0 or next_pos[1] >= self.game.grid_height):
-                    continue
-                
-                # 检查障碍物
-                if next_pos in obstacles or next_pos in closed_set:
+            new_g = best_g[current] + 1
+            for neighbor in neighbors[current]:
+                if blocked[neighbor] or closed[neighbor] or new_g >= best_g[neighbor]:
                     continue
-                
-                new_g_score = g_score + 1
-                h_score = self.manhattan_distance(next_pos, goal)
-                new_f_score = new_g_score + h_score
-                
-                new_path = path + [next_pos]
-                heapq.heappush(open_set, (new_f_score, new_g_score, next_pos, new_path))
+                if heuristic is None:
+                    h_score = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                else:
+                    h_score = heuristic[neighbor]
+                    if h_score >= cell_count:
+                        continue
+                best_g[neighbor] = new_g
+                came_from[neighbor] = current
+                heappush(open_heap, ((new_g + h_score) * cell_count + new_g) * cell_count + neighbor)
         
         return None
     
+    def food_path(self, start: int, blocked: bytearray) -> Optional[List[int]]:
+        """
+        寻找从start到食物的最短路径
+        
+        食物距离场把蛇尾也当作空闲格子，是这组障碍下的距离下界：
+        能沿距离场直接下降到食物时就是最短路径，否则用它作A*的启发函数。
+        
+        Args:
+            start: 起始格子编号
+            blocked: 障碍物表（蛇身，但不包括即将移走的蛇尾）
+            
+        Returns:
+            格子编号路径（包含起点和终点），如果无法到达则返回None
+        """
+        food_pos = self.game.food
+        field = self.engine.food_distance_field()
+        if field is None:
+            return None
+        path = self.descend_field(start, blocked, field)
+        if path is None:
+            path = self.a_star_cells(start, food_pos[1] * self.game.grid_width + food_pos[0],
+                                     blocked, field)
+        return path
+    
+    def descend_field(self, start: int, blocked: bytearray, field: array) -> Optional[List[int]]:
+        """
+        沿距离场逐格下降到距离为0的格子（食物）
+        
+        距离场是真实距离的下界，所以只要每一步都能找到距离恰好减1的
+        可通行格子，得到的就是最短路径；中途被新占用的格子挡住时放弃。
+        
+        Args:
+            start: 起始格子编号
+            blocked: 障碍物表（非0表示不可通行）
+            field: 距离场（见 SnakeEngine.food_distance_field）
+            
+        Returns:
+            格子编号路径（包含起点和终点），下降失败时返回None
+        """
+        neighbors = neighbor_table(self.game.grid_width, self.game.grid_height)
+        unreachable = len(field)
+        path = [start]
+        
+        # 起点通常是蛇头（距离场里可能记为障碍），先选距离最小的相邻格子
+        current = -1
+        distance = unreachable
+        for neighbor in neighbors[start]:
+            if not blocked[neighbor] and field[neighbor] < distance:
+                current = neighbor
+                distance = field[neighbor]
+        if current < 0:
+            return None
+        path.append(current)
+        
+        while distance > 0:
+            distance -= 1
+            for neighbor in neighbors[current]:
+                if field[neighbor] == distance and not blocked[neighbor]:
+                    current = neighbor
+                    break
+            else:
+                return None
+            path.append(current)
+        return path
+    
     def is_safe_move(self, direction: Direction) -> bool:
         """
         检查移动是否安全
@@ -117,52 +321,115 @@ class AIController:
             direction: 移动方向
             
         Returns:
-            可达空间大小
+            可达空间大小（不含移动后的蛇头本身）
         """
-        next_pos = self.game.get_next_position(direction)
-        if not self.game.is_valid_position(next_pos):
-            return 0
-        
-        # 创建临时蛇身（模拟移动后的状态）
-        temp_snake = [next_pos] + self.game.snake[:-1]
-        if next_pos == self.game.food:
-            temp_snake = [next_pos] + self.game.snake  # 吃到食物，不移除尾部
-        
-        # 使用BFS计算可达空间
-        visited = set(temp_snake)
-        queue = [next_pos]
-        reachable_count = 0
-        
-        while queue:
-            current = queue.pop(0)
-            for direction_check in Direction:
-                dx, dy = direction_check.value
-                neighbor = (current[0] + dx, current[1] + dy)
-                
-                if (0 <= neighbor[0] < self.game.grid_width and
-                    0 <= neighbor[1] < self.game.grid_height and
-                    neighbor not in visited):
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-                    reachable_count += 1
-        
-        return reachable_count
+        return self.reachable_areas()[direction]
+    
+    def reachable_areas(self) -> Dict[Direction, int]:
+        """
+        一次连通块标记同时得到四个方向的可达空间
+        
+        不吃食物时，各方向移动后的棋盘障碍相同（蛇身去掉尾部），
+        可达空间 = 新蛇头所在连通块大小 - 1，所以只需对候选格子
+        所在的连通块各做一次BFS；吃到食物的方向尾部不移走，单独计算。
+        结果按引擎的状态版本号缓存，同一帧内多次调用不会重复搜索。
+        
+        Returns:
+            方向 -> 可达空间大小（不安全的方向为0）
+        """
+        key = (self.engine.state_version, self.game.food)
+        if key == self._area_cache_key:
+            return self._area_cache
+        
+        width = self.game.grid_width
+        tail_x, tail_y = self.game.snake[-1]
+        tail_cell = tail_y * width + tail_x
+        
+        generation = self._next_generation()
+        component_sizes = []
+        areas = {}
+        for direction in Direction:
+            next_pos = self.game.get_next_position(direction)
+            if not self.game.is_valid_position(next_pos):
+                areas[direction] = 0
+                continue
+            
+            cell = next_pos[1] * width + next_pos[0]
+            if next_pos == self.game.food:
+                # 吃到食物：尾部不移走，单独标记一次
+                areas[direction] = self._flood_fill(cell, -1, self._next_generation(), 0) - 1
+                generation = self._next_generation()
+                component_sizes = []
+            elif self._visit_mark[cell] == generation:
+                areas[direction] = component_sizes[self._labels[cell]] - 1
+            else:
+                label = len(component_sizes)
+                component_sizes.append(self._flood_fill(cell, tail_cell, generation, label))
+                areas[direction] = component_sizes[label] - 1
+        
+        self._area_cache_key = key
+        self._area_cache = areas
+        return areas
+    
+    def _next_generation(self) -> int:
+        """递增访问标记代数，避免每次BFS都清空标记数组"""
+        self._generation += 1
+        if self._generation >= 0xFFFFFFFF:
+            self._visit_mark = array('I', [0]) * len(self._visit_mark)
+            self._generation = 1
+        return self._generation
+    
+    def _flood_fill(self, start: int, free_cell: int, generation: int, label: int) -> int:
+        """
+        从start开始在空闲格子上做BFS，标记访问代数和连通块编号
+        
+        Args:
+            start: 起始格子编号
+            free_cell: 视为空闲的蛇身格子（即将移走的尾部），-1表示没有
+            generation: 本次标记使用的代数
+            label: 连通块编号
+            
+        Returns:
+            连通块大小（含起点）
+        """
+        occupied = self.engine.get_occupancy()
+        neighbors = neighbor_table(self.game.grid_width, self.game.grid_height)
+        marks = self._visit_mark
+        labels = self._labels
+        queue = self._bfs_queue
+        
+        marks[start] = generation
+        labels[start] = label
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail:
+            current = queue[head]
+            head += 1
+            for neighbor in neighbors[current]:
+                if marks[neighbor] != generation and (not occupied[neighbor] or neighbor == free_cell):
+                    marks[neighbor] = generation
+                    labels[neighbor] = label
+                    queue[tail] = neighbor
+                    tail += 1
+        return tail
     
     def greedy_strategy(self) -> Direction:
-        """贪心策略：总是朝食物方向移动"""
+        """贪心策略：总是朝食物方向移动（按绕开蛇身的食物距离场）"""
         safe_directions = self.get_safe_directions()
         if not safe_directions:
             return self.game.direction
 
         food_pos = self.game.food
+        if food_pos is None:
+            return safe_directions[0]
 
-        # 计算到食物的距离
+        # 计算到食物的距离（距离相同时比较曼哈顿距离）
         best_direction = None
-        min_distance = float('inf')
+        min_distance = (float('inf'), float('inf'))
 
         for direction in safe_directions:
             next_pos = self.game.get_next_position(direction)
-            distance = self.manhattan_distance(next_pos, food_pos)
+            distance = (self.engine.food_distance(next_pos), self.manhattan_distance(next_pos, food_pos))
             if distance < min_distance:
                 min_distance = distance
                 best_direction = direction
@@ -215,68 +482,513 @@ class AIController:
             return self.random_strategy()
         elif self.algorithm == "defensive":
             return self.defensive_strategy()
+        elif self.algorithm == "hamiltonian":
+            return self.hamiltonian_strategy()
+        elif self.algorithm == "lookahead":
+            return self.lookahead_strategy()
+        elif self.algorithm == "rollout":
+            return self.rollout_strategy()
         else:  # default: astar
             return self.astar_strategy()
 
-    def astar_strategy(self) -> Direction:
-        """A*策略：使用A*算法寻路"""
-        head_pos = self.game.get_head_position()
-        food_pos = self.game.food
+    def hamiltonian_strategy(self) -> Direction:
+        """
+        哈密顿回路策略：沿预计算的回路前进，蛇较短时走安全捷径
+        
+        蛇身始终落在回路上蛇尾到蛇头之间的区段内，因此蛇头前方到蛇尾
+        之前的回路格子都是空的。捷径只跳到这段空区域内、不越过食物，
+        并给蛇尾留出 HAMILTONIAN_BUFFER 格余量；每步只看四个相邻格子，
+        耗时与蛇长无关，只沿回路走时保证能填满棋盘。
+        """
+        width = self.game.grid_width
+        order = hamiltonian_cycle(width, self.game.grid_height)
+        if order is None:
+            return self.astar_strategy()
+        
+        cell_count = len(order)
+        length = len(self.game.snake)
+        head_x, head_y = self.game.get_head_position()
+        tail_x, tail_y = self.game.snake[-1]
+        head_index = order[head_y * width + head_x]
+        
+        # 蛇头沿回路到蛇尾之间的距离
+        room = (order[tail_y * width + tail_x] - head_index) % cell_count if length > 1 else cell_count
+        food = self.game.food
+        food_distance = (order[food[1] * width + food[0]] - head_index) % cell_count if food else cell_count
+        allow_shortcut = length < cell_count // 2
+        
+        cycle_direction = None
+        best_direction = None
+        best_distance = 1
+        for direction in Direction:
+            next_x, next_y = head_x + direction.value[0], head_y + direction.value[1]
+            if not self.game.is_valid_position((next_x, next_y)):
+                continue
+            distance = (order[next_y * width + next_x] - head_index) % cell_count
+            if distance == 1:
+                cycle_direction = direction
+            elif (allow_shortcut and best_distance < distance <= food_distance and
+                  distance < room - HAMILTONIAN_BUFFER):
+                best_direction = direction
+                best_distance = distance
+        
+        direction = best_direction or cycle_direction
+        if direction is None:
+            # 回路被打乱（例如中途切换策略），退回防御策略
+            return self.defensive_strategy()
+        return direction
+
+    def lookahead_strategy(self) -> Direction:
+        """
+        前瞻搜索策略：在每步的时间预算内迭代加深搜索未来的走法
+        
+        时间预算（ai.lookahead_time_ms）越大搜得越深，决策质量越高。
+        """
+        config = game_config.snapshot.ai
+        if self._lookahead is None:
+            width, height = self.game.grid_width, self.game.grid_height
+            self._lookahead = LookaheadSearch(width, height, neighbor_table(width, height),
+                                              config.lookahead_table_size)
+        
+        time_budget = config.lookahead_time_ms / 1000.0
+        max_depth = config.lookahead_max_depth
+        direction = self._lookahead.search(self.engine, time_budget, max_depth)
+        if direction is None:
+            return self.defensive_strategy()
+        return direction
+
+    def rollout_strategy(self) -> Direction:
+        """
+        蒙特卡洛推演策略：对每个安全方向做大量随机推演，选平均评分最高的方向
+        
+        ai.rollout_workers 个进程并行推演（0表示自动，1表示在本进程内计算），
+        每个进程对每个方向推演 ai.rollouts 局（每局最多 ai.rollout_depth 步），
+        核心越多样本越多。最多等待 ai.rollout_timeout_ms 毫秒，只统计按时完成
+        的进程；没有进程按时完成时使用防御策略。
+        """
+        safe_directions = self.get_safe_directions()
+        if len(safe_directions) <= 1:
+            return safe_directions[0] if safe_directions else self.game.direction
+        
+        config = game_config.snapshot.ai
+        rollouts = config.rollouts
+        depth = config.rollout_depth
+        workers = config.rollout_workers
+        timeout = config.rollout_timeout_ms / 1000.0
+        
+        width = self.game.grid_width
+        head_x, head_y = self.game.get_head_position()
+        first_cells = [(head_y + direction.value[1]) * width + head_x + direction.value[0]
+                       for direction in safe_directions]
+        totals = evaluate_moves(encode_state(self.engine), first_cells, rollouts, depth, workers, timeout)
+        if totals is None:
+            return self.defensive_strategy()
+        
+        best_index = max(range(len(totals)), key=totals.__getitem__)
+        return safe_directions[best_index]
 
+    def astar_strategy(self) -> Direction:
+        """
+        A*策略：使用A*算法寻路，并复用上一帧仍然有效的路径
+        
+        新路径先让虚拟蛇沿整条路径走到食物，确认吃完后蛇头仍能走到蛇尾
+        才采用，检查结果随路径一起缓存。路径不安全时追着蛇尾走，
+        追不到蛇尾再使用防御策略。
+        """
         # 获取安全方向
         safe_directions = self.get_safe_directions()
 
         if not safe_directions:
             return self.game.direction
 
-        # 创建障碍物集合（蛇身，但不包括尾部，因为移动时尾部会移动）
-        obstacles = set(self.game.snake[:-1])
+        direction = self._follow_plan()
+        if direction is None:
+            self.plan_cache_misses += 1
+            direction = self._replan()
+        else:
+            self.plan_cache_hits += 1
 
-        # 尝试使用A*算法找到食物
-        path = self.a_star_pathfinding(head_pos, food_pos, obstacles)
+        if direction in safe_directions and (self._plan_safe or self._is_stalled()):
+            self._plan_version = self.engine.state_version
+            return direction
 
-        if path and len(path) > 1:
-            # 找到路径，获取下一步方向
-            next_pos = path[1]
-            for direction in Direction:
-                if self.game.get_next_position(direction) == next_pos:
-                    if direction in safe_directions:
-                        # 额外检查：确保这个移动不会让蛇困住自己
-                        reachable_space = self.simulate_move(direction)
-                        if reachable_space >= len(self.game.snake):
-                            return direction
-
-        # 如果A*失败或路径不安全，使用防御策略
+        # 如果A*失败或路径不安全，放弃当前路径，先追蛇尾，再使用防御策略
+        self._plan.clear()
+        direction = self.chase_tail()
+        if direction in safe_directions:
+            return direction
         return self.defensive_strategy()
-    
-    def get_direction_towards_food(self) -> Optional[Direction]:
+
+    def _is_stalled(self) -> bool:
         """
-        获取朝向食物的方向（简单策略）
+        是否已经很久没吃到食物（走满一个棋盘的步数）
+        
+        食物一直不安全时蛇会永远追着蛇尾绕圈，这时宁可冒险走向食物。
+        """
+        engine = self.engine
+        if engine.score != self._meal_score or engine.move_count < self._meal_move:
+            self._meal_score = engine.score
+            self._meal_move = engine.move_count
+        return engine.move_count - self._meal_move > len(self._visit_mark)
+
+    def virtual_snake_is_safe(self, path: List[int]) -> bool:
+        """
+        让虚拟蛇沿路径走到终点（食物），检查吃完后蛇头能否走到蛇尾
+        
+        沿路径走k步并在最后一步吃到食物后，新蛇身就是倒序的路径接上
+        原蛇身的前 len - k + 1 段，不需要逐步模拟。
         
+        Args:
+            path: 格子编号路径（包含起点蛇头和终点食物）
+            
         Returns:
-            朝向食物的方向，如果无法确定则返回None
+            吃完食物后蛇头到蛇尾是否有通路
+        """
+        width = self.game.grid_width
+        length = len(self.game.snake) + 1
+        body = path[:0:-1]
+        if len(body) < length:
+            body.extend(y * width + x for x, y in itertools.islice(self.game.snake, length - len(body)))
+        else:
+            del body[length:]
+        
+        blocked = bytearray(len(self._visit_mark))
+        for cell in body:
+            blocked[cell] = 1
+        return self._tail_reachable(body[0], body[-1], blocked)
+
+    def _tail_reachable(self, head: int, tail: int, blocked: bytearray) -> bool:
+        """
+        检查蛇头能否沿空闲格子走到蛇尾
+        
+        蛇尾所在的格子在下一步移动时仍算障碍，所以紧挨着的蛇尾不算，
+        至少要走两步：先进入一个空闲格子，再从那里绕到蛇尾。
         """
+        neighbors = neighbor_table(self.game.grid_width, self.game.grid_height)
+        generation = self._next_generation()
+        marks = self._visit_mark
+        queue = self._bfs_queue
+        marks[head] = generation
+        read, write = 0, 0
+        for neighbor in neighbors[head]:
+            if not blocked[neighbor]:
+                marks[neighbor] = generation
+                queue[write] = neighbor
+                write += 1
+        while read < write:
+            current = queue[read]
+            read += 1
+            for neighbor in neighbors[current]:
+                if neighbor == tail:
+                    return True
+                if marks[neighbor] != generation and not blocked[neighbor]:
+                    marks[neighbor] = generation
+                    queue[write] = neighbor
+                    write += 1
+        return False
+
+    def chase_tail(self) -> Optional[Direction]:
+        """
+        追蛇尾：在能绕回蛇尾的方向中选离蛇尾最远的一个，给后面的蛇身腾出空间
+        
+        Returns:
+            方向，蛇太短或追不到蛇尾时返回None
+        """
+        snake = self.game.snake
+        if len(snake) < 3:
+            return None
+        
+        width = self.game.grid_width
+        neighbors = neighbor_table(width, self.game.grid_height)
+        occupied = self.engine.get_occupancy()
+        tail_x, tail_y = snake[-1]
+        tail = tail_y * width + tail_x
+        
+        # 从蛇尾出发BFS，得到每个空闲格子到蛇尾的距离
+        generation = self._next_generation()
+        marks = self._visit_mark
+        queue = self._bfs_queue
+        distance = self._bfs_distance
+        marks[tail] = generation
+        distance[tail] = 0
+        queue[0] = tail
+        read, write = 0, 1
+        while read < write:
+            current = queue[read]
+            read += 1
+            for neighbor in neighbors[current]:
+                if marks[neighbor] != generation and not occupied[neighbor]:
+                    marks[neighbor] = generation
+                    distance[neighbor] = distance[current] + 1
+                    queue[write] = neighbor
+                    write += 1
+        
+        head_x, head_y = snake[0]
+        best_direction = None
+        max_distance = -1
+        for direction in self.get_safe_directions():
+            next_x, next_y = self.game.get_next_position(direction)
+            cell = next_y * width + next_x
+            if marks[cell] == generation and distance[cell] > max_distance:
+                max_distance = distance[cell]
+                best_direction = direction
+        return best_direction
+
+    def _follow_plan(self) -> Optional[Direction]:
+        """
+        尝试沿缓存的路径继续前进
+
+        只有在上次决策后恰好移动了一步、食物没有变化、并且剩余路径
+        考虑蛇尾移动后仍无碰撞时才复用。
+
+        Returns:
+            下一步方向，路径失效时返回None
+        """
+        if (not self._plan or self._plan_food != self.game.food or
+                self.engine.state_version != self._plan_version + 1):
+            return None
+
+        width = self.game.grid_width
+        head_x, head_y = self.game.get_head_position()
+        if self._plan[0] != head_y * width + head_x:
+            return None
+        self._plan.popleft()
+        if not self._plan or not self._plan_is_clear():
+            return None
+
+        next_cell = self._plan[0]
+        return DIRECTION_BY_DELTA.get((next_cell % width - head_x, next_cell // width - head_y))
+
+    def _plan_is_clear(self, plan: Optional[Iterable[int]] = None) -> bool:
+        """
+        检查剩余路径在蛇尾随之移动的情况下是否仍无碰撞
+
+        第k步移动时，下标 i <= len - k 的蛇身段还没有移走。
+
+        Args:
+            plan: 要检查的路径（第一个元素是下一步蛇头进入的格子），None时检查缓存的路径
+        """
+        if plan is None:
+            plan = self._plan
+        length = len(self.game.snake)
+        segment_index = self.engine.segment_index
+        for step, cell in enumerate(plan, 1):
+            index = segment_index(cell)
+            if 0 <= index <= length - step:
+                return False
+        return True
+
+    def _plan_obstacles(self) -> bytearray:
+        """
+        寻路用的障碍物表：蛇身，但不包括尾部，因为移动时尾部会移动
+
+        蛇尾所在的格子要等第一步走完才空出来，蛇尾紧挨着蛇头时仍然算障碍
+        （蛇只有两段时蛇尾就是脖子）。
+        """
+        blocked = bytearray(self.engine.get_occupancy())
+        width = self.game.grid_width
+        head_x, head_y = self.game.snake[0]
+        tail_x, tail_y = self.game.snake[-1]
+        tail = tail_y * width + tail_x
+        if tail not in neighbor_table(width, self.game.grid_height)[head_y * width + head_x]:
+            blocked[tail] = 0
+        return blocked
+
+    def _replan(self) -> Optional[Direction]:
+        """重新规划到食物的最短路径并缓存，返回第一步方向"""
+        self._plan.clear()
+        self._plan_safe = False
+        food_pos = self.game.food
+        if food_pos is None:
+            return None
+
+        width = self.game.grid_width
         head_x, head_y = self.game.get_head_position()
-        food_x, food_y = self.game.food
+        path = self.food_path(head_y * width + head_x, self._plan_obstacles())
+        if not path or len(path) < 2:
+            return None
+
+        # 缓存路径（第一个元素是下一步之后蛇头应在的位置）和虚拟蛇检查的结果
+        self._plan.extend(path[1:])
+        self._plan_food = food_pos
+        self._plan_safe = self.virtual_snake_is_safe(path)
+        next_cell = path[1]
+        return DIRECTION_BY_DELTA.get((next_cell % width - head_x, next_cell // width - head_y))
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        """获取路径缓存的命中统计"""
+        total = self.plan_cache_hits + self.plan_cache_misses
+        return {
+            "plan_cache_hits": self.plan_cache_hits,
+            "plan_cache_misses": self.plan_cache_misses,
+            "hit_rate": self.plan_cache_hits / total if total else 0.0
+        }
+    
+    def get_direction_towards_food(self) -> Optional[Direction]:
+        """
+        获取朝向食物的方向（简单策略）
         
-        # 优先选择距离食物更近的方向
-        directions_priority = []
+        按食物距离场选择离食物最近的安全方向。
         
-        if food_x > head_x:
-            directions_priority.append(Direction.RIGHT)
-        elif food_x < head_x:
-            directions_priority.append(Direction.LEFT)
-            
-        if food_y > head_y:
-            directions_priority.append(Direction.DOWN)
-        elif food_y < head_y:
-            directions_priority.append(Direction.UP)
+        Returns:
+            朝向食物的方向，如果食物不可达则返回None
+        """
+        if self.game.food is None:
+            return None
         
-        # 检查这些方向是否安全
-        safe_directions = self.get_safe_directions()
+        unreachable = self.game.grid_width * self.game.grid_height
+        best_direction = None
+        min_distance = unreachable
+        for direction in self.get_safe_directions():
+            distance = self.engine.food_distance(self.game.get_next_position(direction))
+            if distance < min_distance:
+                min_distance = distance
+                best_direction = direction
         
-        for direction in directions_priority:
-            if direction in safe_directions:
+        return best_direction
+
+class AsyncAIController:
+    """
+    后台线程AI控制器
+
+    每一步把 get_game_state() 的快照交给工作线程中的AIController计算，
+    主循环最多等待 deadline_ms 毫秒。超时记为一次截止时间未命中，
+    并沿上一次成功决策留下的路径前进，路径不可用时选一个安全方向。
+    超时的任务会继续算完，但它的结果已经过期，只会被丢弃。
+    """
+
+    def __init__(self, game: SnakeEngine, deadline_ms: Optional[float] = None):
+        """
+        初始化后台AI控制器
+
+        Args:
+            game: 贪吃蛇游戏实例（无界面的SnakeEngine，或包装它的SnakeGame）
+            deadline_ms: 每步决策的截止时间（毫秒），None时使用配置文件
+        """
+        self.game = game
+        self.engine = getattr(game, 'engine', game)
+        if deadline_ms is None:
+            deadline_ms = game_config.get("ai.deadline_ms", 20)
+        self.deadline = deadline_ms / 1000.0
+
+        # 工作线程只访问自己的快照引擎和AI，不触碰主循环的游戏对象
+        self._worker_engine = SnakeEngine(game.grid_width, game.grid_height)
+        self._worker_ai = AIController(self._worker_engine, watch_config=False)
+        self.algorithm = self._worker_ai.algorithm
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-planner")
+        self._pending = None
+        self._pending_version = -1
+
+        # 上一次成功决策后剩余的路径（格子编号）和它对应的食物，超时时沿它前进；
+        # 主线程用自己的AI检查路径是否仍然安全（工作线程AI的缓冲区只在工作线程中使用）
+        self._fallback_plan = deque()
+        self._fallback_food = None
+        self._fallback_ai = AIController(game, watch_config=False)
+
+        self.decisions = 0
+        self.deadline_misses = 0
+
+        # 配置变化在主线程通知，先存起来，由工作线程在下一次决策前应用
+        self._config_lock = threading.Lock()
+        self._config_changes = {}
+        game_config.subscribe("ai", self.on_config_changed)
+
+    def on_config_changed(self, changes: Dict[str, object]):
+        """记录AI配置的变化（主线程），工作线程AI的状态只在工作线程中修改"""
+        with self._config_lock:
+            self._config_changes.update(changes)
+        if "ai.algorithm" in changes:
+            self.algorithm = game_config.get("ai.algorithm", "astar")
+        if "ai.deadline_ms" in changes:
+            self.deadline = game_config.get("ai.deadline_ms", 20) / 1000.0
+
+    def _plan_snapshot(self, state: dict) -> Tuple[Direction, List[int]]:
+        """在工作线程中根据快照决策，返回方向和决策后剩余的路径"""
+        with self._config_lock:
+            changes, self._config_changes = self._config_changes, {}
+        if changes:
+            self._worker_ai.on_config_changed(changes)
+        self._worker_engine.load_state(state)
+        direction = self._worker_ai.get_best_direction()
+        return direction, list(self._worker_ai._plan)
+
+    def get_best_direction(self) -> Direction:
+        """
+        获取最佳移动方向（最多等待一个截止时间）
+
+        Returns:
+            最佳移动方向
+        """
+        if self.game.game_over:
+            return self.game.direction
+
+        deadline = time.perf_counter() + self.deadline
+        version = self.engine.state_version
+        if self._pending_version != version:
+            if self._pending is not None and not self._pending.done():
+                # 上一个任务还在计算过期的状态，等它结束（与新任务共用本步的截止时间）
+                try:
+                    self._pending.result(timeout=max(0.0, deadline - time.perf_counter()))
+                except FutureTimeout:
+                    return self._miss()
+            self._pending = self._executor.submit(self._plan_snapshot, self.game.get_game_state())
+            self._pending_version = version
+
+        try:
+            direction, plan = self._pending.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            return self._miss()
+
+        self._pending = None
+        self._pending_version = -1
+        self._fallback_plan = deque(plan)
+        self._fallback_food = self.engine.food
+        self.decisions += 1
+        return direction
+
+    def _miss(self) -> Direction:
+        """
+        截止时间未命中：沿上次的路径前进，路径失效时选一个安全方向
+
+        路径只在食物没有变化、剩余路径不撞到蛇身、并且虚拟蛇沿路径吃到
+        食物后仍能走到蛇尾时才继续使用。
+        """
+        self.deadline_misses += 1
+        width = self.game.grid_width
+        head_x, head_y = self.game.get_head_position()
+        head = head_y * width + head_x
+        plan = self._fallback_plan
+        if self.engine.food != self._fallback_food:
+            plan.clear()
+        if plan and plan[0] == head:
+            plan.popleft()
+        if plan:
+            next_cell = plan[0]
+            direction = DIRECTION_BY_DELTA.get((next_cell % width - head_x, next_cell // width - head_y))
+            checker = self._fallback_ai
+            if (direction in self.engine.get_possible_moves() and checker._plan_is_clear(plan)
+                    and checker.virtual_snake_is_safe([head, *plan])):
                 return direction
-        
-        return None
+        plan.clear()
+
+        possible_moves = self.engine.get_possible_moves()
+        if self.game.direction in possible_moves or not possible_moves:
+            return self.game.direction
+        return possible_moves[0]
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        """获取路径缓存和截止时间的统计"""
+        stats = self._worker_ai.get_cache_stats()
+        stats["decisions"] = self.decisions
+        stats["deadline_misses"] = self.deadline_misses
+        return stats
+
+    def close(self):
+        """关闭工作线程（不等待正在进行的计算）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def create_ai_controller(game: SnakeEngine):
+    """按配置创建AI控制器（ai.async_planner 为真时在后台线程中规划）"""
+    if game_config.get("ai.async_planner", False):
+        return AsyncAIController(game)
+    return AIController(game)
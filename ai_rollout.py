@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+蒙特卡洛推演
+对每个安全方向模拟大量随机后续对局，按平均得分和存活情况评估方向；
+推演任务可以分发到进程池，局面用紧凑的字节串在进程间传递
+"""
+
+import atexit
+import os
+import random
+import struct
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List, Optional, Tuple
+from game_engine import SnakeEngine, neighbor_table
+
+# 推演评分：每吃到一个食物 +1，推演期间死亡扣分
+DEATH_PENALTY = 2.0
+
+# 推演策略：以这个概率优先走向食物，否则随机选择安全方向
+GREEDY_PROBABILITY = 0.7
+
+# 工作进程数为0（自动）时最多使用的CPU核心数
+AUTO_WORKER_LIMIT = 4
+
+# 局面编码的头部：网格宽、网格高、食物格子编号（无食物为-1）
+_HEADER = struct.Struct('<HHi')
+
+_pool = None
+_pool_workers = 0
+
+def encode_state(engine: SnakeEngine) -> bytes:
+    """
+    把局面编码为紧凑的字节串（头部 + 蛇身格子编号数组，头在前）
+
+    Args:
+        engine: 游戏引擎
+
+    Returns:
+        编码后的局面
+    """
+    width = engine.grid_width
+    food = engine.food
+    food_cell = food[1] * width + food[0] if food is not None else -1
+    body = array('i', (y * width + x for x, y in engine.snake))
+    return _HEADER.pack(width, engine.grid_height, food_cell) + body.tobytes()
+
+def decode_state(state: bytes) -> Tuple[int, int, int, array]:
+    """
+    解码 encode_state 生成的局面
+
+    Returns:
+        (网格宽度, 网格高度, 食物格子编号, 蛇身格子编号数组)
+    """
+    width, height, food = _HEADER.unpack_from(state)
+    body = array('i')
+    body.frombytes(state[_HEADER.size:])
+    return width, height, food, body
+
+def run_rollouts(state: bytes, first_cells: List[int], count: int, depth: int, seed: int) -> List[float]:
+    """
+    对每个候选的第一步：从局面出发先走到该格子，再随机推演count局，每局最多depth步
+
+    顶层函数，可以直接提交给进程池（每个工作进程一个任务，覆盖全部候选）。
+
+    Args:
+        state: encode_state 编码的局面
+        first_cells: 候选的第一步（蛇头进入的格子）
+        count: 每个候选的推演局数
+        depth: 每局推演的最大步数
+        seed: 随机种子
+
+    Returns:
+        与first_cells一一对应的评分之和
+    """
+    width, height, food, cells = decode_state(state)
+    neighbors = neighbor_table(width, height)
+    occupied_template = bytearray(width * height)
+    for cell in cells:
+        occupied_template[cell] = 1
+
+    rng = random.Random(seed)
+    totals = []
+    for first_cell in first_cells:
+        total = 0.0
+        for _ in range(count):
+            total += _rollout(width, neighbors, bytearray(occupied_template), deque(cells),
+                              food, first_cell, depth, rng)
+        totals.append(total)
+    return totals
+
+def _rollout(width: int, neighbors, occupied: bytearray, body: deque,
+             food: int, first_cell: int, depth: int, rng: random.Random) -> float:
+    """进行一局推演，返回评分（吃到的食物数，死亡时扣分）"""
+    cell_count = len(occupied)
+    eaten = 0
+    cell = first_cell
+    for _ in range(depth):
+        # 移动蛇头（规则与SnakeEngine一致：蛇尾当前所在的格子也算障碍）
+        body.appendleft(cell)
+        occupied[cell] = 1
+        if cell == food:
+            eaten += 1
+            if len(body) == cell_count:
+                return float(eaten)
+            food = _spawn_food(occupied, rng)
+        else:
+            occupied[body.pop()] = 0
+
+        # 选择下一步
+        moves = [neighbor for neighbor in neighbors[cell] if not occupied[neighbor]]
+        if not moves:
+            return eaten - DEATH_PENALTY
+        if food >= 0 and rng.random() < GREEDY_PROBABILITY:
+            food_x, food_y = food % width, food // width
+            cell = min(moves, key=lambda move: abs(move % width - food_x) + abs(move // width - food_y))
+        else:
+            cell = rng.choice(moves)
+    return float(eaten)
+
+def _spawn_food(occupied: bytearray, rng: random.Random) -> int:
+    """在空闲格子中随机生成食物（先随机抽样，棋盘很满时退回线性扫描）"""
+    cell_count = len(occupied)
+    for _ in range(16):
+        cell = rng.randrange(cell_count)
+        if not occupied[cell]:
+            return cell
+    free_cells = [cell for cell in range(cell_count) if not occupied[cell]]
+    return rng.choice(free_cells) if free_cells else -1
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """工作进程数：None或0表示自动（CPU核心数，最多 AUTO_WORKER_LIMIT 个）"""
+    if workers:
+        return workers
+    return min(os.cpu_count() or 1, AUTO_WORKER_LIMIT)
+
+def evaluate_moves(state: bytes, first_cells: List[int], rollouts: int, depth: int,
+                   workers: int = 0, timeout: Optional[float] = None) -> Optional[List[float]]:
+    """
+    对每个候选的第一步做推演，返回各自的评分之和
+
+    每个工作进程对每个候选各推演rollouts局，总样本数随进程数增长：
+    核心越多，同样的耗时内决策越准确。每个工作进程只提交一个覆盖全部
+    候选的任务，每步的进程间通信次数等于进程数。
+
+    最多等待timeout秒，只统计按时完成的工作进程：每个进程覆盖全部候选，
+    各候选的样本数仍然相同。超时的任务会继续算完，结果被丢弃。
+
+    Args:
+        state: encode_state 编码的局面
+        first_cells: 候选的第一步（蛇头进入的格子）
+        rollouts: 每个工作进程、每个候选的推演局数
+        depth: 每局推演的最大步数
+        workers: 工作进程数，0表示自动（见 resolve_workers），1表示在本进程内计算（不受timeout限制）
+        timeout: 等待工作进程的最长时间（秒），None表示一直等待
+
+    Returns:
+        与first_cells一一对应的评分之和，没有工作进程按时完成时返回None
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        return run_rollouts(state, first_cells, rollouts, depth, random.getrandbits(32))
+
+    pool = get_rollout_pool(workers)
+    futures = [pool.submit(run_rollouts, state, first_cells, rollouts, depth, random.getrandbits(32))
+               for _ in range(workers)]
+    done, not_done = wait(futures, timeout=timeout)
+    for future in not_done:
+        future.cancel()
+    results = [future.result() for future in done if future.exception() is None]
+    if not results:
+        return None
+    return [sum(totals) for totals in zip(*results)]
+
+def get_rollout_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    获取共享的推演进程池（工作进程数变化时重建）
+
+    Args:
+        workers: 工作进程数，None或0表示自动（见 resolve_workers）
+    """
+    global _pool, _pool_workers
+    workers = resolve_workers(workers)
+    if _pool is None or _pool_workers != workers:
+        shutdown_rollout_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+def shutdown_rollout_pool():
+    """关闭共享的推演进程池"""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+atexit.register(shutdown_rollout_pool)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+前瞻搜索
+迭代加深的深度优先搜索：在可撤销的搜索状态上模拟未来若干步（包括吃到食物），
+用Zobrist哈希的置换表复用搜索过的局面，用洪水填充的可达空间剪掉困死的分支
+"""
+
+import random
+import time
+from array import array
+from collections import deque
+from typing import Optional, Sequence, Tuple
+from game_engine import SnakeEngine, Direction
+
+# 评分：每多活一步 +1，吃到食物另加奖励，未来的收益按折扣率递减（越早越好）
+SURVIVE_REWARD = 1.0
+FOOD_REWARD = 10000.0
+DEATH_SCORE = -1000000.0
+TRAP_PENALTY = -100000.0
+DISCOUNT = 0.99
+
+DIRECTION_BY_DELTA = {direction.value: direction for direction in Direction}
+
+class SearchTimeout(Exception):
+    """本步的搜索时间已用完"""
+
+class LookaheadSearch:
+    """
+    前瞻搜索器
+
+    搜索状态与SnakeEngine规则一致（蛇尾当前所在的格子也算障碍），
+    移动用 do/undo 原地修改占用表和蛇身，不复制状态。
+
+    局面哈希由蛇头位置、蛇身每一段指向下一段（朝蛇尾）的连接和食物位置的
+    Zobrist随机数异或得到。连接确定了蛇身的顺序和蛇尾的位置，覆盖相同格子
+    但顺序不同的两条蛇（之后空出格子的先后不同）哈希不同；每次移动只增删
+    蛇头和蛇尾的两个连接，增量更新。置换表保存 (剩余深度, 评分, 最佳下一格)，评分只
+    依赖局面和剩余深度，因此可以跨越多次决策复用；剩余深度不同时只用
+    记录的最佳下一格排序走法。超过容量时整表清空。
+    """
+
+    def __init__(self, grid_width: int, grid_height: int, neighbors: Sequence[Tuple[int, ...]],
+                 table_size: int = 200000, seed: Optional[int] = None):
+        """
+        初始化搜索器
+
+        Args:
+            grid_width: 网格宽度
+            grid_height: 网格高度
+            neighbors: 每个格子的相邻格子编号（见 game_engine.neighbor_table）
+            table_size: 置换表最多保存的局面数
+            seed: Zobrist随机数种子
+        """
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.neighbors = neighbors
+        self.table_size = table_size
+
+        cell_count = grid_width * grid_height
+        rng = random.Random(seed)
+        # 连接的随机数按 格子 * 4 + 方向 存放，方向由相邻两格编号之差查表得到
+        self._link_keys = [rng.getrandbits(64) for _ in range(cell_count * 4)]
+        self._link_slots = {1: 0, -1: 1, grid_width: 2, -grid_width: 3}
+        self._head_keys = [rng.getrandbits(64) for _ in range(cell_count)]
+        self._food_keys = [rng.getrandbits(64) for _ in range(cell_count)]
+        self.table = {}
+
+        # 可达空间计算的预分配缓冲区
+        self._visit_mark = array('I', [0]) * cell_count
+        self._queue = array('i', [0]) * cell_count
+        self._generation = 0
+
+        # 当前搜索状态；_entered 记录蛇头进入各格子时的时钟，用来求蛇身段下标
+        self._occupied = bytearray(cell_count)
+        self._entered = array('i', [0]) * cell_count
+        self._clock = 0
+        self._body = deque()
+        self._food = -1
+        self._hash = 0
+        self._deadline = 0.0
+
+        # 统计信息
+        self.nodes = 0
+        self.table_hits = 0
+        self.completed_depth = 0
+
+    def _load(self, engine: SnakeEngine):
+        """从引擎复制搜索状态并计算局面哈希"""
+        width = self.grid_width
+        self._occupied = bytearray(engine.get_occupancy())
+        self._body = deque(y * width + x for x, y in engine.snake)
+        self._clock = 0
+        for index, cell in enumerate(self._body):
+            self._entered[cell] = -index
+        food = engine.food
+        self._food = food[1] * width + food[0] if food is not None else -1
+
+        self._hash = self._compute_hash()
+
+    def _link_key(self, cell: int, next_cell: int) -> int:
+        """蛇身段cell连向下一段（朝蛇尾）next_cell的随机数"""
+        return self._link_keys[cell * 4 + self._link_slots[next_cell - cell]]
+
+    def _compute_hash(self) -> int:
+        """从头计算当前搜索状态的局面哈希"""
+        body = self._body
+        key = self._head_keys[body[0]]
+        for index in range(len(body) - 1):
+            key ^= self._link_key(body[index], body[index + 1])
+        if self._food >= 0:
+            key ^= self._food_keys[self._food]
+        return key
+
+    def search(self, engine: SnakeEngine, time_budget: float, max_depth: int = 64) -> Optional[Direction]:
+        """
+        在时间预算内迭代加深搜索，返回最后一个完整搜完的深度选出的方向
+
+        Args:
+            engine: 当前游戏引擎（只读）
+            time_budget: 搜索时间预算（秒）
+            max_depth: 最大搜索深度
+
+        Returns:
+            最佳方向，没有任何合法移动时返回None
+        """
+        self._load(engine)
+        self._deadline = time.perf_counter() + time_budget
+        self.nodes = 0
+        self.table_hits = 0
+        self.completed_depth = 0
+
+        best_cell = -1
+        max_depth = min(max_depth, engine.free_cell_count() + 1)
+        for depth in range(1, max_depth + 1):
+            try:
+                cell, value = self._search_root(depth)
+            except SearchTimeout:
+                break
+            if cell < 0:
+                break
+            best_cell = cell
+            self.completed_depth = depth
+            if value <= DEATH_SCORE / 2:
+                # 所有走法都会死，更深的搜索也不会改变结果
+                break
+
+        if best_cell < 0:
+            return None
+        width = self.grid_width
+        head_x, head_y = engine.get_head_position()
+        return DIRECTION_BY_DELTA.get((best_cell % width - head_x, best_cell // width - head_y))
+
+    def _search_root(self, depth: int) -> Tuple[int, float]:
+        """搜索根节点，返回 (最佳下一格, 评分)"""
+        best_cell = -1
+        best_value = float('-inf')
+        for cell in self._ordered_moves(depth):
+            reward, tail, stamp = self._do(cell)
+            try:
+                value = reward + DISCOUNT * self._search(depth - 1)
+            finally:
+                self._undo(cell, tail, stamp)
+            if value > best_value:
+                best_value = value
+                best_cell = cell
+        return best_cell, best_value
+
+    def _ordered_moves(self, depth: int):
+        """合法的下一格，置换表记录的最佳走法排在最前面"""
+        occupied = self._occupied
+        moves = [cell for cell in self.neighbors[self._body[0]] if not occupied[cell]]
+        entry = self.table.get(self._hash)
+        if entry is not None and entry[2] in moves:
+            moves.remove(entry[2])
+            moves.insert(0, entry[2])
+        return moves
+
+    def _search(self, depth: int) -> float:
+        """深度优先搜索当前局面，返回剩余depth步内的最佳评分"""
+        # 每个节点都要做一次O(蛇长)的洪水填充，相比之下读时钟的开销可以忽略，
+        # 每个节点都检查截止时间，长蛇时也不会超时
+        self.nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        # 评分包含剩余步数内的存活奖励，只有剩余深度相同的评分才能直接比较
+        entry = self.table.get(self._hash)
+        if entry is not None and entry[0] == depth:
+            self.table_hits += 1
+            return entry[1]
+
+        # 可达空间：叶子节点用来评分；困死的局面不再展开
+        area, release = self._reachable(len(self._body) + 1)
+        if depth == 0 or self._is_trapped(area, release):
+            return self._evaluate(area, release)
+
+        best_value = DEATH_SCORE
+        best_cell = -1
+        for cell in self._ordered_moves(depth):
+            reward, tail, stamp = self._do(cell)
+            try:
+                value = reward + DISCOUNT * self._search(depth - 1)
+            finally:
+                self._undo(cell, tail, stamp)
+            if value > best_value:
+                best_value = value
+                best_cell = cell
+
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[self._hash] = (depth, best_value, best_cell)
+        return best_value
+
+    def _is_trapped(self, area: int, release: int) -> bool:
+        """
+        判断局面是否困死
+
+        可达空间装得下整条蛇，或者在空间用完之前就有相邻的蛇身段移走
+        （出现出口），都不算困死。
+        """
+        return area < len(self._body) and area < release
+
+    def _evaluate(self, area: int, release: int) -> float:
+        """
+        静态评分：困死的局面按可达空间扣分，其余局面比较离食物的距离
+
+        不困死的局面之间不比较空间大小，避免蛇为了守着蛇尾原地绕圈。
+        """
+        if self._is_trapped(area, release):
+            return TRAP_PENALTY + area
+
+        value = 0.0
+        if self._food >= 0:
+            width = self.grid_width
+            head = self._body[0]
+            value -= abs(head % width - self._food % width) + abs(head // width - self._food // width)
+        return value
+
+    def _do(self, cell: int) -> Tuple[float, int, int]:
+        """
+        蛇头移动到cell
+
+        Returns:
+            (本步奖励, 被移走的蛇尾格子（吃到食物时为-1）, cell原来的时钟记录)
+        """
+        body = self._body
+        self._hash ^= self._head_keys[body[0]] ^ self._head_keys[cell] ^ self._link_key(cell, body[0])
+        body.appendleft(cell)
+        self._occupied[cell] = 1
+        stamp = self._entered[cell]
+        self._clock += 1
+        self._entered[cell] = self._clock
+
+        if cell == self._food:
+            self._hash ^= self._food_keys[cell]
+            self._food = -1
+            return SURVIVE_REWARD + FOOD_REWARD, -1, stamp
+
+        tail = body.pop()
+        self._occupied[tail] = 0
+        self._hash ^= self._link_key(body[-1], tail)
+        return SURVIVE_REWARD, tail, stamp
+
+    def _undo(self, cell: int, tail: int, stamp: int):
+        """撤销 _do(cell)"""
+        body = self._body
+        self._clock -= 1
+        self._entered[cell] = stamp
+        if tail < 0:
+            self._food = cell
+            self._hash ^= self._food_keys[cell]
+        else:
+            self._hash ^= self._link_key(body[-1], tail)
+            body.append(tail)
+            self._occupied[tail] = 1
+
+        body.popleft()
+        self._occupied[cell] = 0
+        self._hash ^= self._head_keys[cell] ^ self._link_key(cell, body[0]) ^ self._head_keys[body[0]]
+
+    def _reachable(self, limit: int) -> Tuple[int, int]:
+        """
+        从蛇头出发做洪水填充（最多数到limit格）
+
+        Returns:
+            (可达空闲格子数, 与可达区域相邻的蛇身段中最早移走的还需几步)
+        """
+        self._generation += 1
+        if self._generation >= 0xFFFFFFFF:
+            self._visit_mark = array('I', [0]) * len(self._visit_mark)
+            self._generation = 1
+        generation = self._generation
+        mark = self._visit_mark
+        occupied = self._occupied
+        entered = self._entered
+        neighbors = self.neighbors
+        queue = self._queue
+
+        # 下标为i的蛇身段还要 length - i 步才会移走
+        release_base = len(self._body) - self._clock
+        release = len(self._body) + 1
+
+        head = self._body[0]
+        mark[head] = generation
+        queue[0] = head
+        read, write = 0, 1
+        count = 0
+        while read < write and count < limit:
+            current = queue[read]
+            read += 1
+            for neighbor in neighbors[current]:
+                if mark[neighbor] == generation:
+                    continue
+                if occupied[neighbor]:
+                    steps = release_base + entered[neighbor]
+                    if steps < release:
+                        release = steps
+                    continue
+                mark[neighbor] = generation
+                queue[write] = neighbor
+                write += 1
+                count += 1
+        return count, release
@@ -30,6 +30,30 @@ class AudioSystem:
                 print(f"音频初始化失败: {e}")
                 self.enabled = False
     
+        # 配置热重载：音量和开关无需重启
+        game_config.subscribe("audio", self.on_config_changed)
+    
+    def on_config_changed(self, changes: Dict[str, object]):
+        """响应音效配置的变化"""
+        self.master_volume = game_config.get("audio.master_volume", 0.7)
+        self.sfx_volume = game_config.get("audio.sfx_volume", 0.8)
+        self.music_volume = game_config.get("audio.music_volume", 0.5)
+        if hasattr(self, 'background_music'):
+            self.background_music.set_volume(self.music_volume * self.master_volume)
+        
+        enabled = game_config.get("audio.enable_sound", True)
+        if enabled != self.enabled:
+            self.enabled = enabled
+            if not enabled:
+                self.stop_background_music()
+            elif not self.sounds:
+                try:
+                    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+                    self.generate_sounds()
+                except pygame.error as e:
+                    print(f"音频初始化失败: {e}")
+                    self.enabled = False
+    
     def generate_sounds(self):
         """生成程序化音效"""
         if not self.enabled:
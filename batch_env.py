@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+批量游戏环境
+用NumPy数组同时推进N局贪吃蛇，规则与SnakeEngine.move完全一致，用于策略评估
+"""
+
+import numpy as np
+from typing import Optional
+from game_engine import Direction, OPPOSITE_DIRECTION
+
+# 动作编号与Direction枚举的对应关系：0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+DIRECTIONS = list(Direction)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+_DX = np.array([direction.value[0] for direction in DIRECTIONS], dtype=np.int64)
+_DY = np.array([direction.value[1] for direction in DIRECTIONS], dtype=np.int64)
+_OPPOSITE = np.array([DIRECTION_INDEX[OPPOSITE_DIRECTION[direction]] for direction in DIRECTIONS],
+                     dtype=np.int64)
+
+class BatchSnakeEnv:
+    """
+    批量贪吃蛇环境
+
+    所有状态都保存为NumPy数组，格子使用 y * grid_width + x 的扁平编号：
+    heads（蛇头）、body（环形缓冲区，head_ptr指向蛇头）、length（长度）、
+    occupied（占用表）、food（食物，棋盘填满时为-1）、scores、done、won。
+    """
+
+    def __init__(self, num_envs: int, grid_width: int, grid_height: int,
+                 seed: Optional[int] = None):
+        """
+        初始化批量环境
+
+        Args:
+            num_envs: 同时运行的游戏数量
+            grid_width: 网格宽度（格子数）
+            grid_height: 网格高度（格子数）
+            seed: 随机种子（用于食物生成）
+        """
+        self.num_envs = num_envs
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.cell_count = grid_width * grid_height
+        self.rng = np.random.default_rng(seed)
+
+        self._env_index = np.arange(num_envs)
+        self.body = np.zeros((num_envs, self.cell_count), dtype=np.int32)
+        self.occupied = np.zeros((num_envs, self.cell_count), dtype=np.uint8)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.ones(num_envs, dtype=np.int64)
+        self.heads = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.full(num_envs, -1, dtype=np.int64)
+        self.directions = np.full(num_envs, DIRECTION_INDEX[Direction.RIGHT], dtype=np.int64)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.move_counts = np.zeros(num_envs, dtype=np.int64)
+        self.done = np.zeros(num_envs, dtype=bool)
+        self.won = np.zeros(num_envs, dtype=bool)
+
+        # 最近一步的事件
+        self.last_ate = np.zeros(num_envs, dtype=bool)
+        self.last_collision = np.zeros(num_envs, dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None):
+        """
+        重置游戏
+
+        Args:
+            mask: 需要重置的游戏（布尔数组），None表示全部重置
+        """
+        if mask is None:
+            envs = self._env_index
+        else:
+            envs = self._env_index[np.asarray(mask, dtype=bool)]
+        if len(envs) == 0:
+            return
+
+        # 蛇的初始位置（中心）
+        center = (self.grid_height // 2) * self.grid_width + self.grid_width // 2
+        self.occupied[envs] = 0
+        self.occupied[envs, center] = 1
+        self.body[envs, 0] = center
+        self.head_ptr[envs] = 0
+        self.length[envs] = 1
+        self.heads[envs] = center
+        self.directions[envs] = DIRECTION_INDEX[Direction.RIGHT]
+        self.scores[envs] = 0
+        self.move_counts[envs] = 0
+        self.done[envs] = False
+        self.won[envs] = False
+        self.last_ate[envs] = False
+        self.last_collision[envs] = False
+
+        self._spawn_food(envs)
+
+    def _spawn_food(self, envs: np.ndarray):
+        """在指定游戏的空闲格子中均匀随机生成食物，没有空闲格子时判定胜利"""
+        free = self.occupied[envs] == 0
+        free_counts = free.sum(axis=1)
+
+        full = free_counts == 0
+        if full.any():
+            full_envs = envs[full]
+            self.food[full_envs] = -1
+            self.won[full_envs] = True
+            self.done[full_envs] = True
+
+        envs = envs[~full]
+        if len(envs) == 0:
+            return
+        free = free[~full]
+        free_counts = free_counts[~full]
+
+        # 在每局的空闲格子中选第rank个
+        rank = (self.rng.random(len(envs)) * free_counts).astype(np.int64)
+        cumulative = np.cumsum(free, axis=1)
+        self.food[envs] = np.argmax(cumulative > rank[:, None], axis=1)
+
+    def step(self, actions) -> np.ndarray:
+        """
+        所有游戏同时移动一步（已结束的游戏保持不变）
+
+        Args:
+            actions: 每局的动作编号（见DIRECTIONS），长度为num_envs
+
+        Returns:
+            布尔数组：每局游戏是否继续
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        active = ~self.done
+
+        # 防止蛇反向移动
+        reverse = (self.length > 1) & (actions == _OPPOSITE[self.directions])
+        actions = np.where(reverse | ~active, self.directions, actions)
+        self.directions = actions
+
+        # 计算下一个位置
+        next_x = self.heads % self.grid_width + _DX[actions]
+        next_y = self.heads // self.grid_width + _DY[actions]
+        in_bounds = ((next_x >= 0) & (next_x < self.grid_width) &
+                     (next_y >= 0) & (next_y < self.grid_height))
+        next_cell = np.where(in_bounds, next_y * self.grid_width + next_x, 0)
+
+        # 检查碰撞（与SnakeEngine一致：当前蛇尾也算障碍）
+        hit = ~in_bounds | (self.occupied[self._env_index, next_cell] == 1)
+        collision = active & hit
+        moving = active & ~hit
+        ate = moving & (next_cell == self.food)
+
+        # 没吃到食物的游戏移除蛇尾
+        shrink = self._env_index[moving & ~ate]
+        tail_ptr = (self.head_ptr[shrink] - self.length[shrink] + 1) % self.cell_count
+        self.occupied[shrink, self.body[shrink, tail_ptr]] = 0
+
+        # 移动蛇头
+        movers = self._env_index[moving]
+        self.head_ptr[movers] = (self.head_ptr[movers] + 1) % self.cell_count
+        self.body[movers, self.head_ptr[movers]] = next_cell[movers]
+        self.occupied[movers, next_cell[movers]] = 1
+        self.heads[movers] = next_cell[movers]
+        self.move_counts[movers] += 1
+
+        # 吃到食物：增长、得分、生成新食物
+        eaters = self._env_index[ate]
+        self.length[eaters] += 1
+        self.scores[eaters] += 1
+        self._spawn_food(eaters)
+
+        self.done |= collision
+        self.last_ate = ate
+        self.last_collision = collision
+        return moving & ~self.done
+
+    def get_snake(self, env: int) -> list:
+        """获取某一局的蛇身坐标列表（头在前）"""
+        offsets = np.arange(self.length[env])
+        cells = self.body[env, (self.head_ptr[env] - offsets) % self.cell_count]
+        return [(int(cell) % self.grid_width, int(cell) // self.grid_width) for cell in cells]
+
+    def get_game_state(self, env: int) -> dict:
+        """获取某一局的游戏状态，格式与SnakeEngine.get_game_state相同"""
+        food = int(self.food[env])
+        return {
+            'snake': self.get_snake(env),
+            'food': None if food < 0 else (food % self.grid_width, food // self.grid_width),
+            'direction': DIRECTIONS[int(self.directions[env])],
+            'score': int(self.scores[env]),
+            'game_over': bool(self.done[env]),
+            'won': bool(self.won[env]),
+            'move_count': int(self.move_counts[env]),
+            'grid_width': self.grid_width,
+            'grid_height': self.grid_height
+        }
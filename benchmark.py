@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+性能基准测试
+对比关键算法优化前后的耗时
+
+用法:
+  python benchmark.py          # 运行全部基准
+  python benchmark.py astar    # 只运行A*寻路基准
+"""
+
+import heapq
+import random
+import sys
+import time
+from typing import List, Tuple, Optional, Set
+from game_engine import SnakeEngine, Direction
+from ai_controller import AIController
+
+def legacy_a_star(width: int, height: int, start: Tuple[int, int], goal: Tuple[int, int],
+                  obstacles: Set[Tuple[int, int]]) -> Optional[List[Tuple[int, int]]]:
+    """旧版A*实现（每次入堆都复制整条路径），仅作为对照"""
+    if start == goal:
+        return [start]
+
+    open_set = [(0, 0, start, [start])]
+    closed_set = set()
+
+    while open_set:
+        _, g_score, current, path = heapq.heappop(open_set)
+        if current in closed_set:
+            continue
+        closed_set.add(current)
+        if current == goal:
+            return path
+
+        for direction in Direction:
+            dx, dy = direction.value
+            next_pos = (current[0] + dx, current[1] + dy)
+            if (next_pos[0] < 0 or next_pos[0] >= width or
+                next_pos[1] < 0 or next_pos[1] >= height):
+                continue
+            if next_pos in obstacles or next_pos in closed_set:
+                continue
+            new_g_score = g_score + 1
+            h_score = abs(next_pos[0] - goal[0]) + abs(next_pos[1] - goal[1])
+            heapq.heappush(open_set, (new_g_score + h_score, new_g_score, next_pos, path + [next_pos]))
+
+    return None
+
+def legacy_simulate_move(game: SnakeEngine, direction: Direction) -> int:
+    """旧版可达空间计算（list.pop(0) 队列 + 每次新建集合），仅作为对照"""
+    next_pos = game.get_next_position(direction)
+    if not game.is_valid_position(next_pos):
+        return 0
+
+    visited = set(game.snake)
+    if next_pos != game.food:
+        visited.discard(game.snake[-1])
+    visited.add(next_pos)
+
+    queue = [next_pos]
+    reachable_count = 0
+    while queue:
+        current = queue.pop(0)
+        for direction_check in Direction:
+            dx, dy = direction_check.value
+            neighbor = (current[0] + dx, current[1] + dy)
+            if (0 <= neighbor[0] < game.grid_width and
+                0 <= neighbor[1] < game.grid_height and
+                neighbor not in visited):
+                visited.add(neighbor)
+                queue.append(neighbor)
+                reachable_count += 1
+    return reachable_count
+
+def serpentine_snake(width: int, height: int) -> List[Tuple[int, int]]:
+    """生成一条在上半个棋盘来回折返、占满上半部分的长蛇（头在前）"""
+    body = []
+    for y in range(height // 2):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        body.extend((x, y) for x in xs)
+    body.reverse()
+    return body
+
+def serpentine_obstacles(width: int, height: int) -> Set[Tuple[int, int]]:
+    """生成蛇形墙壁（类似盘满棋盘的长蛇），使路径长度接近格子总数的一半"""
+    obstacles = set()
+    for y in range(1, height - 1, 2):
+        gap_x = width - 1 if (y // 2) % 2 == 0 else 0
+        for x in range(width):
+            if x != gap_x:
+                obstacles.add((x, y))
+    return obstacles
+
+def time_call(func, repeat: int) -> float:
+    """返回多次调用的平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def benchmark_astar():
+    """A*寻路：路径复制版 vs 父指针版"""
+    print("\n🧭 A*寻路基准 (起点左上角 → 终点右下角)")
+    print(f"{'网格':>10} {'障碍':>6} {'路径长度':>8} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    rng = random.Random(42)
+    cases = [(20, 15), (40, 30), (100, 100), (200, 200)]
+    for width, height in cases:
+        start, goal = (0, 0), (width - 1, height - 1)
+        layouts = {
+            "随机": {(rng.randrange(width), rng.randrange(height))
+                     for _ in range(width * height // 10)} - {start, goal},
+            "蛇形": serpentine_obstacles(width, height),
+        }
+        ai = AIController(SnakeEngine(width, height))
+        for name, obstacles in layouts.items():
+            repeat = max(1, 20000 // (width * height))
+            new_path = ai.a_star_pathfinding(start, goal, obstacles)
+            old_path = legacy_a_star(width, height, start, goal, obstacles)
+            assert (new_path is None) == (old_path is None)
+            assert new_path is None or len(new_path) == len(old_path)
+
+            old_ms = time_call(lambda: legacy_a_star(width, height, start, goal, obstacles), repeat)
+            new_ms = time_call(lambda: ai.a_star_pathfinding(start, goal, obstacles), repeat)
+            length = len(new_path) if new_path else 0
+            print(f"{width:>4}x{height:<5} {name:>6} {length:>8} {old_ms:>10.2f} {new_ms:>10.2f} "
+                  f"{old_ms / new_ms:>6.1f}x")
+
+def benchmark_flood_fill():
+    """可达空间：四个方向各做一次BFS vs 一次连通块标记"""
+    print("\n🌊 可达空间基准 (每帧评估全部四个方向)")
+    print(f"{'网格':>10} {'蛇长':>6} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    for width, height in [(20, 15), (40, 30), (100, 100)]:
+        game = SnakeEngine(width, height)
+        game.set_snake(serpentine_snake(width, height))
+        game.food = (width - 1, height - 1)
+        ai = AIController(game)
+        for direction in Direction:
+            assert ai.simulate_move(direction) == legacy_simulate_move(game, direction)
+
+        repeat = max(1, 50000 // (width * height))
+
+        def fresh_areas():
+            ai._area_cache_key = None  # 模拟每帧状态都在变化
+            return [ai.simulate_move(direction) for direction in Direction]
+
+        old_ms = time_call(lambda: [legacy_simulate_move(game, d) for d in Direction], repeat)
+        new_ms = time_call(fresh_areas, repeat)
+        print(f"{width:>4}x{height:<5} {len(game.snake):>6} {old_ms:>10.2f} {new_ms:>10.2f} "
+              f"{old_ms / new_ms:>6.1f}x")
+
+def benchmark_food_field():
+    """每步重新寻路到食物：曼哈顿启发 vs 食物距离场启发"""
+    print("\n🗺️  食物距离场基准 (重放一局哈密顿对局，每步都重新寻路到食物)")
+    print(f"{'网格':>10} {'步数':>6} {'曼哈顿(ms)':>11} {'距离场(ms)':>11} {'加速比':>7}")
+
+    for width, height in [(20, 15), (40, 30)]:
+        random.seed(7)
+        game = SnakeEngine(width, height)
+        ai = AIController(game)
+        moves = []
+        # 哈密顿策略会把棋盘填得很满，蛇身挡路时曼哈顿距离严重低估
+        while not game.game_over and len(moves) < 20000:
+            moves.append(ai.hamiltonian_strategy())
+            game.move(moves[-1])
+
+        def replay(use_field):
+            """重放同一局，返回每步平均寻路耗时和路径长度"""
+            random.seed(7)
+            replay_game = SnakeEngine(width, height)
+            replay_ai = AIController(replay_game)
+            elapsed = 0.0
+            lengths = []
+            for direction in moves:
+                head_x, head_y = replay_game.snake[0]
+                tail_x, tail_y = replay_game.snake[-1]
+                food_x, food_y = replay_game.food
+                blocked = bytearray(replay_game.get_occupancy())
+                blocked[tail_y * width + tail_x] = 0
+                start = time.perf_counter()
+                if use_field:
+                    path = replay_ai.food_path(head_y * width + head_x, blocked)
+                else:
+                    path = replay_ai.a_star_cells(head_y * width + head_x, food_y * width + food_x,
+                                                  blocked)
+                elapsed += time.perf_counter() - start
+                lengths.append(len(path) if path else 0)
+                replay_game.move(direction)
+            return elapsed * 1000 / len(moves), lengths
+
+        old_ms, old_lengths = replay(False)
+        new_ms, new_lengths = replay(True)
+        assert old_lengths == new_lengths
+        print(f"{width:>4}x{height:<5} {len(moves):>6} {old_ms:>11.3f} {new_ms:>11.3f} "
+              f"{old_ms / new_ms:>6.1f}x")
+
+def legacy_draw_background(game):
+    """旧版背景绘制（每帧逐行画渐变、再画网格线），仅作为对照"""
+    import math
+    import pygame
+
+    for y in range(game.height):
+        color_ratio = y / game.height
+        r = int(10 * (1 - color_ratio) + 30 * color_ratio)
+        g = int(10 * (1 - color_ratio) + 20 * color_ratio)
+        b = int(30 * (1 - color_ratio) + 50 * color_ratio)
+        pygame.draw.line(game.screen, (r, g, b), (0, y), (game.width, y))
+    for star_x, star_y, brightness in game.background_stars:
+        alpha = int(brightness * (0.5 + 0.5 * math.sin(time.time() * 2 + star_x * 0.01)))
+        pygame.draw.circle(game.screen, (alpha, alpha, alpha), (star_x, star_y), 1)
+    for x in range(0, game.width, game.cell_size):
+        pygame.draw.line(game.screen, game.DARK_GRAY, (x, 0), (x, game.height))
+    for y in range(0, game.height, game.cell_size):
+        pygame.draw.line(game.screen, game.DARK_GRAY, (0, y), (game.width, y))
+
+def make_render_game(width: int, height: int):
+    """创建用于渲染基准的游戏实例（无窗口环境下使用dummy驱动）"""
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from snake_game import SnakeGame
+
+    game = SnakeGame(width, height, 20)
+    game.engine.set_snake(serpentine_snake(game.grid_width, 6))
+    return game
+
+def benchmark_background():
+    """背景渲染：逐行渐变 vs 缓存背景层"""
+    print("\n🖼️  背景渲染基准 (每帧耗时)")
+    print(f"{'窗口':>10} {'项目':>6} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    for width, height in [(800, 600), (1920, 1080)]:
+        game = make_render_game(width, height)
+        repeat = 100
+        old_bg = time_call(lambda: legacy_draw_background(game), repeat)
+        new_bg = time_call(game.draw_background, repeat)
+        new_frame = time_call(game.draw, repeat)
+        game.draw_background = lambda: legacy_draw_background(game)
+        old_frame = time_call(game.draw, repeat)
+        print(f"{width:>4}x{height:<5} {'背景':>6} {old_bg:>10.2f} {new_bg:>10.2f} {old_bg / new_bg:>6.1f}x")
+        print(f"{width:>4}x{height:<5} {'整帧':>6} {old_frame:>10.2f} {new_frame:>10.2f} "
+              f"{old_frame / new_frame:>6.1f}x")
+
+class LegacyParticle:
+    """旧版粒子对象（每帧重建速度元组），仅作为对照"""
+
+    def __init__(self, x, y, color, velocity, lifetime):
+        self.x, self.y = x, y
+        self.color = color
+        self.velocity = velocity
+        self.lifetime = self.max_lifetime = lifetime
+        self.size = random.uniform(2, 6)
+
+    def update(self, dt):
+        self.x += self.velocity[0] * dt
+        self.y += self.velocity[1] * dt
+        self.lifetime -= dt
+        self.velocity = (self.velocity[0], self.velocity[1] + 200 * dt)
+
+def legacy_particle_frame(game, particles, dt):
+    """旧版粒子的一帧：重建列表、逐个更新、每个粒子新建一个Surface"""
+    import math
+    import pygame
+
+    particles[:] = [p for p in particles if p.lifetime > 0]
+    for particle in particles:
+        particle.update(dt)
+    for particle in particles:
+        if particle.lifetime > 0:
+            surface = pygame.Surface((int(particle.size * 2), int(particle.size * 2)))
+            surface.set_alpha(int(255 * particle.lifetime / particle.max_lifetime))
+            pygame.draw.circle(surface, particle.color, (int(particle.size), int(particle.size)),
+                               int(particle.size))
+            game.screen.blit(surface, (int(particle.x - particle.size), int(particle.y - particle.size)))
+
+def benchmark_particles():
+    """粒子系统：对象列表 vs NumPy粒子池"""
+    import math
+    from particle_system import ParticleSystem
+
+    print("\n🎆 粒子系统基准 (每帧更新 + 绘制)")
+    print(f"{'粒子数':>8} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    game = make_render_game(800, 600)
+    colors = [game.RED, game.ORANGE, game.YELLOW, game.WHITE]
+    dt = 1 / 600  # 很小的步长，保证测试期间粒子都存活
+    for count in [100, 1000, 5000]:
+        legacy = []
+        for _ in range(count):
+            angle = random.uniform(0, 2 * math.pi)
+            speed = random.uniform(100, 300)
+            legacy.append(LegacyParticle(400, 300, random.choice(colors),
+                                         (math.cos(angle) * speed, math.sin(angle) * speed), 1000.0))
+        pool = ParticleSystem(count)
+        pool.emit(400, 300, count, colors, speed=(100, 300), lifetime=(1000.0, 1000.0))
+
+        def pool_frame():
+            pool.update(dt)
+            pool.draw(game.screen)
+
+        repeat = 20
+        old_ms = time_call(lambda: legacy_particle_frame(game, legacy, dt), repeat)
+        new_ms = time_call(pool_frame, repeat)
+        print(f"{count:>8} {old_ms:>10.2f} {new_ms:>10.2f} {old_ms / new_ms:>6.1f}x")
+
+def legacy_draw_food(game):
+    """旧版食物绘制（每帧为每层发光圈新建一个Surface），仅作为对照"""
+    import math
+    import pygame
+
+    food_x, food_y = game.food
+    center_x = food_x * game.cell_size + game.cell_size // 2
+    center_y = food_y * game.cell_size + game.cell_size // 2
+    pulse_size = int(game.cell_size // 2 + 5 * math.sin(game.food_pulse))
+    for radius in range(pulse_size + 10, pulse_size, -2):
+        alpha = int(100 * (1 - (radius - pulse_size) / 10))
+        glow_surface = pygame.Surface((radius * 2, radius * 2))
+        glow_surface.set_alpha(alpha)
+        pygame.draw.circle(glow_surface, game.ORANGE, (radius, radius), radius)
+        game.screen.blit(glow_surface, (center_x - radius, center_y - radius))
+    pygame.draw.circle(game.screen, game.RED, (center_x, center_y), pulse_size)
+    pygame.draw.circle(game.screen, game.GOLD, (center_x, center_y), pulse_size - 2)
+    pygame.draw.circle(game.screen, game.WHITE, (center_x, center_y), pulse_size, 2)
+
+def benchmark_food():
+    """食物绘制：每帧新建发光圈Surface vs 缓存的精灵"""
+    print("\n🍎 食物绘制基准 (一个完整脉冲周期的平均每帧耗时)")
+    print(f"{'格子':>6} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    game = make_render_game(800, 600)
+    for cell_size in [20, 40]:
+        game.cell_size = cell_size
+        phases = [i * 0.1 for i in range(63)]
+
+        def frames(draw):
+            for phase in phases:
+                game.food_pulse = phase
+                draw()
+
+        repeat = 10
+        old_ms = time_call(lambda: frames(lambda: legacy_draw_food(game)), repeat) / len(phases)
+        new_ms = time_call(lambda: frames(game.draw_food), repeat) / len(phases)
+        print(f"{cell_size:>6} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+def legacy_trail_frame(game, trail, current_time):
+    """旧版轨迹的一帧：列表推导过滤过期项、每个轨迹格新建一个Surface，仅作为对照"""
+    import pygame
+
+    trail[:] = [(pos, t) for pos, t in trail if current_time - t < 0.5]
+    for pos, timestamp in trail:
+        age = current_time - timestamp
+        if age < 0.5:
+            x, y = pos
+            rect = pygame.Rect(x * game.cell_size + 2, y * game.cell_size + 2,
+                               game.cell_size - 4, game.cell_size - 4)
+            trail_surface = pygame.Surface((game.cell_size - 4, game.cell_size - 4))
+            trail_surface.set_alpha(int(100 * (1 - age / 0.5)))
+            trail_surface.fill(game.CYAN)
+            game.screen.blit(trail_surface, rect)
+
+def benchmark_trail():
+    """轨迹效果：每帧新建Surface vs 环形缓冲区 + 分档贴图"""
+    print("\n✨ 轨迹绘制基准 (每帧绘制)")
+    print(f"{'轨迹格':>8} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    game = make_render_game(800, 600)
+    # 固定"当前时间"，让两边在测试期间绘制相同年龄分布的轨迹
+    now = time.time()
+    game.frame_time = now
+    for count in [15, 30, 60]:
+        entries = [((i % game.grid_width, i // game.grid_width), now - 0.49 + i * 0.49 / count)
+                   for i in range(count)]
+        legacy = list(entries)
+        game.trail_positions.clear()
+        game.trail_positions.extend(entries)
+
+        repeat = 200
+        old_ms = time_call(lambda: legacy_trail_frame(game, legacy, now), repeat)
+        new_ms = time_call(game.draw_trail, repeat)
+        print(f"{count:>8} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+def benchmark_text():
+    """界面文字：每帧 font.render vs 共享文字缓存"""
+    from render_cache import text_cache
+
+    print("\n🔤 界面文字基准 (draw_ui 每帧耗时)")
+    print(f"{'项目':>8} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    game = make_render_game(800, 600)
+    game.last_score = 12
+
+    def uncached_draw_ui():
+        text_cache.clear()
+        game.draw_ui()
+
+    repeat = 200
+    old_ms = time_call(uncached_draw_ui, repeat)
+    new_ms = time_call(game.draw_ui, repeat)
+    print(f"{'draw_ui':>8} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+def benchmark_config():
+    """配置读取：点号路径逐层查字典 vs 不可变配置快照"""
+    from config import game_config, LANGUAGES
+
+    print("\n⚙️  配置读取基准 (每次调用的耗时)")
+    print(f"{'项目':>10} {'旧版(us)':>10} {'新版(us)':>10} {'加速比':>7}")
+
+    def legacy_get_text(key):
+        current_lang = game_config.get("language.current", "zh_CN")
+        return LANGUAGES.get(current_lang, LANGUAGES["zh_CN"]).get(key, key)
+
+    def snapshot_get_text(key):
+        return LANGUAGES.get(game_config.snapshot.language.current, LANGUAGES["zh_CN"]).get(key, key)
+
+    cases = [
+        ("视觉开关", lambda: game_config.get("visual.enable_particles", True),
+         lambda: game_config.snapshot.visual.enable_particles),
+        ("界面文字", lambda: legacy_get_text("score"), lambda: snapshot_get_text("score")),
+    ]
+    repeat = 100000
+    for name, old, new in cases:
+        assert old() == new()
+        old_us = time_call(old, repeat) * 1000
+        new_us = time_call(new, repeat) * 1000
+        print(f"{name:>10} {old_us:>10.3f} {new_us:>10.3f} {old_us / new_us:>6.1f}x")
+
+def benchmark_stats():
+    """统计持久化：每局重写整个JSON vs 追加日志（定期压缩）"""
+    import json
+    import os
+    import tempfile
+    from game_stats import GameStats
+
+    print("\n📊 统计持久化基准 (分数历史已满1000条时每局结束的耗时)")
+    print(f"{'项目':>10} {'旧版(ms)':>10} {'新版(ms)':>10} {'加速比':>7}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stats = GameStats(os.path.join(temp_dir, "stats.json"))
+        for score in range(1000):
+            stats.start_game()
+            stats.end_game(score % 50, score % 50 + 1)
+
+        def legacy_end_game():
+            stats.start_game()
+            stats.end_game(10, 11)
+            with open(stats.stats_file, 'w', encoding='utf-8') as f:
+                json.dump(stats.all_time_stats, f, indent=4, ensure_ascii=False)
+
+        def logged_end_game():
+            stats.start_game()
+            stats.end_game(10, 11)
+
+        repeat = 400
+        old_ms = time_call(legacy_end_game, repeat)
+        new_ms = time_call(logged_end_game, repeat)
+        print(f"{'end_game':>10} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+def benchmark_stats_sqlite(games=1_000_000):
+    """SQLite统计后端：百万局历史上的查询，全表扫描（+列名绕过索引） vs 索引/汇总表"""
+    import os
+    import random
+    import tempfile
+    from game_stats import SQLiteGameStats
+
+    print(f"\n🗄️  SQLite统计基准 ({games}局历史)")
+    print(f"{'查询':>10} {'扫描(ms)':>10} {'索引(ms)':>10} {'加速比':>7}")
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stats = SQLiteGameStats(os.path.join(temp_dir, "stats.db"))
+        with stats.connection:
+            stats.connection.executemany(
+                "INSERT INTO games (score, length, duration, moves, timestamp, day) VALUES (?, ?, ?, ?, ?, ?)",
+                ((score, score + 1, 30.0, 100, f"2025-01-{day:02d}T12:00:00", f"2025-01-{day:02d}")
+                 for score, day in ((rng.randint(0, 300), rng.randint(1, 28)) for _ in range(games))))
+            stats.connection.execute(
+                "INSERT INTO daily SELECT day, COUNT(*), SUM(score), MAX(score) FROM games GROUP BY day")
+            stats.connection.execute(
+                "INSERT INTO score_counts SELECT score, COUNT(*) FROM games GROUP BY score")
+        stats.all_time_stats = stats.load_stats()
+        connection = stats.connection
+
+        # 每项：名称、全表扫描、索引/汇总表查询，两者的结果先化成同样的形式再比较
+        cases = [
+            ("best10",
+             lambda: [score for score, in connection.execute(
+                 "SELECT score FROM games ORDER BY +score DESC LIMIT 10")],
+             lambda: [record["score"] for record in stats.get_best_scores(10)]),
+            ("p99",
+             lambda: connection.execute("SELECT score FROM games ORDER BY +score LIMIT 1 OFFSET ?",
+                                        (round(0.99 * (games - 1)),)).fetchone()[0],
+             lambda: stats.get_score_percentile(99)),
+            ("day",
+             lambda: connection.execute("SELECT COUNT(*), SUM(score), MAX(score) FROM games "
+                                        "WHERE +day = '2025-01-15'").fetchone(),
+             lambda: tuple(stats.get_daily_stats("2025-01-15").values())),
+        ]
+        for name, scan, indexed in cases:
+            assert scan() == indexed(), name
+            old_ms = time_call(scan, 3)
+            new_ms = time_call(indexed, 20)
+            print(f"{name:>10} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+        def end_game():
+            stats.start_game()
+            stats.end_game(10, 11)
+
+        print(f"{'end_game':>10} {'-':>10} {time_call(end_game, 50):>10.3f}")
+        stats.close()
+
+def benchmark_render_mode():
+    """整帧渲染：整屏重绘 vs 脏矩形"""
+    from ai_controller import AIController
+
+    print("\n🧩 渲染模式基准 (AI对局中的平均每帧耗时，不含粒子帧)")
+    print(f"{'窗口':>10} {'full(ms)':>10} {'dirty(ms)':>10} {'加速比':>7}")
+
+    for width, height in [(800, 600), (1920, 1080)]:
+        game = make_render_game(width, height)
+        random.seed(5)
+        game.engine.reset()
+        ai = AIController(game)
+        # 预先跑出一段对局的方向序列，两种模式重放同样的对局，每步画两帧（插值一半和到位）
+        moves = []
+        for _ in range(300):
+            if game.game_over:
+                break
+            moves.append(ai.get_best_direction())
+            game.engine.move(moves[-1])
+
+        def frames(mode):
+            random.seed(5)
+            game.engine.reset()
+            game.render_mode = mode
+            game.invalidate_background()
+            for direction in moves:
+                game.engine.move(direction)
+                game.draw(0.5)
+                game.draw(1.0)
+
+        old_ms = time_call(lambda: frames("full"), 3) / (2 * len(moves))
+        new_ms = time_call(lambda: frames("dirty"), 3) / (2 * len(moves))
+        print(f"{width:>4}x{height:<5} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+BENCHMARKS = {
+    "astar": benchmark_astar,
+    "flood": benchmark_flood_fill,
+    "food_field": benchmark_food_field,
+    "background": benchmark_background,
+    "particles": benchmark_particles,
+    "food": benchmark_food,
+    "trail": benchmark_trail,
+    "text": benchmark_text,
+    "config": benchmark_config,
+    "stats": benchmark_stats,
+    "stats_sqlite": benchmark_stats_sqlite,
+    "render": benchmark_render_mode,
+}
+
+def main():
+    """运行基准测试"""
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"未知基准: {name}，可选: {', '.join(BENCHMARKS)}")
+            continue
+        BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,152 @@
 """
 
 import os
+import copy
 import json
-from typing import Dict, Any
+import time
+import atexit
+import inspect
+import tempfile
+import threading
+import weakref
+from dataclasses import dataclass, fields
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# 配置快照：每个配置分组对应一个不可变的数据类，字段与默认配置的键一一对应。
+# 热路径（每步、每帧）通过属性读取快照，不再按点号路径逐层查字典。
+
+@dataclass(frozen=True, slots=True)
+class WindowConfig:
+    width: int
+    height: int
+    title: str
+    cell_size: int
+
+@dataclass(frozen=True, slots=True)
+class PerformanceConfig:
+    fps: int
+    render_fps: int
+    turbo: int
+    max_steps_per_frame: int
+    auto_restart_delay: float
+    particle_limit: int
+
+@dataclass(frozen=True, slots=True)
+class VisualConfig:
+    enable_particles: bool
+    enable_trail: bool
+    enable_glow: bool
+    enable_stars: bool
+    star_count: int
+    enable_grid: bool
+    render_mode: str
+
+@dataclass(frozen=True, slots=True)
+class AIConfig:
+    algorithm: str
+    difficulty: str
+    think_time: float
+    async_planner: bool
+    deadline_ms: float
+    lookahead_time_ms: float
+    lookahead_max_depth: int
+    lookahead_table_size: int
+    rollouts: int
+    rollout_depth: int
+    rollout_workers: int
+    rollout_timeout_ms: float
+
+@dataclass(frozen=True, slots=True)
+class ColorsConfig:
+    theme: str
+    snake_head: Tuple[int, int, int]
+    snake_body: Tuple[int, int, int]
+    food: Tuple[int, int, int]
+    background: Tuple[int, int, int]
+
+@dataclass(frozen=True, slots=True)
+class AudioConfig:
+    enable_sound: bool
+    master_volume: float
+    sfx_volume: float
+    music_volume: float
+
+@dataclass(frozen=True, slots=True)
+class StatsConfig:
+    save_stats: bool
+    stats_file: str
+    backend: str
+    db_file: str
+
+@dataclass(frozen=True, slots=True)
+class LanguageConfig:
+    current: str
+    auto_detect: bool
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """某一时刻的完整配置（不可变，配置变化时整体替换）"""
+    window: WindowConfig
+    performance: PerformanceConfig
+    visual: VisualConfig
+    ai: AIConfig
+    colors: ColorsConfig
+    audio: AudioConfig
+    stats: StatsConfig
+    language: LanguageConfig
+
+def _freeze(value):
+    """把列表转换为元组，使快照中的值不可变"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+_MISSING = object()
+
+def _flatten(config: Dict, prefix: str = "") -> Dict[str, Any]:
+    """把嵌套配置展开为 点号路径 -> 值"""
+    result = {}
+    for key, value in config.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            result.update(_flatten(value, path + "."))
+        else:
+            result[path] = value
+    return result
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """比较两份展开的配置，返回变化的 点号路径 -> 新值（删除的键为None）"""
+    changes = {path: value for path, value in new.items() if old.get(path, _MISSING) != value}
+    changes.update((path, None) for path in old if path not in new)
+    return changes
+
+# 配置修改后延迟多久写盘（秒），期间的多次修改合并为一次写入
+SAVE_DELAY = 0.5
+
+# 检查配置文件是否被外部修改的最短间隔（秒）
+RELOAD_INTERVAL = 0.5
 
 class GameConfig:
-    """游戏配置管理类"""
+    """
+    游戏配置管理类
+
+    set() 只修改内存中的配置并安排一次延迟写盘，连续的修改（如拖动音量
+    滑块）合并为一次写入；未写入的修改在程序退出时写入。写盘先写临时
+    文件再原子替换，中途崩溃不会留下空的或写了一半的配置文件。
+
+    check_for_changes() 由主循环每帧调用，按修改时间发现配置文件被外部
+    修改后重新加载，并把变化的配置项通知给 subscribe() 注册的订阅者；
+    set() 修改配置时同样会通知订阅者。
+    """
     
     def __init__(self, config_file: str = "game_config.json"):
         self.config_file = config_file
+        self._save_lock = threading.RLock()
+        self._save_timer = None
+        self._dirty = False
+        self._subscribers = []
+        self._file_stamp = None
+        self._last_poll = time.monotonic()
         self.default_config = {
             # 游戏窗口设置
             "window": {
@@ -24,7 +162,10 @@ class GameConfig:
             
             # 游戏性能设置
             "performance": {
-                "fps": 10,
+                "fps": 10,  # 模拟速度（每秒移动步数）
+                "render_fps": 60,  # 渲染帧率（蛇头、蛇尾在两步之间插值）
+                "turbo": 1,  # 加速倍数（每帧可推进多步模拟）
+                "max_steps_per_frame": 50,  # 单帧最多推进的模拟步数
                 "auto_restart_delay": 3.0,
                 "particle_limit": 100
             },
@@ -36,14 +177,24 @@ class GameConfig:
                 "enable_glow": True,
                 "enable_stars": True,
                 "star_count": 50,
-                "enable_grid": True
+                "enable_grid": True,
+                "render_mode": "full"  # full（整屏重绘）, dirty（脏矩形，只提交变化区域）
             },
             
             # AI设置
             "ai": {
-                "algorithm": "astar",  # astar, greedy, random
+                "algorithm": "astar",  # astar, greedy, defensive, random, hamiltonian, lookahead, rollout
                 "difficulty": "normal",  # easy, normal, hard
-                "think_time": 0.0  # AI思考延迟（秒）
+                "think_time": 0.0,  # AI思考延迟（秒）
+                "async_planner": False,  # 在后台线程中规划，主循环不被长时间计算阻塞
+                "deadline_ms": 20,  # 后台规划每步的截止时间（毫秒），超时沿上次的路径前进
+                "lookahead_time_ms": 20,  # lookahead策略每步的搜索时间预算（毫秒）
+                "lookahead_max_depth": 64,  # lookahead策略的最大搜索深度
+                "lookahead_table_size": 200000,  # lookahead置换表最多保存的局面数
+                "rollouts": 64,  # rollout策略每个工作进程、每个方向的推演局数
+                "rollout_depth": 40,  # rollout策略每局推演的最大步数
+                "rollout_workers": 0,  # rollout策略的工作进程数（0为自动：CPU核心数，最多4个；1为不开进程）
+                "rollout_timeout_ms": 200  # rollout策略每步等待工作进程的最长时间（毫秒）
             },
             
             # 颜色主题
@@ -66,7 +217,9 @@ class GameConfig:
             # 统计设置
             "stats": {
                 "save_stats": True,
-                "stats_file": "game_stats.json"
+                "stats_file": "game_stats.json",
+                "backend": "json",  # json（快照 + 追加日志）, sqlite（SQLite数据库，保留全部对局）
+                "db_file": "game_stats.db"
             },
             
             # 语言设置
@@ -82,10 +235,14 @@ class GameConfig:
             os.makedirs(config_dir)
 
         self.config = self.load_config()
+        self.snapshot = self.build_snapshot()
+        self._file_stamp = self._stat_file()
 
         # 确保配置文件存在
         if not os.path.exists(self.config_file):
             self.save_config()
+
+        atexit.register(self.flush)
     
     def load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
@@ -95,34 +252,71 @@ class GameConfig:
                     content = f.read().strip()
                     if not content:  # 文件为空
                         print("配置文件为空，使用默认配置")
-                        return self.default_config.copy()
+                        return copy.deepcopy(self.default_config)
                     loaded_config = json.loads(content)
                 # 合并默认配置和加载的配置
                 return self.merge_config(self.default_config, loaded_config)
             except (json.JSONDecodeError, Exception) as e:
                 print(f"加载配置文件失败: {e}，使用默认配置")
-                return self.default_config.copy()
+                return copy.deepcopy(self.default_config)
         else:
             # 创建默认配置文件
             print("配置文件不存在，创建默认配置")
-            return self.default_config.copy()
+            return copy.deepcopy(self.default_config)
     
     def save_config(self):
-        """保存配置文件"""
-        try:
+        """立即保存配置文件（写临时文件后原子替换）"""
+        with self._save_lock:
+            self._dirty = False
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+
             # 确保有配置数据
             if not hasattr(self, 'config') or not self.config:
-                self.config = self.default_config.copy()
+                self.config = copy.deepcopy(self.default_config)
 
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
-            print(f"配置已保存到: {self.config_file}")
-        except Exception as e:
-            print(f"保存配置文件失败: {e}")
+            config_dir = os.path.dirname(os.path.abspath(self.config_file))
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(dir=config_dir, prefix='.config-', suffix='.tmp')
+                # 临时文件默认只有所有者可读写，沿用原文件的权限
+                mode = os.stat(self.config_file).st_mode & 0o777 if os.path.exists(self.config_file) else 0o644
+                os.chmod(temp_path, mode)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.config_file)
+                # 自己写入的文件不算外部修改
+                self._file_stamp = self._stat_file()
+                print(f"配置已保存到: {self.config_file}")
+            except Exception as e:
+                print(f"保存配置文件失败: {e}")
+                if temp_path is not None and os.path.exists(temp_path):
+                    os.remove(temp_path)
+    
+    def schedule_save(self):
+        """安排一次延迟保存（SAVE_DELAY秒内的多次修改只写一次盘）"""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        """立即写入尚未保存的修改"""
+        with self._save_lock:
+            if self._dirty:
+                self.save_config()
+            elif self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
     
     def merge_config(self, default: Dict, loaded: Dict) -> Dict:
         """合并配置，确保所有默认键都存在"""
-        result = default.copy()
+        result = copy.deepcopy(default)
         for key, value in loaded.items():
             if key in result and isinstance(result[key], dict) and isinstance(value, dict):
                 result[key] = self.merge_config(result[key], value)
@@ -130,6 +324,24 @@ class GameConfig:
                 result[key] = value
         return result
     
+    def build_snapshot(self) -> ConfigSnapshot:
+        """
+        根据当前配置构建不可变的配置快照
+
+        缺失或类型不对的分组、键使用默认配置的值。
+        """
+        sections = {}
+        for section in fields(ConfigSnapshot):
+            defaults = self.default_config[section.name]
+            values = self.config.get(section.name)
+            if not isinstance(values, dict):
+                values = defaults
+            sections[section.name] = section.type(**{
+                field.name: _freeze(values.get(field.name, defaults[field.name]))
+                for field in fields(section.type)
+            })
+        return ConfigSnapshot(**sections)
+    
     def get(self, path: str, default=None):
         """获取配置值，支持点号路径如 'window.width'"""
         keys = path.split('.')
@@ -142,20 +354,115 @@ class GameConfig:
             return default
     
     def set(self, path: str, value):
-        """设置配置值"""
+        """设置配置值（延迟写盘，见 schedule_save），并通知订阅者"""
         keys = path.split('.')
-        config = self.config
-        for key in keys[:-1]:
-            if key not in config:
-                config[key] = {}
-            config = config[key]
-        config[keys[-1]] = value
-        self.save_config()
+        with self._save_lock:
+            old = _flatten(self.config)
+            config = self.config
+            for key in keys[:-1]:
+                if key not in config:
+                    config[key] = {}
+                config = config[key]
+            config[keys[-1]] = value
+            self.snapshot = self.build_snapshot()
+            self.schedule_save()
+            changes = _diff(old, _flatten(self.config))
+        self._notify(changes)
     
     def reset_to_default(self):
         """重置为默认配置"""
-        self.config = self.default_config.copy()
-        self.save_config()
+        with self._save_lock:
+            old = _flatten(self.config)
+            self.config = copy.deepcopy(self.default_config)
+            self.snapshot = self.build_snapshot()
+            self.schedule_save()
+            changes = _diff(old, _flatten(self.config))
+        self._notify(changes)
+    
+    def subscribe(self, prefix: str, callback: Callable[[Dict[str, Any]], None]):
+        """
+        订阅配置变化
+
+        绑定方法以弱引用保存，对象被回收后自动取消订阅；普通函数以强引用保存。
+
+        Args:
+            prefix: 配置路径前缀，如 'ai' 或 'audio.master_volume'（空字符串表示全部）
+            callback: 回调函数，参数为变化的 点号路径 -> 新值（只包含匹配前缀的项）
+        """
+        if inspect.ismethod(callback):
+            reference = weakref.WeakMethod(callback)
+        else:
+            reference = lambda: callback
+        self._subscribers.append((prefix, reference))
+    
+    def _notify(self, changes: Dict[str, Any]):
+        """把变化的配置项分发给匹配前缀的订阅者，并清理已回收的订阅"""
+        if not changes:
+            return
+        alive = []
+        for prefix, reference in list(self._subscribers):
+            callback = reference()
+            if callback is None:
+                continue
+            alive.append((prefix, reference))
+            matched = {path: value for path, value in changes.items()
+                       if not prefix or path == prefix or path.startswith(prefix + ".")}
+            if matched:
+                callback(matched)
+        self._subscribers = alive
+    
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        """配置文件的 (修改时间, 大小)，文件不存在时为None"""
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def check_for_changes(self, force: bool = False) -> bool:
+        """
+        检查配置文件是否被外部修改，是则重新加载并通知订阅者
+
+        每 RELOAD_INTERVAL 秒最多检查一次文件状态，其余调用立即返回。
+        文件内容不是合法JSON（如编辑器正在写入）时保留当前配置；本进程
+        还有未写盘的修改时不重新加载，稍后的写盘会覆盖外部修改。
+
+        Args:
+            force: 忽略检查间隔立即检查
+
+        Returns:
+            是否有配置项发生变化
+        """
+        now = time.monotonic()
+        if not force and now - self._last_poll < RELOAD_INTERVAL:
+            return False
+        self._last_poll = now
+
+        stamp = self._stat_file()
+        if stamp is None or stamp == self._file_stamp:
+            return False
+
+        with self._save_lock:
+            if self._dirty:
+                return False
+            self._file_stamp = stamp
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded_config = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"重新加载配置文件失败: {e}，保留当前配置")
+                return False
+            if not isinstance(loaded_config, dict):
+                return False
+
+            old = _flatten(self.config)
+            self.config = self.merge_config(self.default_config, loaded_config)
+            self.snapshot = self.build_snapshot()
+            changes = _diff(old, _flatten(self.config))
+        if changes:
+            print(f"配置文件已重新加载: {', '.join(sorted(changes))}")
+        self._notify(changes)
+        return bool(changes)
 
 # 全局配置实例
 game_config = GameConfig()
@@ -168,6 +475,7 @@ LANGUAGES = {
         "last_score": "上次得分",
         "ai_controlling": "AI控制中...",
         "game_over": "游戏结束!",
+        "victory": "胜利! 蛇填满了棋盘",
         "final_score": "最终得分",
         "restart_hint": "按 R 重新开始 | ESC 退出",
         "paused": "暂停中 - 按SPACE继续",
@@ -181,6 +489,7 @@ LANGUAGES = {
         "last_score": "Last Score",
         "ai_controlling": "AI Controlling...",
         "game_over": "Game Over!",
+        "victory": "Victory! The board is full",
         "final_score": "Final Score",
         "restart_hint": "Press R to Restart | ESC to Exit",
         "paused": "Paused - Press SPACE to Continue",
@@ -192,7 +501,7 @@ LANGUAGES = {
 
 def get_text(key: str) -> str:
     """获取当前语言的文本"""
-    current_lang = game_config.get("language.current", "zh_CN")
+    current_lang = game_config.snapshot.language.current
     return LANGUAGES.get(current_lang, LANGUAGES["zh_CN"]).get(key, key)
 
 # 颜色主题
@@ -230,5 +539,5 @@ COLOR_THEMES = {
 def get_theme_colors(theme_name: str = None) -> Dict[str, tuple]:
     """获取主题颜色"""
     if theme_name is None:
-        theme_name = game_config.get("colors.theme", "default")
+        theme_name = game_config.snapshot.colors.theme
     return COLOR_THEMES.get(theme_name, COLOR_THEMES["default"])
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+无界面游戏引擎
+纯Python实现的贪吃蛇规则核心，不依赖pygame，可用于批量AI评估
+"""
+
+import random
+from array import array
+from collections import deque
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+class Direction(Enum):
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+
+# 反方向对照表
+OPPOSITE_DIRECTION = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT
+}
+
+@lru_cache(maxsize=16)
+def neighbor_table(width: int, height: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    预计算每个格子（y * width + x）的相邻格子编号，按Direction顺序排列
+    
+    Args:
+        width: 网格宽度
+        height: 网格高度
+        
+    Returns:
+        以格子编号为下标的相邻格子元组
+    """
+    table = []
+    for y in range(height):
+        for x in range(width):
+            cells = []
+            for direction in Direction:
+                dx, dy = direction.value
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    cells.append(ny * width + nx)
+            table.append(tuple(cells))
+    return tuple(table)
+
+class SnakeEngine:
+    """
+    贪吃蛇规则引擎（无渲染、无音效、无统计）
+
+    蛇身用deque存储（头在左、尾在右），同时维护一张按 y * grid_width + x
+    索引的bytearray占用表，移动时增量更新，碰撞检测为O(1)。
+
+    空闲格子保存在一个可交换删除的数组中（并记录每个格子在数组中的下标），
+    蛇头占用和蛇尾释放都是O(1)，食物生成因此与棋盘填满程度无关。
+
+    食物距离场（每个格子绕开蛇身走到食物的BFS步数）在每个食物生成后
+    第一次查询时计算一次，之后蛇尾每移走一格只做增量的距离缩短。
+    """
+
+    def __init__(self, grid_width: int, grid_height: int):
+        """
+        初始化游戏引擎
+
+        Args:
+            grid_width: 网格宽度（格子数）
+            grid_height: 网格高度（格子数）
+        """
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self._occupied = bytearray(grid_width * grid_height)
+        self._free_cells = array('i')
+        self._free_slot = array('i')
+
+        # 每个格子被蛇头进入时的时钟值，用于O(1)求出蛇身段下标
+        self._entered = array('i', [0]) * (grid_width * grid_height)
+        self._head_clock = 0
+
+        # 最近一次移动产生的事件，供渲染层使用
+        self.last_event = None
+
+        # 状态版本号：蛇身每次变化都会递增，供AI判断缓存是否失效
+        self.state_version = 0
+
+        # 食物距离场：距离数组、对应的食物格子、距离场视为障碍的格子、待补算的空出格子
+        self._food_field = None
+        self._food_field_cell = -1
+        self._field_blocked = bytearray()
+        self._field_pending = []
+
+        self.reset()
+
+    def reset(self):
+        """重置游戏状态"""
+        # 蛇的初始位置（中心）
+        center_x = self.grid_width // 2
+        center_y = self.grid_height // 2
+        self.set_snake([(center_x, center_y)])
+        self.direction = Direction.RIGHT
+
+        # 生成食物
+        self.food = self.generate_food()
+
+        # 游戏状态
+        self.score = 0
+        self.game_over = self.food is None
+        self.won = self.food is None
+        self.move_count = 0
+        self.last_event = None
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'SnakeEngine':
+        """
+        根据 get_game_state() 的快照创建一个独立的引擎
+
+        Args:
+            state: 游戏状态快照
+
+        Returns:
+            状态与快照一致的新引擎
+        """
+        engine = cls(state['grid_width'], state['grid_height'])
+        engine.load_state(state)
+        return engine
+
+    def load_state(self, state: dict):
+        """
+        载入 get_game_state() 的快照（网格尺寸需一致）
+
+        快照恰好是当前状态走一步之后的状态时，状态版本号只加一，
+        AI可以像正常移动一样沿缓存的路径继续；否则版本号多跳一次，
+        让上一次决策留下的路径失效。
+
+        Args:
+            state: 游戏状态快照
+        """
+        move_count = state.get('move_count', 0)
+        snake = state['snake']
+        successor = (move_count == self.move_count + 1 and
+                     (snake[1] == self.snake[0] if len(snake) > 1 else len(self.snake) == 1))
+        self.set_snake(snake)
+        if not successor:
+            self.state_version += 1
+        self.food = state['food']
+        self.direction = state['direction']
+        self.score = state['score']
+        self.game_over = state['game_over']
+        self.won = state.get('won', False)
+        self.move_count = move_count
+        self.last_event = None
+
+    def set_snake(self, segments: Iterable[Tuple[int, int]]):
+        """
+        直接设置蛇身（头在前），并重建占用表
+
+        Args:
+            segments: 蛇身坐标序列
+        """
+        cell_count = self.grid_width * self.grid_height
+        self.snake = deque(segments)
+        self._occupied = bytearray(cell_count)
+        self._free_cells = array('i', range(cell_count))
+        self._free_slot = array('i', range(cell_count))
+        for index, (x, y) in enumerate(self.snake):
+            cell = y * self.grid_width + x
+            self._occupy(cell)
+            self._entered[cell] = self._head_clock - index
+        self.state_version += 1
+        self._food_field = None
+
+    def _occupy(self, cell: int):
+        """标记格子被占用，并从空闲数组中交换删除"""
+        self._occupied[cell] = 1
+        slot = self._free_slot[cell]
+        last = self._free_cells.pop()
+        if last != cell:
+            self._free_cells[slot] = last
+            self._free_slot[last] = slot
+        self._free_slot[cell] = -1
+
+    def _release(self, cell: int):
+        """标记格子空闲，并追加到空闲数组末尾"""
+        self._occupied[cell] = 0
+        self._free_slot[cell] = len(self._free_cells)
+        self._free_cells.append(cell)
+
+    def is_occupied(self, pos: Tuple[int, int]) -> bool:
+        """检查棋盘内的位置是否被蛇身占用"""
+        x, y = pos
+        return self._occupied[y * self.grid_width + x] == 1
+
+    def get_occupancy(self) -> bytearray:
+        """获取按 y * grid_width + x 索引的占用表（只读使用，不要修改）"""
+        return self._occupied
+
+    @property
+    def head_clock(self) -> int:
+        """蛇头进入新格子的累计次数（head_clock - 段下标 在该段存在期间保持不变）"""
+        return self._head_clock
+
+    def segment_index(self, cell: int) -> int:
+        """
+        获取格子上蛇身段的下标
+
+        Args:
+            cell: 格子编号（y * grid_width + x）
+
+        Returns:
+            蛇身段下标（0为蛇头，len-1为蛇尾），空闲格子返回-1
+        """
+        if not self._occupied[cell]:
+            return -1
+        return self._head_clock - self._entered[cell]
+
+    def free_cell_count(self) -> int:
+        """获取空闲格子数量"""
+        return len(self._free_cells)
+
+    def generate_food(self) -> Optional[Tuple[int, int]]:
+        """
+        生成食物位置（从空闲格子中均匀随机选择，O(1)）
+
+        Returns:
+            食物位置；棋盘已被蛇填满时返回None
+        """
+        if not self._free_cells:
+            return None
+        cell = self._free_cells[random.randrange(len(self._free_cells))]
+        return (cell % self.grid_width, cell // self.grid_width)
+
+    def food_distance_field(self) -> Optional[array]:
+        """
+        获取食物距离场：每个格子绕开蛇身走到食物的最少步数
+
+        距离场把蛇尾当作空闲格子（与A*寻路的障碍一致），只在蛇尾移走时
+        缩短距离、不因蛇头进入而加长，所以它是真实距离的下界，可以作为
+        可采纳的A*启发函数；距离场里到不了食物的格子一定到不了。
+
+        Returns:
+            以格子编号为下标的距离数组（到不了为 grid_width * grid_height），
+            没有食物时返回None。数组只读使用，不要修改
+        """
+        if self.food is None:
+            return None
+
+        width = self.grid_width
+        food_cell = self.food[1] * width + self.food[0]
+        if self._food_field is None or self._food_field_cell != food_cell:
+            self._build_food_field(food_cell)
+        elif self._field_pending:
+            self._patch_food_field()
+        return self._food_field
+
+    def food_distance(self, pos: Tuple[int, int]) -> int:
+        """
+        获取位置到食物的距离（见 food_distance_field）
+
+        Returns:
+            步数，到不了或没有食物时为 grid_width * grid_height
+        """
+        field = self.food_distance_field()
+        if field is None:
+            return self.grid_width * self.grid_height
+        return field[pos[1] * self.grid_width + pos[0]]
+
+    def _build_food_field(self, food_cell: int):
+        """从食物格子出发BFS，重新计算整张距离场"""
+        cell_count = self.grid_width * self.grid_height
+        blocked = bytearray(self._occupied)
+        tail_x, tail_y = self.snake[-1]
+        blocked[tail_y * self.grid_width + tail_x] = 0
+
+        field = array('i', [cell_count]) * cell_count
+        field[food_cell] = 0
+        self._food_field = field
+        self._food_field_cell = food_cell
+        self._field_blocked = blocked
+        self._field_pending = []
+        self._relax_food_field(deque([food_cell]))
+
+    def _patch_food_field(self):
+        """把蛇尾空出的格子加入距离场，并向外传播变短的距离"""
+        field = self._food_field
+        blocked = self._field_blocked
+        neighbors = neighbor_table(self.grid_width, self.grid_height)
+        queue = deque()
+        for cell in self._field_pending:
+            if not blocked[cell]:
+                continue
+            blocked[cell] = 0
+            distance = min(field[neighbor] for neighbor in neighbors[cell]) + 1
+            if distance < field[cell]:
+                field[cell] = distance
+                queue.append(cell)
+        self._field_pending = []
+        self._relax_food_field(queue)
+
+    def _relax_food_field(self, queue: deque):
+        """从队列中的格子出发，向非障碍的相邻格子传播更短的距离"""
+        field = self._food_field
+        blocked = self._field_blocked
+        neighbors = neighbor_table(self.grid_width, self.grid_height)
+        while queue:
+            current = queue.popleft()
+            distance = field[current] + 1
+            for neighbor in neighbors[current]:
+                if not blocked[neighbor] and distance < field[neighbor]:
+                    field[neighbor] = distance
+                    queue.append(neighbor)
+
+    def is_valid_position(self, pos: Tuple[int, int]) -> bool:
+        """检查位置是否有效（不撞墙，不撞自己）"""
+        x, y = pos
+        if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
+            return False
+        return not self._occupied[y * self.grid_width + x]
+
+    def get_head_position(self) -> Tuple[int, int]:
+        """获取蛇头位置"""
+        return self.snake[0]
+
+    def get_next_position(self, direction: Direction) -> Tuple[int, int]:
+        """根据方向获取下一个位置"""
+        head_x, head_y = self.get_head_position()
+        dx, dy = direction.value
+        return (head_x + dx, head_y + dy)
+
+    def move(self, direction: Direction) -> bool:
+        """
+        移动蛇
+
+        移动结果记录在 last_event 中：
+        head（新蛇头）、tail（被移除的蛇尾，吃到食物时为None）、
+        ate_food（是否吃到食物）、collision（是否发生碰撞）、
+        won（蛇是否填满整个棋盘）
+
+        Args:
+            direction: 移动方向
+
+        Returns:
+            bool: 游戏是否继续
+        """
+        self.last_event = None
+        if self.game_over:
+            return False
+
+        # 防止蛇反向移动
+        if len(self.snake) > 1 and direction == OPPOSITE_DIRECTION.get(self.direction):
+            direction = self.direction
+
+        self.direction = direction
+        next_pos = self.get_next_position(direction)
+
+        # 检查碰撞
+        if not self.is_valid_position(next_pos):
+            self.game_over = True
+            self.last_event = {
+                'head': self.get_head_position(),
+                'tail': None,
+                'ate_food': False,
+                'collision': True,
+                'won': False
+            }
+            return False
+
+        # 移动蛇头
+        self.snake.appendleft(next_pos)
+        head_cell = next_pos[1] * self.grid_width + next_pos[0]
+        self._occupy(head_cell)
+        self._head_clock += 1
+        self._entered[head_cell] = self._head_clock
+        self.move_count += 1
+        self.state_version += 1
+
+        # 检查是否吃到食物
+        tail_pos = None
+        ate_food = next_pos == self.food
+        if ate_food:
+            self.score += 1
+            self.food = self.generate_food()
+            if self.food is None:
+                # 没有空闲格子：蛇填满了棋盘，游戏胜利
+                self.won = True
+                self.game_over = True
+        else:
+            # 没吃到食物，移除蛇尾
+            tail_pos = self.snake.pop()
+            self._release(tail_pos[1] * self.grid_width + tail_pos[0])
+            if self._food_field is not None:
+                # 新的蛇尾下一步就会移走，距离场提前把它当作空闲格子
+                tail_x, tail_y = self.snake[-1]
+                self._field_pending.append(tail_y * self.grid_width + tail_x)
+                if len(self._field_pending) >= len(self._occupied):
+                    # 长时间没有查询，下次直接重算
+                    self._food_field = None
+
+        self.last_event = {
+            'head': next_pos,
+            'tail': tail_pos,
+            'ate_food': ate_food,
+            'collision': False,
+            'won': self.won
+        }
+        return not self.won
+
+    def get_possible_moves(self) -> List[Direction]:
+        """获取所有可能的移动方向"""
+        possible_moves = []
+        for direction in Direction:
+            next_pos = self.get_next_position(direction)
+            if self.is_valid_position(next_pos):
+                # 防止反向移动
+                if len(self.snake) > 1 and direction == OPPOSITE_DIRECTION.get(self.direction):
+                    continue
+                possible_moves.append(direction)
+        return possible_moves
+
+    def get_game_state(self) -> dict:
+        """获取游戏状态信息，供AI使用"""
+        return {
+            'snake': list(self.snake),
+            'food': self.food,
+            'direction': self.direction,
+            'score': self.score,
+            'game_over': self.game_over,
+            'won': self.won,
+            'move_count': self.move_count,
+            'grid_width': self.grid_width,
+            'grid_height': self.grid_height
+        }
@@ -4,20 +4,60 @@
 记录和分析游戏数据
 """
 
+import os
 import json
 import time
+import heapq
+import sqlite3
+import tempfile
 from datetime import datetime
 from typing import Dict, List, Any
 from config import game_config
 
+# 日志中累积多少条记录后压缩进快照
+COMPACT_EVERY = 200
+
+# 保留的分数历史条数
+SCORE_HISTORY_LIMIT = 1000
+
+def empty_stats() -> Dict[str, Any]:
+    """空的历史统计"""
+    return {
+        "total_games": 0,
+        "total_score": 0,
+        "highest_score": 0,
+        "total_food_eaten": 0,
+        "total_play_time": 0.0,
+        "average_score": 0.0,
+        "games_by_date": {},
+        "score_history": [],
+        "achievements": []
+    }
+
 class GameStats:
-    """游戏统计管理类"""
+    """
+    游戏统计管理类
+
+    持久化分为快照和日志两部分：快照（stats_file）保存某一时刻的完整
+    统计和已包含的最后一条记录序号；每局结束只向日志（同名的 .log 文件）
+    追加一行JSON记录。启动时读取快照再重放序号更大的日志记录；日志累积
+    COMPACT_EVERY 条后把统计写成新快照（临时文件 + 原子替换）并清空日志。
+    快照和日志都用同一个 _apply_record 更新统计，重放结果与实时结果一致。
+    """
     
     def __init__(self, stats_file: str = None):
         if stats_file is None:
             stats_file = game_config.get("stats.stats_file", "game_stats.json")
         
         self.stats_file = stats_file
+        self.log_file = os.path.splitext(stats_file)[0] + ".log"
+        self.compact_every = COMPACT_EVERY
+        self._last_seq = 0
+        self._snapshot_seq = 0
+        self._init_stats()
+        
+    def _init_stats(self):
+        """初始化本次会话统计并加载历史统计（各存储后端共用）"""
         self.current_session = {
             "start_time": time.time(),
             "games_played": 0,
@@ -31,33 +71,130 @@ class GameStats:
         self.all_time_stats = self.load_stats()
         
     def load_stats(self) -> Dict[str, Any]:
-        """加载历史统计数据"""
+        """加载历史统计数据（快照 + 重放日志中快照之后的记录）"""
         try:
             with open(self.stats_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                stats = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            return {
-                "total_games": 0,
-                "total_score": 0,
-                "highest_score": 0,
-                "total_food_eaten": 0,
-                "total_play_time": 0.0,
-                "average_score": 0.0,
-                "games_by_date": {},
-                "score_history": [],
-                "achievements": []
-            }
+            stats = empty_stats()
+        self._snapshot_seq = self._last_seq = stats.pop("last_seq", 0)
+        
+        for record in self.read_log():
+            if record["seq"] > self._last_seq:
+                self._apply_record(stats, record)
+                self._last_seq = record["seq"]
+        return stats
+    
+    def read_log(self) -> List[Dict[str, Any]]:
+        """读取日志中的记录（跳过写了一半的行）"""
+        records = []
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(record, dict) and "seq" in record:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
     
     def save_stats(self):
-        """保存统计数据"""
+        """把当前统计写成快照（临时文件 + 原子替换），然后清空日志"""
         if not game_config.get("stats.save_stats", True):
             return
             
+        temp_path = None
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.all_time_stats, f, indent=4, ensure_ascii=False)
+            snapshot = dict(self.all_time_stats, last_seq=self._last_seq)
+            stats_dir = os.path.dirname(os.path.abspath(self.stats_file))
+            fd, temp_path = tempfile.mkstemp(dir=stats_dir, prefix='.stats-', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.stats_file)
+            temp_path = None
+            self._snapshot_seq = self._last_seq
+            
+            # 快照已包含全部记录；即使在这里崩溃，重放时也会按序号跳过旧记录
+            with open(self.log_file, 'w', encoding='utf-8'):
+                pass
         except Exception as e:
             print(f"保存统计数据失败: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def append_record(self, record: Dict[str, Any]):
+        """应用一条记录，追加到日志，必要时压缩进快照"""
+        self._last_seq += 1
+        record["seq"] = self._last_seq
+        self._apply_record(self.all_time_stats, record)
+        
+        if not game_config.get("stats.save_stats", True):
+            return
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"保存统计数据失败: {e}")
+            return
+        
+        if self._last_seq - self._snapshot_seq >= self.compact_every:
+            self.save_stats()
+    
+    def _apply_record(self, stats: Dict[str, Any], record: Dict[str, Any]):
+        """把一条日志记录应用到统计数据上"""
+        if record.get("type") == "reset":
+            stats.clear()
+            stats.update(empty_stats())
+            return
+        
+        self._apply_totals(stats, record)
+        
+        # 记录分数历史
+        stats["score_history"].append({
+            "score": record["score"],
+            "length": record["length"],
+            "duration": record["duration"],
+            "timestamp": record["timestamp"],
+            "moves": record["moves"]
+        })
+        
+        # 限制历史记录数量
+        if len(stats["score_history"]) > SCORE_HISTORY_LIMIT:
+            del stats["score_history"][:-SCORE_HISTORY_LIMIT]
+        
+        # 按日期统计
+        day = record["timestamp"][:10]
+        daily_stats = stats["games_by_date"].setdefault(day, {
+            "games": 0,
+            "total_score": 0,
+            "best_score": 0
+        })
+        daily_stats["games"] += 1
+        daily_stats["total_score"] += record["score"]
+        daily_stats["best_score"] = max(daily_stats["best_score"], record["score"])
+    
+    def _apply_totals(self, stats: Dict[str, Any], record: Dict[str, Any]):
+        """把一局的记录累加到汇总统计上，并检查成就"""
+        final_score = record["score"]
+        
+        # 更新历史统计
+        stats["total_games"] += 1
+        stats["total_score"] += final_score
+        stats["highest_score"] = max(stats["highest_score"], final_score)
+        stats["total_food_eaten"] += final_score
+        stats["total_play_time"] += record["duration"]
+        
+        # 计算平均分
+        if stats["total_games"] > 0:
+            stats["average_score"] = stats["total_score"] / stats["total_games"]
+        
+        # 检查成就
+        self._check_achievements(stats, final_score, record["length"])
     
     def start_game(self):
         """开始新游戏"""
@@ -83,49 +220,15 @@ class GameStats:
         self.current_session["total_moves"] += self.current_game["moves"]
         self.current_session["game_times"].append(game_duration)
         
-        # 更新历史统计
-        self.all_time_stats["total_games"] += 1
-        self.all_time_stats["total_score"] += final_score
-        self.all_time_stats["highest_score"] = max(self.all_time_stats["highest_score"], final_score)
-        self.all_time_stats["total_food_eaten"] += final_score
-        self.all_time_stats["total_play_time"] += game_duration
-        
-        # 计算平均分
-        if self.all_time_stats["total_games"] > 0:
-            self.all_time_stats["average_score"] = self.all_time_stats["total_score"] / self.all_time_stats["total_games"]
-        
-        # 记录分数历史
-        self.all_time_stats["score_history"].append({
+        # 更新历史统计（追加到日志）
+        self.append_record({
+            "type": "game",
             "score": final_score,
             "length": snake_length,
             "duration": game_duration,
             "timestamp": datetime.now().isoformat(),
             "moves": self.current_game["moves"]
         })
-        
-        # 限制历史记录数量
-        if len(self.all_time_stats["score_history"]) > 1000:
-            self.all_time_stats["score_history"] = self.all_time_stats["score_history"][-1000:]
-        
-        # 按日期统计
-        today = datetime.now().strftime("%Y-%m-%d")
-        if today not in self.all_time_stats["games_by_date"]:
-            self.all_time_stats["games_by_date"][today] = {
-                "games": 0,
-                "total_score": 0,
-                "best_score": 0
-            }
-        
-        daily_stats = self.all_time_stats["games_by_date"][today]
-        daily_stats["games"] += 1
-        daily_stats["total_score"] += final_score
-        daily_stats["best_score"] = max(daily_stats["best_score"], final_score)
-        
-        # 检查成就
-        self.check_achievements(final_score, snake_length)
-        
-        # 保存统计
-        self.save_stats()
     
     def record_move(self):
         """记录一次移动"""
@@ -140,6 +243,10 @@ class GameStats:
     
     def check_achievements(self, score: int, length: int):
         """检查成就"""
+        return self._check_achievements(self.all_time_stats, score, length)
+    
+    def _check_achievements(self, stats: Dict[str, Any], score: int, length: int) -> List[str]:
+        """检查并记录stats中新达成的成就，返回成就提示"""
         achievements = []
         
         # 分数成就
@@ -147,27 +254,27 @@ class GameStats:
         for milestone in score_milestones:
             if score >= milestone:
                 achievement = f"score_{milestone}"
-                if achievement not in self.all_time_stats["achievements"]:
+                if achievement not in stats["achievements"]:
                     achievements.append(f"达成成就: 得分{milestone}分!")
-                    self.all_time_stats["achievements"].append(achievement)
+                    stats["achievements"].append(achievement)
         
         # 长度成就
         length_milestones = [10, 20, 50, 100]
         for milestone in length_milestones:
             if length >= milestone:
                 achievement = f"length_{milestone}"
-                if achievement not in self.all_time_stats["achievements"]:
+                if achievement not in stats["achievements"]:
                     achievements.append(f"达成成就: 蛇长度{milestone}!")
-                    self.all_time_stats["achievements"].append(achievement)
+                    stats["achievements"].append(achievement)
         
         # 游戏次数成就
         games_milestones = [10, 50, 100, 500, 1000]
         for milestone in games_milestones:
-            if self.all_time_stats["total_games"] >= milestone:
+            if stats["total_games"] >= milestone:
                 achievement = f"games_{milestone}"
-                if achievement not in self.all_time_stats["achievements"]:
+                if achievement not in stats["achievements"]:
                     achievements.append(f"达成成就: 游戏{milestone}次!")
-                    self.all_time_stats["achievements"].append(achievement)
+                    stats["achievements"].append(achievement)
         
         return achievements
     
@@ -196,28 +303,213 @@ class GameStats:
     
     def get_best_scores(self, count: int = 10) -> List[Dict]:
         """获取最高分记录"""
-        sorted_scores = sorted(
-            self.all_time_stats["score_history"],
-            key=lambda x: x["score"],
-            reverse=True
-        )
-        return sorted_scores[:count]
+        return heapq.nlargest(count, self.all_time_stats["score_history"], key=lambda x: x["score"])
+    
+    def get_score_percentile(self, percentile: float) -> int:
+        """
+        获取分数的百分位数（最近的分数历史中，最近秩法）
+
+        Args:
+            percentile: 百分位（0~100）
+
+        Returns:
+            分数，没有记录时为0
+        """
+        scores = sorted(entry["score"] for entry in self.all_time_stats["score_history"])
+        if not scores:
+            return 0
+        return scores[round(percentile / 100 * (len(scores) - 1))]
+    
+    def get_daily_stats(self, day: str = None) -> Dict[str, Any]:
+        """
+        获取某一天的统计
+
+        Args:
+            day: 日期（YYYY-MM-DD），None表示今天
+
+        Returns:
+            games、total_score、best_score
+        """
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        daily = self.all_time_stats["games_by_date"].get(day)
+        return dict(daily) if daily else {"games": 0, "total_score": 0, "best_score": 0}
     
     def reset_stats(self):
         """重置所有统计数据"""
-        self.all_time_stats = {
-            "total_games": 0,
-            "total_score": 0,
-            "highest_score": 0,
-            "total_food_eaten": 0,
-            "total_play_time": 0.0,
-            "average_score": 0.0,
-            "games_by_date": {},
-            "score_history": [],
-            "achievements": []
-        }
+        self.append_record({"type": "reset"})
         self.save_stats()
         print("统计数据已重置")
 
+class SQLiteGameStats(GameStats):
+    """
+    SQLite统计存储（stats.backend = "sqlite"）
+
+    每局一行存入 games 表（WAL模式，不截断历史），score、day、length 建有索引；
+    按天汇总（daily）和分数分布（score_counts）随每局增量更新。
+    内存中只保留汇总和成就，get_* 接口与 GameStats 相同。
+    """
+    
+    def __init__(self, db_file: str = None):
+        if db_file is None:
+            db_file = game_config.get("stats.db_file", "game_stats.db")
+        if not game_config.get("stats.save_stats", True):
+            db_file = ":memory:"
+        
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS games (
+                    id INTEGER PRIMARY KEY,
+                    score INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    moves INTEGER NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    day TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS games_score ON games(score);
+                CREATE INDEX IF NOT EXISTS games_day ON games(day);
+                CREATE INDEX IF NOT EXISTS games_length ON games(length);
+                CREATE TABLE IF NOT EXISTS daily (
+                    day TEXT PRIMARY KEY,
+                    games INTEGER NOT NULL,
+                    total_score INTEGER NOT NULL,
+                    best_score INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS score_counts (
+                    score INTEGER PRIMARY KEY,
+                    games INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS achievements (
+                    name TEXT PRIMARY KEY
+                );
+            """)
+        self._all_time_cache = None
+        self._init_stats()
+    
+    def load_stats(self) -> Dict[str, Any]:
+        """从数据库汇总统计（不加载逐局记录）"""
+        total_games, total_score, highest_score, total_play_time = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(score), 0), COALESCE(MAX(score), 0), "
+            "COALESCE(SUM(duration), 0.0) FROM games").fetchone()
+        stats = empty_stats()
+        stats.update(
+            total_games=total_games,
+            total_score=total_score,
+            highest_score=highest_score,
+            total_food_eaten=total_score,
+            total_play_time=total_play_time,
+            average_score=total_score / total_games if total_games else 0.0,
+            achievements=[name for name, in self.connection.execute(
+                "SELECT name FROM achievements ORDER BY rowid")]
+        )
+        return stats
+    
+    def save_stats(self):
+        """每局已经提交，无需额外保存"""
+        self.connection.commit()
+    
+    def append_record(self, record: Dict[str, Any]):
+        """把一局记录（或重置）写入数据库并更新内存中的汇总"""
+        self._all_time_cache = None
+        if record.get("type") == "reset":
+            with self.connection:
+                self.connection.execute("DELETE FROM games")
+                self.connection.execute("DELETE FROM daily")
+                self.connection.execute("DELETE FROM score_counts")
+                self.connection.execute("DELETE FROM achievements")
+            self.all_time_stats = empty_stats()
+            return
+        
+        self._apply_totals(self.all_time_stats, record)
+        score = record["score"]
+        day = record["timestamp"][:10]
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO games (score, length, duration, moves, timestamp, day) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (score, record["length"], record["duration"], record["moves"], record["timestamp"], day))
+            self.connection.execute(
+                "INSERT INTO daily (day, games, total_score, best_score) VALUES (?, 1, ?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET games = games + 1, "
+                "total_score = total_score + excluded.total_score, "
+                "best_score = MAX(best_score, excluded.best_score)",
+                (day, score, score))
+            self.connection.execute(
+                "INSERT INTO score_counts (score, games) VALUES (?, 1) "
+                "ON CONFLICT(score) DO UPDATE SET games = games + 1",
+                (score,))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO achievements (name) VALUES (?)",
+                [(name,) for name in self.all_time_stats["achievements"]])
+    
+    def get_all_time_stats(self) -> Dict[str, Any]:
+        """获取历史统计（结构与 GameStats 相同，分数历史为最近的记录；有新对局前复用结果）"""
+        if self._all_time_cache is None:
+            stats = dict(self.all_time_stats)
+            stats["achievements"] = list(stats["achievements"])
+            stats["score_history"] = self.get_recent_scores(SCORE_HISTORY_LIMIT)
+            stats["games_by_date"] = {
+                day: {"games": games, "total_score": total_score, "best_score": best_score}
+                for day, games, total_score, best_score in self.connection.execute(
+                    "SELECT day, games, total_score, best_score FROM daily ORDER BY day")
+            }
+            self._all_time_cache = stats
+        return self._all_time_cache.copy()
+    
+    def _query_games(self, sql: str, parameters=()) -> List[Dict]:
+        """查询对局记录，返回与分数历史相同结构的字典列表"""
+        return [
+            {"score": score, "length": length, "duration": duration, "timestamp": timestamp, "moves": moves}
+            for score, length, duration, timestamp, moves in self.connection.execute(
+                "SELECT score, length, duration, timestamp, moves FROM games " + sql, parameters)
+        ]
+    
+    def get_recent_scores(self, count: int = 10) -> List[Dict]:
+        """获取最近的分数记录"""
+        records = self._query_games("ORDER BY id DESC LIMIT ?", (count,))
+        records.reverse()
+        return records
+    
+    def get_best_scores(self, count: int = 10) -> List[Dict]:
+        """获取最高分记录（按score索引）"""
+        return self._query_games("ORDER BY score DESC LIMIT ?", (count,))
+    
+    def get_score_percentile(self, percentile: float) -> int:
+        """获取全部对局分数的百分位数（最近秩法，按分数分布累加）"""
+        total_games = self.all_time_stats["total_games"]
+        if not total_games:
+            return 0
+        rank = round(percentile / 100 * (total_games - 1))
+        score = 0
+        for score, games in self.connection.execute(
+                "SELECT score, games FROM score_counts ORDER BY score"):
+            rank -= games
+            if rank < 0:
+                break
+        return score
+    
+    def get_daily_stats(self, day: str = None) -> Dict[str, Any]:
+        """获取某一天的统计"""
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        row = self.connection.execute(
+            "SELECT games, total_score, best_score FROM daily WHERE day = ?", (day,)).fetchone()
+        if row is None:
+            return {"games": 0, "total_score": 0, "best_score": 0}
+        return {"games": row[0], "total_score": row[1], "best_score": row[2]}
+    
+    def close(self):
+        """关闭数据库连接"""
+        self.connection.close()
+
+def create_game_stats() -> GameStats:
+    """按配置（stats.backend）创建统计存储"""
+    if game_config.get("stats.backend", "json") == "sqlite":
+        return SQLiteGameStats()
+    return GameStats()
+
 # 全局统计实例
-game_stats = GameStats()
+game_stats = create_game_stats()
@@ -7,12 +7,41 @@ AI控制的贪吃蛇游戏
 import pygame
 import sys
 import time
+from typing import Callable, Tuple
 from snake_game import SnakeGame
-from ai_controller import AIController
+from game_engine import SnakeEngine
+from ai_controller import AIController, AsyncAIController, create_ai_controller
 from config import game_config, get_text
 from game_stats import game_stats
 from audio_system import audio_system
 
+def run_fixed_steps(accumulator: float, step_time: float, max_steps: int,
+                    step: Callable[[], bool]) -> Tuple[float, int]:
+    """
+    按固定步长消耗积累的真实时间推进模拟
+
+    单帧最多推进max_steps步；达到上限或游戏结束时丢弃积压的时间，
+    避免之后连续追帧。
+
+    Args:
+        accumulator: 积累的真实时间（秒）
+        step_time: 每个模拟步的时长（秒）
+        max_steps: 单帧最多推进的步数
+        step: 推进一步模拟的回调，返回False表示游戏已结束
+
+    Returns:
+        (剩余的积累时间, 本帧推进的步数)
+    """
+    steps = 0
+    while accumulator >= step_time and steps < max_steps:
+        accumulator -= step_time
+        steps += 1
+        if not step():
+            return 0.0, steps
+    if steps >= max_steps:
+        accumulator = 0.0
+    return accumulator, steps
+
 def main():
     """主函数"""
     print("🐍 AI贪吃蛇游戏 - 完整增强版启动中...")
@@ -50,6 +79,9 @@ def main():
     WINDOW_HEIGHT = game_config.get("window.height", 600)
     CELL_SIZE = game_config.get("window.cell_size", 20)
     FPS = game_config.get("performance.fps", 10)
+    RENDER_FPS = game_config.get("performance.render_fps", 60)
+    TURBO = max(1, game_config.get("performance.turbo", 1))
+    MAX_STEPS_PER_FRAME = game_config.get("performance.max_steps_per_frame", 50)
 
     try:
         # 初始化音效系统
@@ -58,11 +90,11 @@ def main():
 
         # 创建游戏实例
         game = SnakeGame()  # 使用配置文件中的默认值
-        ai_controller = AIController(game)
+        ai_controller = create_ai_controller(game)
 
         print(f"游戏窗口大小: {WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         print(f"网格大小: {game.grid_width}x{game.grid_height}")
-        print(f"游戏速度: {FPS} FPS")
+        print(f"游戏速度: {FPS} 步/秒 × {TURBO}，渲染帧率: {RENDER_FPS} FPS")
         print("游戏开始!")
 
         # 显示统计信息
@@ -70,12 +102,55 @@ def main():
         if stats["total_games"] > 0:
             print(f"历史统计: 总游戏{stats['total_games']}次, 最高分{stats['highest_score']}, 平均分{stats['average_score']:.1f}")
         
-        # 游戏主循环
+        # 游戏主循环：固定时间步长推进模拟，渲染按独立帧率进行
         running = True
         auto_restart_delay = game_config.get("performance.auto_restart_delay", 3.0)
         game_over_time = None
+        step_time = 1.0 / (FPS * TURBO)
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+
+        def on_performance_changed(changes):
+            """配置热重载：游戏速度、渲染帧率等无需重启"""
+            nonlocal FPS, RENDER_FPS, TURBO, MAX_STEPS_PER_FRAME, auto_restart_delay, step_time
+            FPS = game_config.get("performance.fps", 10)
+            RENDER_FPS = game_config.get("performance.render_fps", 60)
+            TURBO = max(1, game_config.get("performance.turbo", 1))
+            MAX_STEPS_PER_FRAME = game_config.get("performance.max_steps_per_frame", 50)
+            auto_restart_delay = game_config.get("performance.auto_restart_delay", 3.0)
+            step_time = 1.0 / (FPS * TURBO)
+            print(f"游戏速度: {FPS} 步/秒 × {TURBO}，渲染帧率: {RENDER_FPS} FPS")
+
+        game_config.subscribe("performance", on_performance_changed)
+
+        def step():
+            """AI控制走一步，返回游戏是否仍在进行"""
+            nonlocal game_over_time
+            best_direction = ai_controller.get_best_direction()
+            game.move(best_direction)
+            if not game.game_over:
+                return True
+
+            game_over_time = time.time()
+            if game.won:
+                print("🎉 蛇填满了整个棋盘，游戏胜利!")
+            print(f"游戏结束! 最终得分: {game.score}")
+            print(f"蛇的长度: {len(game.snake)}")
+            print(f"移动次数: {game.move_count}")
+
+            # 检查成就
+            achievements = game_stats.check_achievements(game.score, len(game.snake))
+            for achievement in achievements:
+                print(f"🏆 {achievement}")
+                audio_system.play_achievement_sound()
+
+            print(f"{auto_restart_delay}秒后自动重新开始...")
+            return False
 
         while running:
+            # 检查配置文件是否被修改（有间隔限制，几乎没有开销）
+            game_config.check_for_changes()
+
             # 处理事件
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -99,26 +174,17 @@ def main():
                         print(f"总游戏时间: {stats['total_play_time']/60:.1f}分钟")
                         print("================\n")
             
-            if not game.game_over:
-                # AI控制
-                best_direction = ai_controller.get_best_direction()
-                game.move(best_direction)
-                
-                # 检查游戏是否结束
-                if game.game_over:
-                    game_over_time = time.time()
-                    print(f"游戏结束! 最终得分: {game.score}")
-                    print(f"蛇的长度: {len(game.snake)}")
-                    print(f"移动次数: {game.move_count}")
-
-                    # 检查成就
-                    achievements = game_stats.check_achievements(game.score, len(game.snake))
-                    for achievement in achievements:
-                        print(f"🏆 {achievement}")
-                        audio_system.play_achievement_sound()
-
-                    print(f"{auto_restart_delay}秒后自动重新开始...")
+            # 累积真实流逝的时间，按固定步长推进模拟
+            now = time.perf_counter()
+            accumulator += now - previous_time
+            previous_time = now
+
+            if game.game_over:
+                accumulator = 0.0
             else:
+                accumulator, _ = run_fixed_steps(accumulator, step_time, MAX_STEPS_PER_FRAME, step)
+
+            if game.game_over:
                 # 自动重启逻辑
                 if game_over_time and time.time() - game_over_time > auto_restart_delay:
                     old_score = game.score
@@ -126,12 +192,18 @@ def main():
                     game_over_time = None
                     print(f"自动重新开始! 上次得分: {old_score}")
             
-            # 绘制游戏
-            game.draw()
+            # 绘制游戏（按两步之间的进度插值蛇头和蛇尾）
+            game.draw(min(accumulator / step_time, 1.0))
             
-            # 控制帧率
-            game.clock.tick(FPS)
+            # 控制渲染帧率
+            game.clock.tick(RENDER_FPS)
         
+        # 关闭后台规划线程
+        if isinstance(ai_controller, AsyncAIController):
+            stats = ai_controller.get_cache_stats()
+            print(f"后台规划: {stats['decisions']}次按时决策, {stats['deadline_misses']}次超时")
+            ai_controller.close()
+
         print("游戏退出")
         
     except Exception as e:
@@ -143,10 +215,10 @@ def main():
         sys.exit()
 
 def test_ai():
-    """测试AI控制器"""
+    """测试AI控制器（使用无界面引擎，无需打开窗口）"""
     print("🧪 测试AI控制器...")
     
-    game = SnakeGame(400, 400, 20)
+    game = SnakeEngine(20, 20)
     ai_controller = AIController(game)
     
     # 测试几步移动
@@ -161,7 +233,6 @@ def test_ai():
         game.move(direction)
     
     print(f"测试完成，得分: {game.score}")
-    pygame.quit()
 
 if __name__ == "__main__":
     # 可以通过命令行参数选择测试模式
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+粒子系统
+用NumPy数组保存所有粒子，向量化更新，并缓存预渲染的粒子精灵
+"""
+
+import pygame
+import numpy as np
+from typing import Dict, List, Tuple
+
+# 重力加速度（像素/秒²）
+GRAVITY = 200.0
+
+# 透明度量化级数（精灵缓存按透明度分桶）
+ALPHA_LEVELS = 16
+
+class ParticleSystem:
+    """粒子池：位置、速度、寿命、大小和颜色都存放在定长数组中"""
+
+    def __init__(self, limit: int = 100):
+        """
+        初始化粒子池
+
+        Args:
+            limit: 同时存活的粒子上限，超出的新粒子会被丢弃
+        """
+        self.limit = max(0, int(limit))
+        self.count = 0
+        self.rng = np.random.default_rng()
+
+        self.x = np.zeros(self.limit, dtype=np.float32)
+        self.y = np.zeros(self.limit, dtype=np.float32)
+        self.vx = np.zeros(self.limit, dtype=np.float32)
+        self.vy = np.zeros(self.limit, dtype=np.float32)
+        self.lifetime = np.zeros(self.limit, dtype=np.float32)
+        self.max_lifetime = np.ones(self.limit, dtype=np.float32)
+        self.radius = np.zeros(self.limit, dtype=np.int16)
+        self.color_index = np.zeros(self.limit, dtype=np.int16)
+
+        # 颜色表和精灵缓存：(颜色编号, 半径, 透明度级别) -> Surface
+        self.palette: List[Tuple[int, int, int]] = []
+        self._palette_index: Dict[Tuple[int, int, int], int] = {}
+        self._sprites: Dict[Tuple[int, int, int], pygame.Surface] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        """清除所有粒子"""
+        self.count = 0
+
+    def _color_id(self, color: Tuple[int, int, int]) -> int:
+        """获取颜色在颜色表中的编号"""
+        color = tuple(color)
+        if color not in self._palette_index:
+            self._palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return self._palette_index[color]
+
+    def emit(self, x: float, y: float, count: int, colors: List[Tuple[int, int, int]],
+             speed: Tuple[float, float], lifetime: Tuple[float, float]) -> int:
+        """
+        从一点向随机方向发射粒子
+
+        Args:
+            x, y: 发射位置（像素）
+            count: 粒子数量
+            colors: 候选颜色（每个粒子随机选一种）
+            speed: 速度范围（像素/秒）
+            lifetime: 寿命范围（秒）
+
+        Returns:
+            实际发射的粒子数量（受上限约束）
+        """
+        count = min(count, self.limit - self.count)
+        if count <= 0:
+            return 0
+
+        start, end = self.count, self.count + count
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        velocity = self.rng.uniform(speed[0], speed[1], count)
+        life = self.rng.uniform(lifetime[0], lifetime[1], count)
+        color_ids = np.array([self._color_id(color) for color in colors], dtype=np.int16)
+
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = np.cos(angle) * velocity
+        self.vy[start:end] = np.sin(angle) * velocity
+        self.lifetime[start:end] = life
+        self.max_lifetime[start:end] = life
+        self.radius[start:end] = self.rng.uniform(2, 6, count).astype(np.int16)
+        self.color_index[start:end] = self.rng.choice(color_ids, count)
+        self.count = end
+        return count
+
+    def update(self, dt: float):
+        """向量化更新所有粒子，并把存活的粒子压缩到数组前部"""
+        n = self.count
+        if n == 0:
+            return
+
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.lifetime[:n] -= dt
+        # 重力效果
+        self.vy[:n] += GRAVITY * dt
+
+        alive = self.lifetime[:n] > 0
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < n:
+            for array in (self.x, self.y, self.vx, self.vy, self.lifetime,
+                          self.max_lifetime, self.radius, self.color_index):
+                array[:alive_count] = array[:n][alive]
+            self.count = alive_count
+
+    def get_sprite(self, color_id: int, radius: int, alpha_level: int) -> pygame.Surface:
+        """获取（必要时创建）某个颜色、半径和透明度级别的粒子精灵"""
+        key = (color_id, radius, alpha_level)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((radius * 2, radius * 2))
+            sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            pygame.draw.circle(sprite, self.palette[color_id], (radius, radius), radius)
+            sprite.set_alpha(255 * (alpha_level + 1) // ALPHA_LEVELS, pygame.RLEACCEL)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface: pygame.Surface):
+        """用缓存的精灵一次性批量绘制所有粒子"""
+        n = self.count
+        if n == 0:
+            return
+
+        alpha_level = np.clip(self.lifetime[:n] / self.max_lifetime[:n] * ALPHA_LEVELS,
+                              0, ALPHA_LEVELS - 1).astype(np.int16)
+        left = (self.x[:n] - self.radius[:n]).astype(np.int32)
+        top = (self.y[:n] - self.radius[:n]).astype(np.int32)
+
+        get_sprite = self.get_sprite
+        surface.blits([
+            (get_sprite(color_id, radius, level), (px, py))
+            for color_id, radius, level, px, py in zip(
+                self.color_index[:n].tolist(), self.radius[:n].tolist(),
+                alpha_level.tolist(), left.tolist(), top.tolist())
+        ], doreturn=False)
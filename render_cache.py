@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+渲染缓存
+为预渲染的精灵、文字等对象提供有容量上限的LRU缓存
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+class LRUCache:
+    """有容量上限的LRU缓存，超出上限时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize: int = 128):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最多保存的条目数
+        """
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        获取缓存条目，不存在时调用factory创建并放入缓存
+
+        Args:
+            key: 缓存键
+            factory: 创建条目的无参函数
+
+        Returns:
+            缓存的条目
+        """
+        items = self._items
+        if key in items:
+            items.move_to_end(key)
+            self.hits += 1
+            return items[key]
+
+        self.misses += 1
+        value = factory()
+        items[key] = value
+        if len(items) > self.maxsize:
+            items.popitem(last=False)
+        return value
+
+    def clear(self):
+        """清空缓存"""
+        self._items.clear()
+
+class TextCache(LRUCache):
+    """文字渲染缓存：相同的 (字体, 文本, 颜色) 只光栅化一次"""
+
+    def render(self, font, text: str, color, antialias: bool = True):
+        """
+        获取渲染好的文字Surface（用法与 font.render 相同）
+
+        Args:
+            font: pygame字体对象
+            text: 文本内容
+            color: 文字颜色
+            antialias: 是否抗锯齿
+
+        Returns:
+            文字Surface（共享对象，不要修改）
+        """
+        key = (font, text, tuple(color), antialias)
+        return self.get(key, lambda: font.render(text, antialias, color))
+
+# 全局文字缓存实例（游戏界面和设置界面共用）
+text_cache = TextCache(256)
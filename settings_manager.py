@@ -9,6 +9,7 @@ import sys
 from typing import Dict, Any, List, Tuple
 from config import game_config, get_text, COLOR_THEMES
 from audio_system import audio_system
+from render_cache import text_cache
 
 class SettingsManager:
     """设置管理器类"""
@@ -37,6 +38,14 @@ class SettingsManager:
                 "max": 30,
                 "step": 1
             },
+            {
+                "name": "加速倍数",
+                "key": "performance.turbo",
+                "type": "slider",
+                "min": 1,
+                "max": 20,
+                "step": 1
+            },
             {
                 "name": "窗口宽度",
                 "key": "window.width",
@@ -86,6 +95,12 @@ class SettingsManager:
                 "key": "visual.enable_grid",
                 "type": "toggle"
             },
+            {
+                "name": "渲染模式",
+                "key": "visual.render_mode",
+                "type": "dropdown",
+                "options": ["full", "dirty"]
+            },
             {
                 "name": "音效开关",
                 "key": "audio.enable_sound",
@@ -142,7 +157,7 @@ class SettingsManager:
         pygame.draw.rect(self.screen, self.BLUE, slider_rect)
         
         # 显示数值
-        value_text = self.font.render(str(value), True, self.BLACK)
+        value_text = text_cache.render(self.font, str(value), self.BLACK)
         self.screen.blit(value_text, (track_rect.right + 10, rect.y + 5))
     
     def draw_toggle(self, setting: Dict, rect: pygame.Rect, value: bool):
@@ -153,7 +168,7 @@ class SettingsManager:
         
         # 开关文本
         text = "ON" if value else "OFF"
-        toggle_text = self.font.render(text, True, self.WHITE)
+        toggle_text = text_cache.render(self.font, text, self.WHITE)
         text_rect = toggle_text.get_rect(center=toggle_rect.center)
         self.screen.blit(toggle_text, text_rect)
     
@@ -164,7 +179,7 @@ class SettingsManager:
         pygame.draw.rect(self.screen, self.BLACK, dropdown_rect, 2)
         
         # 当前值
-        value_text = self.font.render(str(value), True, self.BLACK)
+        value_text = text_cache.render(self.font, str(value), self.BLACK)
         self.screen.blit(value_text, (dropdown_rect.x + 5, dropdown_rect.y + 2))
     
     def draw(self):
@@ -172,7 +187,7 @@ class SettingsManager:
         self.screen.fill(self.WHITE)
         
         # 标题
-        title_text = self.title_font.render("游戏设置", True, self.BLACK)
+        title_text = text_cache.render(self.title_font, "游戏设置", self.BLACK)
         title_rect = title_text.get_rect(center=(self.width // 2, 30))
         self.screen.blit(title_text, title_rect)
         
@@ -191,7 +206,7 @@ class SettingsManager:
                 pygame.draw.rect(self.screen, self.LIGHT_GRAY, rect)
             
             # 设置名称
-            name_text = self.font.render(setting["name"], True, self.BLACK)
+            name_text = text_cache.render(self.font, setting["name"], self.BLACK)
             self.screen.blit(name_text, (rect.x + 10, rect.y + 10))
             
             # 获取当前值
@@ -211,21 +226,21 @@ class SettingsManager:
         # 保存按钮
         save_rect = pygame.Rect(self.width // 2 - 100, button_y, 80, 30)
         pygame.draw.rect(self.screen, self.GREEN, save_rect)
-        save_text = self.font.render("保存", True, self.WHITE)
+        save_text = text_cache.render(self.font, "保存", self.WHITE)
         save_text_rect = save_text.get_rect(center=save_rect.center)
         self.screen.blit(save_text, save_text_rect)
         
         # 取消按钮
         cancel_rect = pygame.Rect(self.width // 2 + 20, button_y, 80, 30)
         pygame.draw.rect(self.screen, self.RED, cancel_rect)
-        cancel_text = self.font.render("取消", True, self.WHITE)
+        cancel_text = text_cache.render(self.font, "取消", self.WHITE)
         cancel_text_rect = cancel_text.get_rect(center=cancel_rect.center)
         self.screen.blit(cancel_text, cancel_text_rect)
         
         # 重置按钮
         reset_rect = pygame.Rect(20, button_y, 80, 30)
         pygame.draw.rect(self.screen, self.GRAY, reset_rect)
-        reset_text = self.font.render("重置", True, self.WHITE)
+        reset_text = text_cache.render(self.font, "重置", self.WHITE)
         reset_text_rect = reset_text.get_rect(center=reset_rect.center)
         self.screen.blit(reset_text, reset_text_rect)
         
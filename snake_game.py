@@ -2,16 +2,23 @@ import pygame
 import random
 import math
 import time
-from enum import Enum
-from typing import List, Tuple
+from collections import deque
+from itertools import chain
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+from game_engine import Direction, SnakeEngine
+from particle_system import ParticleSystem
+from render_cache import LRUCache, text_cache
 # 简化导入，使用try-except处理
 try:
     from config import game_config, get_text, get_theme_colors
 except ImportError:
     # 提供默认值
     class DefaultConfig:
+        snapshot = SimpleNamespace(visual=SimpleNamespace(enable_particles=True, enable_trail=True))
         def get(self, key, default=None):
             return default
+        def subscribe(self, prefix, callback): pass
     game_config = DefaultConfig()
     get_text = lambda key: key
     get_theme_colors = lambda: {}
@@ -39,42 +46,43 @@ except ImportError:
         def play_move_sound(self): pass
     audio_system = DefaultAudio()
 
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
-
-class Particle:
-    """粒子效果类"""
-    def __init__(self, x: float, y: float, color: Tuple[int, int, int],
-                 velocity: Tuple[float, float], lifetime: float = 1.0):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity = velocity
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.size = random.uniform(2, 6)
-
-    def update(self, dt: float):
-        """更新粒子状态"""
-        self.x += self.velocity[0] * dt
-        self.y += self.velocity[1] * dt
-        self.lifetime -= dt
-
-        # 重力效果
-        self.velocity = (self.velocity[0], self.velocity[1] + 200 * dt)
-
-    def is_alive(self) -> bool:
-        """检查粒子是否还存活"""
-        return self.lifetime > 0
-
-    def get_alpha(self) -> int:
-        """获取透明度"""
-        return int(255 * (self.lifetime / self.max_lifetime))
+# 轨迹效果：每个轨迹格的存活时间（秒）、环形缓冲区容量和透明度分档数
+TRAIL_LIFETIME = 0.5
+TRAIL_CAPACITY = 64
+TRAIL_ALPHA_LEVELS = 8
+
+# 脏矩形模式的蛇身渐变色：按蛇身段的序号（进入棋盘的先后）循环取色，同一段的颜色
+# 在它存在期间不变，中间的蛇身不用每帧重绘（整屏模式仍按蛇头到蛇尾的比例取色）
+BODY_GRADIENT_PERIOD = 32
+BODY_COLORS = tuple(
+    (int(100 * ratio), int(200 - 100 * ratio), int(50 + 100 * ratio))
+    for ratio in (abs(step - BODY_GRADIENT_PERIOD / 2) / (BODY_GRADIENT_PERIOD / 2)
+                  for step in range(BODY_GRADIENT_PERIOD))
+)
+
+# 脏矩形模式下每帧都在变化的图层（蛇头发光、食物脉冲；闪烁的星星单独处理）
+ANIMATED_LAYERS = ("head", "food")
+
+def draw_border(surface: pygame.Surface, color: Tuple[int, int, int], rect: pygame.Rect, width: int):
+    """
+    绘制矩形边框（矩形在Surface内时像素与 pygame.draw.rect(surface, color, rect, width) 相同）
+
+    pygame.draw.rect 在设置了裁剪区域时会把边框画在裁剪后的矩形上，
+    脏矩形模式按区域裁剪重绘，所以边框用四次fill绘制；fill会平移而不是
+    裁掉超出Surface的部分，先裁剪到Surface范围内。
+    """
+    bounds = surface.get_rect()
+    for side in ((rect.x, rect.y, rect.width, width),
+                 (rect.x, rect.bottom - width, rect.width, width),
+                 (rect.x, rect.y, width, rect.height),
+                 (rect.right - width, rect.y, width, rect.height)):
+        side = bounds.clip(side)
+        if side:
+            surface.fill(color, side)
 
 class SnakeGame:
+    """贪吃蛇渲染层：包装无界面的SnakeEngine，负责绘制、音效和统计"""
+
     def __init__(self, width: int = None, height: int = None, cell_size: int = None):
         """
         初始化贪吃蛇游戏
@@ -92,6 +100,7 @@ class SnakeGame:
         self.grid_height = self.height // self.cell_size
         
         # 颜色定义（支持主题）
+        self.theme_name = game_config.get("colors.theme", "default")
         self.theme_colors = get_theme_colors()
         self.BLACK = (0, 0, 0)
         self.WHITE = (255, 255, 255)
@@ -119,21 +128,44 @@ class SnakeGame:
         self.small_font = self.init_font(24)
         self.large_font = self.init_font(48)
 
-        # 初始化游戏状态
-        self.score = 0
+        # 游戏规则核心（无界面引擎）
+        self.engine = SnakeEngine(self.grid_width, self.grid_height)
         self.last_score = 0
-        self.game_over = False
 
         # 视觉效果相关
-        self.particles = []
+        self.particles = ParticleSystem(game_config.get("performance.particle_limit", 100))
         self.food_pulse = 0.0
         self.snake_glow = 0.0
         self.background_stars = self.generate_stars() if game_config.get("visual.enable_stars", True) else []
-        self.trail_positions = []
+        self.trail_positions = deque(maxlen=TRAIL_CAPACITY)
         self.score_animation = 0.0
+        self.frame_time = time.time()
+
+        # 轨迹贴图：按年龄分档的预着色半透明方块
+        self._trail_tiles = []
+        self._trail_tile_size = None
+
+        # 食物精灵缓存：(格子大小, 脉冲大小) -> Surface
+        self.food_sprites = LRUCache(32)
+
+        # 背景层缓存（渐变 + 网格）
+        self._background_layer = None
+        self._background_key = None
 
-        # 统计和音效
-        self.move_count = 0
+        # 渲染模式："full" 每帧整屏重绘，"dirty" 只重绘并提交变化的矩形
+        self.render_mode = game_config.get("visual.render_mode", "full")
+        self._dirty_layers = {}
+        self._drawn_structure = None
+        self._star_areas = None
+        self._star_areas_key = None
+        self._force_full_redraw = True
+
+        # 两个模拟步之间的渲染进度（0~1），用于插值蛇头和蛇尾的位置
+        self.interpolation = 1.0
+
+        # 配置热重载：主题和视觉效果变化时重建缓存的图层
+        game_config.subscribe("colors", self.on_config_changed)
+        game_config.subscribe("visual", self.on_config_changed)
 
         self.reset_game()
     
@@ -160,6 +192,18 @@ class SnakeGame:
         except:
             return pygame.font.Font(None, size)
 
+    def on_config_changed(self, changes: dict):
+        """响应主题和视觉配置的变化（窗口尺寸等仍需重启）"""
+        if any(path.startswith("colors.") for path in changes):
+            self.theme_name = game_config.get("colors.theme", "default")
+            self.theme_colors = get_theme_colors()
+            self.LIGHT_GREEN = self.theme_colors.get("snake_head", (144, 238, 144))
+        if "visual.enable_stars" in changes or "visual.star_count" in changes:
+            self.background_stars = self.generate_stars() if game_config.get("visual.enable_stars", True) else []
+        if "visual.render_mode" in changes:
+            self.render_mode = game_config.get("visual.render_mode", "full")
+        self.invalidate_background()
+
     def generate_stars(self) -> List[Tuple[int, int, int]]:
         """生成背景星星"""
         stars = []
@@ -171,103 +215,100 @@ class SnakeGame:
             stars.append((x, y, brightness))
         return stars
 
+    # ---- 游戏状态（委托给引擎） ----
+    @property
+    def snake(self) -> List[Tuple[int, int]]:
+        return self.engine.snake
+
+    @property
+    def food(self) -> Tuple[int, int]:
+        return self.engine.food
+
+    @food.setter
+    def food(self, value: Tuple[int, int]):
+        self.engine.food = value
+
+    @property
+    def direction(self) -> Direction:
+        return self.engine.direction
+
+    @direction.setter
+    def direction(self, value: Direction):
+        self.engine.direction = value
+
+    @property
+    def score(self) -> int:
+        return self.engine.score
+
+    @property
+    def game_over(self) -> bool:
+        return self.engine.game_over
+
+    @property
+    def won(self) -> bool:
+        return self.engine.won
+
+    @property
+    def move_count(self) -> int:
+        return self.engine.move_count
+
     def reset_game(self):
         """重置游戏状态"""
         # 记录上一局统计
-        if hasattr(self, 'snake') and self.score > 0:
+        if self.score > 0:
             game_stats.end_game(self.score, len(self.snake))
 
-        # 蛇的初始位置（中心）
-        center_x = self.grid_width // 2
-        center_y = self.grid_height // 2
-        self.snake = [(center_x, center_y)]
-        self.direction = Direction.RIGHT
-
-        # 生成食物
-        self.food = self.generate_food()
-
         # 游戏状态
         self.last_score = self.score
-        self.score = 0
-        self.game_over = False
-        self.move_count = 0
+        self.engine.reset()
 
         # 重置视觉效果
         self.particles.clear()
         self.trail_positions.clear()
         self.score_animation = 0.0
+        self._force_full_redraw = True
 
         # 开始新游戏统计
         game_stats.start_game()
-        
+
     def generate_food(self) -> Tuple[int, int]:
         """生成食物位置"""
-        while True:
-            x = random.randint(0, self.grid_width - 1)
-            y = random.randint(0, self.grid_height - 1)
-            if (x, y) not in self.snake:
-                return (x, y)
-    
+        return self.engine.generate_food()
+
     def is_valid_position(self, pos: Tuple[int, int]) -> bool:
         """检查位置是否有效（不撞墙，不撞自己）"""
-        x, y = pos
-        if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
-            return False
-        if pos in self.snake:
-            return False
-        return True
-    
+        return self.engine.is_valid_position(pos)
+
     def get_head_position(self) -> Tuple[int, int]:
         """获取蛇头位置"""
-        return self.snake[0]
-    
+        return self.engine.get_head_position()
+
     def get_next_position(self, direction: Direction) -> Tuple[int, int]:
         """根据方向获取下一个位置"""
-        head_x, head_y = self.get_head_position()
-        dx, dy = direction.value
-        return (head_x + dx, head_y + dy)
-    
+        return self.engine.get_next_position(direction)
+
     def move(self, direction: Direction) -> bool:
         """
-        移动蛇
-        
+        移动蛇，并根据引擎事件触发音效、视觉效果和统计
+
         Args:
             direction: 移动方向
-            
+
         Returns:
             bool: 游戏是否继续
         """
-        if self.game_over:
+        alive = self.engine.move(direction)
+        event = self.engine.last_event
+        if event is None:
             return False
-            
-        # 防止蛇反向移动
-        if len(self.snake) > 1:
-            opposite_direction = {
-                Direction.UP: Direction.DOWN,
-                Direction.DOWN: Direction.UP,
-                Direction.LEFT: Direction.RIGHT,
-                Direction.RIGHT: Direction.LEFT
-            }
-            if direction == opposite_direction.get(self.direction):
-                direction = self.direction
-        
-        self.direction = direction
-        next_pos = self.get_next_position(direction)
-        
-        # 检查碰撞
-        if not self.is_valid_position(next_pos):
-            self.game_over = True
+        visual = game_config.snapshot.visual
 
+        if event['collision']:
             # 音效和视觉效果
             audio_system.play_game_over_sound()
-            if game_config.get("visual.enable_particles", True):
-                self.create_explosion_particles(self.get_head_position())
-
+            if visual.enable_particles:
+                self.create_explosion_particles(event['head'])
             return False
-        
-        # 移动蛇头
-        self.snake.insert(0, next_pos)
-        self.move_count += 1
 
         # 记录移动统计
         game_stats.record_move()
@@ -275,9 +316,7 @@ class SnakeGame:
         # 播放移动音效（偶尔）
         audio_system.play_move_sound()
 
-        # 检查是否吃到食物
-        if next_pos == self.food:
-            self.score += 1
+        if event['ate_food']:
             self.score_animation = 1.0  # 触发分数动画
 
             # 记录统计
@@ -285,38 +324,18 @@ class SnakeGame:
 
             # 音效和视觉效果
             audio_system.play_eat_sound()
-            if game_config.get("visual.enable_particles", True):
-                self.create_food_particles(next_pos)
-
-            self.food = self.generate_food()
-        else:
-            # 没吃到食物，移除蛇尾
-            tail_pos = self.snake.pop()
+            if visual.enable_particles:
+                self.create_food_particles(event['head'])
+        elif event['tail'] is not None:
             # 添加尾部轨迹效果
-            if game_config.get("visual.enable_trail", True):
-                self.trail_positions.append((tail_pos, time.time()))
-        
-        return True
-    
+            if visual.enable_trail:
+                self.trail_positions.append((event['tail'], time.time()))
+
+        return alive
+
     def get_possible_moves(self) -> List[Direction]:
         """获取所有可能的移动方向"""
-        possible_moves = []
-        for direction in Direction:
-            next_pos = self.get_next_position(direction)
-            if self.is_valid_position(next_pos):
-                # 防止反向移动
-                if len(self.snake) > 1:
-                    opposite_direction = {
-                        Direction.UP: Direction.DOWN,
-                        Direction.DOWN: Direction.UP,
-                        Direction.LEFT: Direction.RIGHT,
-                        Direction.RIGHT: Direction.LEFT
-                    }
-                    if direction != opposite_direction.get(self.direction):
-                        possible_moves.append(direction)
-                else:
-                    possible_moves.append(direction)
-        return possible_moves
+        return self.engine.get_possible_moves()
 
     def create_food_particles(self, pos: Tuple[int, int]):
         """创建食物被吃掉时的粒子效果"""
@@ -325,13 +344,9 @@ class SnakeGame:
         screen_y = y * self.cell_size + self.cell_size // 2
 
         # 创建多个粒子
-        for _ in range(15):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(50, 150)
-            velocity = (math.cos(angle) * speed, math.sin(angle) * speed)
-            color = random.choice([self.GOLD, self.ORANGE, self.RED, self.YELLOW])
-            particle = Particle(screen_x, screen_y, color, velocity, random.uniform(0.5, 1.5))
-            self.particles.append(particle)
+        self.particles.emit(screen_x, screen_y, 15,
+                            [self.GOLD, self.ORANGE, self.RED, self.YELLOW],
+                            speed=(50, 150), lifetime=(0.5, 1.5))
 
     def create_explosion_particles(self, pos: Tuple[int, int]):
         """创建爆炸粒子效果（游戏结束时）"""
@@ -340,19 +355,13 @@ class SnakeGame:
         screen_y = y * self.cell_size + self.cell_size // 2
 
         # 创建爆炸粒子
-        for _ in range(25):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(100, 300)
-            velocity = (math.cos(angle) * speed, math.sin(angle) * speed)
-            color = random.choice([self.RED, self.ORANGE, self.YELLOW, self.WHITE])
-            particle = Particle(screen_x, screen_y, color, velocity, random.uniform(1.0, 2.0))
-            self.particles.append(particle)
+        self.particles.emit(screen_x, screen_y, 25,
+                            [self.RED, self.ORANGE, self.YELLOW, self.WHITE],
+                            speed=(100, 300), lifetime=(1.0, 2.0))
 
     def update_particles(self, dt: float):
         """更新所有粒子"""
-        self.particles = [p for p in self.particles if p.is_alive()]
-        for particle in self.particles:
-            particle.update(dt)
+        self.particles.update(dt)
 
     def update_visual_effects(self, dt: float):
         """更新所有视觉效果"""
@@ -371,90 +380,267 @@ class SnakeGame:
             if self.score_animation < 0:
                 self.score_animation = 0
 
-        # 清理过期的轨迹
-        current_time = time.time()
-        self.trail_positions = [(pos, t) for pos, t in self.trail_positions
-                               if current_time - t < 0.5]
+        # 清理过期的轨迹（按时间顺序追加，过期的都在左端）
+        self.frame_time = time.time()
+        trail = self.trail_positions
+        while trail and self.frame_time - trail[0][1] >= TRAIL_LIFETIME:
+            trail.popleft()
     
-    def draw_background(self):
-        """绘制背景"""
-        # 渐变背景
+    def get_background_layer(self) -> pygame.Surface:
+        """
+        获取缓存的背景层（渐变 + 网格）
+
+        背景层只在窗口尺寸、格子大小或主题变化时重新绘制一次，
+        每帧只需要一次blit。
+        """
+        key = (self.width, self.height, self.cell_size, self.theme_name)
+        if self._background_layer is None or self._background_key != key:
+            layer = pygame.Surface((self.width, self.height)).convert()
+            self.draw_gradient(layer)
+            self.draw_grid(layer)
+            self._background_layer = layer
+            self._background_key = key
+        return self._background_layer
+
+    def invalidate_background(self):
+        """使背景层缓存失效（窗口尺寸或主题变化后调用）"""
+        self._background_layer = None
+        self._force_full_redraw = True
+
+    def draw_gradient(self, surface: pygame.Surface):
+        """绘制渐变背景"""
         for y in range(self.height):
             color_ratio = y / self.height
             r = int(10 * (1 - color_ratio) + 30 * color_ratio)
             g = int(10 * (1 - color_ratio) + 20 * color_ratio)
             b = int(30 * (1 - color_ratio) + 50 * color_ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.width, y))
+            pygame.draw.line(surface, (r, g, b), (0, y), (self.width, y))
 
-        # 绘制星星
-        for star_x, star_y, brightness in self.background_stars:
-            alpha = int(brightness * (0.5 + 0.5 * math.sin(time.time() * 2 + star_x * 0.01)))
-            color = (alpha, alpha, alpha)
-            pygame.draw.circle(self.screen, color, (star_x, star_y), 1)
-
-    def draw_grid(self):
+    def draw_grid(self, surface: pygame.Surface):
         """绘制网格"""
         for x in range(0, self.width, self.cell_size):
-            pygame.draw.line(self.screen, self.DARK_GRAY, (x, 0), (x, self.height))
+            pygame.draw.line(surface, self.DARK_GRAY, (x, 0), (x, self.height))
         for y in range(0, self.height, self.cell_size):
-            pygame.draw.line(self.screen, self.DARK_GRAY, (0, y), (self.width, y))
+            pygame.draw.line(surface, self.DARK_GRAY, (0, y), (self.width, y))
+
+    def get_star_colors(self) -> List[Tuple[int, int, int]]:
+        """获取本帧每颗星星的颜色（亮度随时间闪烁）"""
+        now = self.frame_time
+        colors = []
+        for star_x, _, brightness in self.background_stars:
+            alpha = int(brightness * (0.5 + 0.5 * math.sin(now * 2 + star_x * 0.01)))
+            colors.append((alpha, alpha, alpha))
+        return colors
+
+    def get_star_areas(self) -> Tuple[List[pygame.Rect], List[List[int]], List[bool]]:
+        """
+        获取每颗星星覆盖的区域、格子编号以及是否与其他星星重叠（星星或格子大小变化时重新计算）
+
+        Returns:
+            (区域列表, 格子编号列表, 是否重叠列表)
+        """
+        key = (self.cell_size, self.grid_width, self.grid_height)
+        if self._star_areas is None or self._star_areas_key != (self.background_stars, key):
+            cell_size = self.cell_size
+            rects = [pygame.Rect(star_x - 1, star_y - 1, 3, 3) for star_x, star_y, _ in self.background_stars]
+            cells = []
+            for rect in rects:
+                columns = {x // cell_size for x in (rect.left, rect.right - 1) if 0 <= x // cell_size < self.grid_width}
+                rows = {y // cell_size for y in (rect.top, rect.bottom - 1) if 0 <= y // cell_size < self.grid_height}
+                cells.append([y * self.grid_width + x for y in rows for x in columns])
+            overlaps = [len(rect.collidelistall(rects)) > 1 for rect in rects]
+            self._star_areas = (rects, cells, overlaps)
+            self._star_areas_key = (self.background_stars, key)
+        return self._star_areas
+
+    def draw_background(self):
+        """绘制背景：缓存的背景层 + 闪烁的星星"""
+        self.screen.blit(self.get_background_layer(), (0, 0))
+
+        # 绘制星星
+        for (star_x, star_y, _), color in zip(self.background_stars, self.get_star_colors()):
+            pygame.draw.circle(self.screen, color, (star_x, star_y), 1)
+
+    def get_trail_tiles(self) -> List[pygame.Surface]:
+        """获取按年龄分档的轨迹贴图（格子大小变化时重新生成）"""
+        if self._trail_tile_size != self.cell_size:
+            size = self.cell_size - 4
+            self._trail_tiles = []
+            for level in range(TRAIL_ALPHA_LEVELS):
+                tile = pygame.Surface((size, size))
+                tile.fill(self.CYAN)
+                tile.set_alpha(int(100 * (1 - level / TRAIL_ALPHA_LEVELS)), pygame.RLEACCEL)
+                self._trail_tiles.append(tile)
+            self._trail_tile_size = self.cell_size
+        return self._trail_tiles
+
+    def get_trail_blits(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """获取本帧要绘制的轨迹贴图和位置（按年龄选择透明度分档）"""
+        if not self.trail_positions:
+            return []
+        tiles = self.get_trail_tiles()
+        now = self.frame_time
+        cell_size = self.cell_size
+        scale = TRAIL_ALPHA_LEVELS / TRAIL_LIFETIME
+        return [
+            (tiles[int((now - timestamp) * scale)], (x * cell_size + 2, y * cell_size + 2))
+            for (x, y), timestamp in self.trail_positions
+            if 0 <= now - timestamp < TRAIL_LIFETIME
+        ]
 
     def draw_trail(self):
-        """绘制蛇的轨迹效果"""
-        current_time = time.time()
-        for pos, timestamp in self.trail_positions:
-            age = current_time - timestamp
-            if age < 0.5:
-                alpha = int(100 * (1 - age / 0.5))
-                x, y = pos
-                rect = pygame.Rect(x * self.cell_size + 2, y * self.cell_size + 2,
-                                 self.cell_size - 4, self.cell_size - 4)
-                # 创建带透明度的表面
-                trail_surface = pygame.Surface((self.cell_size - 4, self.cell_size - 4))
-                trail_surface.set_alpha(alpha)
-                trail_surface.fill(self.CYAN)
-                self.screen.blit(trail_surface, rect)
+        """绘制蛇的轨迹效果（复用预着色的贴图，一次批量blit）"""
+        self.screen.blits(self.get_trail_blits(), doreturn=False)
 
-    def draw_snake(self):
-        """绘制蛇"""
-        for i, segment in enumerate(self.snake):
+    def get_interpolation_origins(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """
+        获取蛇头和蛇尾在上一步开始时所在的格子
+
+        Returns:
+            (蛇头起点, 蛇尾起点)，不需要插值的一端为None
+        """
+        event = self.engine.last_event
+        if self.interpolation >= 1.0 or not event or event['collision']:
+            return None, None
+        if len(self.snake) > 1:
+            head_from = self.snake[1]
+        else:
+            head_from = event['tail']
+        return head_from, event['tail']
+
+    def get_moving_pieces(self) -> Tuple[Optional[Tuple[int, float, float]], Tuple[int, float, float]]:
+        """
+        获取按插值进度移动的蛇尾和蛇头
+
+        Returns:
+            (蛇尾, 蛇头)，每项为 (段下标, 网格x, 网格y)；蛇尾不需要插值时为None
+        """
+        alpha = self.interpolation
+        head_from, tail_from = self.get_interpolation_origins()
+        last = len(self.snake) - 1
+
+        def place(index, segment, origin):
             x, y = segment
-            rect = pygame.Rect(x * self.cell_size, y * self.cell_size,
-                             self.cell_size, self.cell_size)
-
-            if i == 0:  # 蛇头
-                # 发光效果
-                glow_intensity = int(50 + 30 * math.sin(self.snake_glow))
-                glow_color = (0, 255 - glow_intensity, 0)
-
-                # 绘制发光外圈
-                glow_rect = pygame.Rect(x * self.cell_size - 2, y * self.cell_size - 2,
-                                      self.cell_size + 4, self.cell_size + 4)
-                pygame.draw.rect(self.screen, glow_color, glow_rect, 2)
-
-                # 绘制蛇头
-                pygame.draw.rect(self.screen, self.LIGHT_GREEN, rect)
-                pygame.draw.rect(self.screen, self.WHITE, rect, 2)
-
-                # 绘制眼睛
-                eye_size = 3
-                eye1_pos = (x * self.cell_size + 5, y * self.cell_size + 5)
-                eye2_pos = (x * self.cell_size + self.cell_size - 8, y * self.cell_size + 5)
-                pygame.draw.circle(self.screen, self.RED, eye1_pos, eye_size)
-                pygame.draw.circle(self.screen, self.RED, eye2_pos, eye_size)
-            else:  # 蛇身
-                # 渐变色蛇身
-                segment_ratio = i / len(self.snake)
+            if origin is not None:
+                x = origin[0] + (x - origin[0]) * alpha
+                y = origin[1] + (y - origin[1]) * alpha
+            return index, x, y
+
+        tail = place(last, self.snake[-1], tail_from) if tail_from is not None and last > 0 else None
+        return tail, place(0, self.snake[0], head_from)
+
+    def get_segments_in(self, area: pygame.Rect) -> List[Tuple[int, int, int]]:
+        """
+        获取格子与区域相交的静止蛇身段（不含蛇头），按从蛇尾到蛇头的绘制顺序
+
+        Returns:
+            (段下标, 网格x, 网格y) 列表
+        """
+        cell_size = self.cell_size
+        left = max(area.left // cell_size, 0)
+        right = min((area.right - 1) // cell_size, self.grid_width - 1)
+        top = max(area.top // cell_size, 0)
+        bottom = min((area.bottom - 1) // cell_size, self.grid_height - 1)
+        occupied = self.engine.get_occupancy()
+        segment_index = self.engine.segment_index
+        width = self.grid_width
+        segments = []
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                cell = y * width + x
+                if occupied[cell]:
+                    index = segment_index(cell)
+                    if index > 0:
+                        segments.append((index, x, y))
+        segments.sort(reverse=True)
+        return segments
+
+    def draw_segment(self, index: int, x: float, y: float):
+        """
+        绘制一段蛇身（下标0为蛇头）
+
+        Args:
+            index: 段下标
+            x, y: 网格坐标（插值时可以是小数）
+        """
+        cell_size = self.cell_size
+        rect = pygame.Rect(int(x * cell_size), int(y * cell_size), cell_size, cell_size)
+
+        if index == 0:  # 蛇头
+            # 发光效果
+            glow_rect = rect.inflate(4, 4)
+            glow_intensity = int(50 + 30 * math.sin(self.snake_glow))
+            glow_color = (0, 255 - glow_intensity, 0)
+
+            # 绘制发光外圈
+            draw_border(self.screen, glow_color, glow_rect, 2)
+
+            # 绘制蛇头
+            pygame.draw.rect(self.screen, self.LIGHT_GREEN, rect)
+            draw_border(self.screen, self.WHITE, rect, 2)
+
+            # 绘制眼睛
+            eye_size = 3
+            eye1_pos = (rect.x + 5, rect.y + 5)
+            eye2_pos = (rect.x + cell_size - 8, rect.y + 5)
+            pygame.draw.circle(self.screen, self.RED, eye1_pos, eye_size)
+            pygame.draw.circle(self.screen, self.RED, eye2_pos, eye_size)
+        else:  # 蛇身
+            if self.render_mode == "dirty":
+                # 按蛇身段的序号取色，蛇移动时已有蛇身段的颜色不变
+                body_color = BODY_COLORS[(self.engine.head_clock - index) % BODY_GRADIENT_PERIOD]
+            else:
+                # 渐变色蛇身：从蛇头到蛇尾按比例过渡
+                segment_ratio = index / len(self.snake)
                 r = int(0 + (100 * segment_ratio))
                 g = int(200 - (100 * segment_ratio))
                 b = int(50 + (100 * segment_ratio))
                 body_color = (r, g, b)
 
-                pygame.draw.rect(self.screen, body_color, rect)
-                pygame.draw.rect(self.screen, self.WHITE, rect, 1)
+            pygame.draw.rect(self.screen, body_color, rect)
+            draw_border(self.screen, self.WHITE, rect, 1)
+
+    def draw_snake(self):
+        """绘制蛇（蛇头和蛇尾按插值进度在两个格子之间平滑移动，蛇身不动）"""
+        tail, head = self.get_moving_pieces()
+        last = len(self.snake) - 1
+
+        # 从蛇尾画到蛇头：先画从上一步蛇尾滑入的尾巴，再画静止的蛇身，
+        # 最后画从第二段滑向当前格子的蛇头（压在第二段上面）
+        if tail is not None:
+            self.draw_segment(*tail)
+        for index, (x, y) in zip(range(last, 0, -1), reversed(self.snake)):
+            self.draw_segment(index, x, y)
+        self.draw_segment(*head)
+
+    def build_food_sprite(self, pulse_size: int) -> pygame.Surface:
+        """
+        预渲染某个脉冲大小的食物精灵（发光圈 + 食物本体）
+
+        五层半透明的橙色发光圈按从外到内的叠加透明度直接画进一张
+        带透明通道的Surface，绘制时只需要一次blit。
+        """
+        outer = pulse_size + 10
+        sprite = pygame.Surface((outer * 2, outer * 2), pygame.SRCALPHA)
+        center = (outer, outer)
+
+        # 绘制发光圈（内圈的透明度是外面各层叠加后的结果）
+        transparency = 1.0
+        for radius in range(outer, pulse_size, -2):
+            alpha = int(100 * (1 - (radius - pulse_size) / 10))
+            transparency *= 1 - alpha / 255
+            pygame.draw.circle(sprite, (*self.ORANGE, int(255 * (1 - transparency))), center, radius)
+
+        # 绘制食物本体
+        pygame.draw.circle(sprite, self.RED, center, pulse_size)
+        pygame.draw.circle(sprite, self.GOLD, center, pulse_size - 2)
+        pygame.draw.circle(sprite, self.WHITE, center, pulse_size, 2)
+        return sprite
 
     def draw_food(self):
-        """绘制食物"""
+        """绘制食物（使用按脉冲大小缓存的精灵）"""
+        if self.food is None:
+            return
         food_x, food_y = self.food
         center_x = food_x * self.cell_size + self.cell_size // 2
         center_y = food_y * self.cell_size + self.cell_size // 2
@@ -462,62 +648,48 @@ class SnakeGame:
         # 脉冲效果
         pulse_size = int(self.cell_size // 2 + 5 * math.sin(self.food_pulse))
 
-        # 绘制发光圈
-        for radius in range(pulse_size + 10, pulse_size, -2):
-            alpha = int(100 * (1 - (radius - pulse_size) / 10))
-            glow_surface = pygame.Surface((radius * 2, radius * 2))
-            glow_surface.set_alpha(alpha)
-            pygame.draw.circle(glow_surface, self.ORANGE, (radius, radius), radius)
-            self.screen.blit(glow_surface, (center_x - radius, center_y - radius))
-
-        # 绘制食物本体
-        pygame.draw.circle(self.screen, self.RED, (center_x, center_y), pulse_size)
-        pygame.draw.circle(self.screen, self.GOLD, (center_x, center_y), pulse_size - 2)
-        pygame.draw.circle(self.screen, self.WHITE, (center_x, center_y), pulse_size, 2)
+        sprite = self.food_sprites.get((self.cell_size, pulse_size),
+                                       lambda: self.build_food_sprite(pulse_size))
+        outer = pulse_size + 10
+        self.screen.blit(sprite, (center_x - outer, center_y - outer))
 
     def draw_particles(self):
         """绘制粒子效果"""
-        for particle in self.particles:
-            if particle.is_alive():
-                alpha = particle.get_alpha()
-                particle_surface = pygame.Surface((int(particle.size * 2), int(particle.size * 2)))
-                particle_surface.set_alpha(alpha)
-                pygame.draw.circle(particle_surface, particle.color,
-                                 (int(particle.size), int(particle.size)), int(particle.size))
-                self.screen.blit(particle_surface,
-                               (int(particle.x - particle.size), int(particle.y - particle.size)))
-
-    def draw_ui(self):
-        """绘制用户界面"""
-        # 绘制分数
-        score_color = self.WHITE
+        self.particles.draw(self.screen)
+
+    def get_ui_blits(self) -> List[Tuple[pygame.Surface, pygame.Rect]]:
+        """获取本帧界面上要绘制的文字（和游戏结束遮罩）及其位置"""
+        blits = []
+        # 绘制分数（白色文字走缓存；动画期间颜色每帧都在变，复制一份再染色，
+        # 避免每帧一个颜色的单次文字挤掉缓存里的静态文字）
+        score_text = text_cache.render(self.font, f"{get_text('score')}: {self.score}", self.WHITE)
         if self.score_animation > 0:
             # 分数动画效果
             score_color = (255, int(255 * (1 - self.score_animation)), int(255 * (1 - self.score_animation)))
-
-        score_text = self.font.render(f"{get_text('score')}: {self.score}", True, score_color)
-        self.screen.blit(score_text, (10, 10))
+            score_text = score_text.copy()
+            score_text.fill(score_color, special_flags=pygame.BLEND_RGB_MULT)
+        blits.append((score_text, score_text.get_rect(topleft=(10, 10))))
 
         # 绘制蛇的长度
-        length_text = self.small_font.render(f"{get_text('length')}: {len(self.snake)}", True, self.WHITE)
-        self.screen.blit(length_text, (10, 50))
+        length_text = text_cache.render(self.small_font, f"{get_text('length')}: {len(self.snake)}", self.WHITE)
+        blits.append((length_text, length_text.get_rect(topleft=(10, 50))))
 
         # 绘制最高分
         if self.last_score > 0:
-            best_text = self.small_font.render(f"{get_text('last_score')}: {self.last_score}", True, self.GRAY)
-            self.screen.blit(best_text, (10, 75))
+            best_text = text_cache.render(self.small_font, f"{get_text('last_score')}: {self.last_score}", self.GRAY)
+            blits.append((best_text, best_text.get_rect(topleft=(10, 75))))
 
         # 绘制统计信息
         stats = game_stats.get_all_time_stats()
         if stats["highest_score"] > 0:
-            high_score_text = self.small_font.render(f"{get_text('high_score')}: {stats['highest_score']}", True, self.GOLD)
-            self.screen.blit(high_score_text, (10, 100))
+            high_score_text = text_cache.render(self.small_font, f"{get_text('high_score')}: {stats['highest_score']}", self.GOLD)
+            blits.append((high_score_text, high_score_text.get_rect(topleft=(10, 100))))
 
         # 绘制AI状态指示器
-        ai_text = self.small_font.render(get_text("ai_controlling"), True, self.CYAN)
+        ai_text = text_cache.render(self.small_font, get_text("ai_controlling"), self.CYAN)
         ai_rect = ai_text.get_rect()
         ai_rect.topright = (self.width - 10, 10)
-        self.screen.blit(ai_text, ai_rect)
+        blits.append((ai_text, ai_rect))
 
         # 绘制游戏结束信息
         if self.game_over:
@@ -525,39 +697,212 @@ class SnakeGame:
             overlay = pygame.Surface((self.width, self.height))
             overlay.set_alpha(128)
             overlay.fill(self.BLACK)
-            self.screen.blit(overlay, (0, 0))
+            blits.append((overlay, overlay.get_rect()))
 
-            # 游戏结束文本
-            game_over_text = self.large_font.render(get_text("game_over"), True, self.RED)
+            # 游戏结束文本（填满棋盘时显示胜利）
+            if self.won:
+                game_over_text = text_cache.render(self.large_font, get_text("victory"), self.GOLD)
+            else:
+                game_over_text = text_cache.render(self.large_font, get_text("game_over"), self.RED)
             game_over_rect = game_over_text.get_rect(center=(self.width//2, self.height//2 - 50))
-            self.screen.blit(game_over_text, game_over_rect)
+            blits.append((game_over_text, game_over_rect))
 
             # 最终分数
-            final_score_text = self.font.render(f"{get_text('final_score')}: {self.score}", True, self.WHITE)
+            final_score_text = text_cache.render(self.font, f"{get_text('final_score')}: {self.score}", self.WHITE)
             final_score_rect = final_score_text.get_rect(center=(self.width//2, self.height//2))
-            self.screen.blit(final_score_text, final_score_rect)
+            blits.append((final_score_text, final_score_rect))
 
             # 重新开始提示
-            restart_text = self.small_font.render(get_text("restart_hint"), True, self.GRAY)
+            restart_text = text_cache.render(self.small_font, get_text("restart_hint"), self.GRAY)
             restart_rect = restart_text.get_rect(center=(self.width//2, self.height//2 + 50))
-            self.screen.blit(restart_text, restart_rect)
+            blits.append((restart_text, restart_rect))
+
+        return blits
+
+    def draw_ui(self, blits: List[Tuple[pygame.Surface, pygame.Rect]] = None):
+        """
+        绘制用户界面
+
+        Args:
+            blits: get_ui_blits() 的结果，None时重新获取
+        """
+        if blits is None:
+            blits = self.get_ui_blits()
+        self.screen.blits(blits, doreturn=False)
+
+    def get_food_rect(self) -> Optional[pygame.Rect]:
+        """获取食物（含最大脉冲发光圈）可能覆盖的区域"""
+        if self.food is None:
+            return None
+        cell_size = self.cell_size
+        outer = cell_size // 2 + 15
+        center_x = self.food[0] * cell_size + cell_size // 2
+        center_y = self.food[1] * cell_size + cell_size // 2
+        return pygame.Rect(center_x - outer, center_y - outer, outer * 2, outer * 2)
+
+    def get_dirty_layers(self, ui_blits: List[Tuple[pygame.Surface, pygame.Rect]]) -> Dict[str, Dict[object, pygame.Rect]]:
+        """
+        获取本帧各动态图层的内容标识和覆盖区域
+
+        同一图层中标识不变的项画出来的像素也不变；蛇身颜色按段固定，
+        中间的蛇身不属于任何动态图层。
+
+        Returns:
+            图层名 -> {内容标识: 区域}
+        """
+        cell_size = self.cell_size
+        tail, head = self.get_moving_pieces()
+        _, head_x, head_y = head
+        layers = {
+            "head": {"head": pygame.Rect(int(head_x * cell_size), int(head_y * cell_size),
+                                         cell_size, cell_size).inflate(4, 4)},
+        }
+
+        # 蛇尾所在的格子只在移动时变化，插值时再加上滑动中的尾巴；按位置和蛇身段序号标识
+        tail_x, tail_y = self.snake[-1]
+        tail_rects = [pygame.Rect(tail_x * cell_size, tail_y * cell_size, cell_size, cell_size)]
+        if tail is not None:
+            tail_rects.append(pygame.Rect(int(tail[1] * cell_size), int(tail[2] * cell_size),
+                                          cell_size, cell_size))
+        serial = self.engine.head_clock - (len(self.snake) - 1)
+        layers["tail"] = {(tuple(rect), serial): rect for rect in tail_rects}
+
+        food_rect = self.get_food_rect()
+        layers["food"] = {"food": food_rect} if food_rect is not None else {}
+
+        # 轨迹贴图按透明度分档标识，同一格子重复出现时按出现次数区分
+        trail = {}
+        for tile, (x, y) in self.get_trail_blits():
+            key = (x, y, tile)
+            count = 0
+            while (key, count) in trail:
+                count += 1
+            trail[(key, count)] = tile.get_rect(topleft=(x, y))
+        layers["trail"] = trail
+
+        layers["ui"] = {(surface, tuple(rect)): rect for surface, rect in ui_blits}
+        return layers
+
+    def draw(self, interpolation: float = 1.0):
+        """
+        主绘制方法
+
+        Args:
+            interpolation: 距上一个模拟步的进度（0~1），1表示直接画在当前格子上
+        """
+        self.interpolation = interpolation
 
-    def draw(self):
-        """主绘制方法"""
         # 更新视觉效果
         dt = self.clock.get_time() / 1000.0
         self.update_visual_effects(dt)
 
-        # 绘制所有元素
+        if self.render_mode != "dirty":
+            self.draw_full()
+            pygame.display.flip()
+            return
+
+        # 粒子和游戏结束遮罩覆盖范围不固定，这些帧以及它们之后的一帧整屏重绘；
+        # 蛇身被直接替换（不是逐步移动）时各段的颜色都会变化，同样整屏重绘
+        structure = self.engine.state_version - self.engine.head_clock
+        needs_full = len(self.particles) > 0 or self.game_over
+        if needs_full or self._force_full_redraw or structure != self._drawn_structure:
+            ui_blits = self.draw_full()
+            self._dirty_layers = self.get_dirty_layers(ui_blits)
+            self._force_full_redraw = needs_full
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.draw_dirty())
+        self._drawn_structure = structure
+
+    def draw_full(self) -> List[Tuple[pygame.Surface, pygame.Rect]]:
+        """整屏重绘，返回界面文字的绘制列表"""
         self.draw_background()
-        self.draw_grid()
         self.draw_trail()
         self.draw_snake()
         self.draw_food()
         self.draw_particles()
-        self.draw_ui()
+        ui_blits = self.get_ui_blits()
+        self.draw_ui(ui_blits)
+        return ui_blits
+
+    def draw_dirty(self) -> List[pygame.Rect]:
+        """
+        脏矩形重绘：只重新合成本帧有变化的区域
+
+        蛇头和食物每帧都在变化，它们上一帧和本帧的区域都要重绘；蛇尾、轨迹和
+        界面文字只重绘内容标识变化的项。每个区域在裁剪范围内按整屏重绘的顺序
+        重新绘制与它相交的元素，结果与整屏重绘一致。闪烁的星星每帧都重画，
+        不与其他元素重叠时直接擦除重画，否则同样裁剪合成。
 
-        pygame.display.flip()
+        Returns:
+            需要提交到屏幕的矩形
+        """
+        ui_blits = self.get_ui_blits()
+        layers = self.get_dirty_layers(ui_blits)
+        previous = self._dirty_layers
+        self._dirty_layers = layers
+
+        dirty = {}
+        for name in layers.keys() | previous.keys():
+            items = layers.get(name, {})
+            old_items = previous.get(name, {})
+            if name in ANIMATED_LAYERS:
+                changed = chain(old_items.values(), items.values())
+            else:
+                changed = chain((rect for key, rect in old_items.items() if key not in items),
+                                (rect for key, rect in items.items() if key not in old_items))
+            for rect in changed:
+                dirty[tuple(rect)] = rect
+        rects = list(dirty.values())
+
+        screen = self.screen
+        background = self.get_background_layer()
+        stars = self.background_stars
+        star_rects, star_cells, star_overlaps = self.get_star_areas()
+        star_colors = self.get_star_colors()
+        trail_blits = self.get_trail_blits()
+        trail_rects = list(layers["trail"].values())
+        food_rect = layers["food"].get("food")
+        ui_rects = [rect for _, rect in ui_blits]
+        tail, head = self.get_moving_pieces()
+        head_rect = layers["head"]["head"]
+        tail_rect = None
+        if tail is not None:
+            tail_rect = pygame.Rect(int(tail[1] * self.cell_size), int(tail[2] * self.cell_size),
+                                    self.cell_size, self.cell_size)
+
+        # 不与其他元素重叠的星星直接用背景擦除后重画，其余的星星加入裁剪合成
+        obstacles = trail_rects + ui_rects + [head_rect]
+        obstacles += [rect for rect in (tail_rect, food_rect) if rect is not None]
+        occupied = self.engine.get_occupancy()
+        updated = list(rects)
+        for index, star_rect in enumerate(star_rects):
+            if (star_overlaps[index] or star_rect.collidelist(obstacles) >= 0 or
+                    any(occupied[cell] for cell in star_cells[index])):
+                rects.append(star_rect)
+            else:
+                screen.blit(background, star_rect, star_rect)
+                pygame.draw.circle(screen, star_colors[index], stars[index][:2], 1)
+            updated.append(star_rect)
+
+        for rect in rects:
+            screen.set_clip(rect)
+            screen.blit(background, rect, rect)
+            for index in rect.collidelistall(star_rects):
+                pygame.draw.circle(screen, star_colors[index], stars[index][:2], 1)
+            if trail_blits:
+                screen.blits([trail_blits[index] for index in rect.collidelistall(trail_rects)], doreturn=False)
+            if tail_rect is not None and tail_rect.colliderect(rect):
+                self.draw_segment(*tail)
+            for index, x, y in self.get_segments_in(rect):
+                self.draw_segment(index, x, y)
+            if head_rect.colliderect(rect):
+                self.draw_segment(*head)
+            if food_rect is not None and food_rect.colliderect(rect):
+                self.draw_food()
+            screen.blits([ui_blits[index] for index in rect.collidelistall(ui_rects)], doreturn=False)
+        screen.set_clip(None)
+        return updated
     
     def handle_events(self) -> bool:
         """处理pygame事件"""
@@ -571,12 +916,4 @@ class SnakeGame:
     
     def get_game_state(self) -> dict:
         """获取游戏状态信息，供AI使用"""
-        return {
-            'snake': self.snake.copy(),
-            'food': self.food,
-            'direction': self.direction,
-            'score': self.score,
-            'game_over': self.game_over,
-            'grid_width': self.grid_width,
-            'grid_height': self.grid_height
-        }
+        return self.engine.get_game_state()
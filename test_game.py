@@ -24,6 +24,10 @@ def test_imports():
         from audio_system import audio_system
         print(f"    ✅ 音效系统正常，状态: {'启用' if audio_system.enabled else '禁用'}")
         
+        print("  - 测试无界面引擎...")
+        from game_engine import SnakeEngine
+        print("    ✅ 无界面引擎正常")
+        
         print("  - 测试游戏核心...")
         from snake_game import SnakeGame
         print("    ✅ 游戏核心正常")
@@ -56,8 +60,75 @@ def test_config():
         print(f"  - AI算法: {game_config.get('ai.algorithm', 'astar')}")
         print(f"  - 颜色主题: {game_config.get('colors.theme', 'default')}")
         
+        # 配置快照：属性访问与点号路径一致，不可修改，set之后重新发布
+        snapshot = game_config.snapshot
+        assert snapshot.window.width == width and snapshot.performance.fps == fps
+        assert snapshot.colors.theme == game_config.get('colors.theme', 'default')
+        try:
+            snapshot.visual.enable_trail = False
+            raise AssertionError("配置快照应当不可修改")
+        except AttributeError:
+            pass
+        game_config.set("visual.star_count", snapshot.visual.star_count + 1)
+        assert game_config.snapshot is not snapshot
+        assert game_config.snapshot.visual.star_count == snapshot.visual.star_count + 1
+        game_config.set("visual.star_count", snapshot.visual.star_count)
+        
         # 测试配置保存
         game_config.save_config()
+        
+        # 延迟写盘：连续修改合并为一次写入，flush后落盘且不留下临时文件
+        import json
+        import os
+        import tempfile
+        from config import GameConfig
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, "config.json")
+            config = GameConfig(config_file)
+            for volume in (0.1, 0.2, 0.3):
+                config.set("audio.master_volume", volume)
+            with open(config_file, encoding='utf-8') as f:
+                assert json.load(f)["audio"]["master_volume"] == 0.7
+            config.flush()
+            with open(config_file, encoding='utf-8') as f:
+                assert json.load(f)["audio"]["master_volume"] == 0.3
+            assert os.listdir(temp_dir) == ["config.json"]
+            assert GameConfig(config_file).get("audio.master_volume") == 0.3
+            
+            # 热重载：外部修改配置文件后通知订阅者，绑定方法以弱引用保存
+            import gc
+            class Listener:
+                def __init__(self):
+                    self.changes = []
+                def on_change(self, changes):
+                    self.changes.append(changes)
+            listener = Listener()
+            received = []
+            config.subscribe("ai", listener.on_change)
+            config.subscribe("", received.append)
+            assert not config.check_for_changes(force=True)
+            with open(config_file, encoding='utf-8') as f:
+                data = json.load(f)
+            data["ai"]["algorithm"] = "greedy"
+            data["audio"]["sfx_volume"] = 0.25
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            stat = os.stat(config_file)
+            os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            assert config.check_for_changes(force=True)
+            assert listener.changes == [{"ai.algorithm": "greedy"}]
+            assert received[-1] == {"ai.algorithm": "greedy", "audio.sfx_volume": 0.25}
+            assert config.snapshot.ai.algorithm == "greedy"
+            
+            # set() 同样通知；对象回收后不再回调
+            config.set("ai.algorithm", "astar")
+            assert listener.changes[-1] == {"ai.algorithm": "astar"}
+            del listener
+            gc.collect()
+            config.set("ai.algorithm", "greedy")
+            assert received[-1] == {"ai.algorithm": "greedy"}
+            assert len(config._subscribers) == 1
+            config.flush()
         print("  ✅ 配置系统测试通过")
         return True
         
@@ -70,12 +141,11 @@ def test_game_creation():
     print("\n🎮 测试游戏创建...")
     
     try:
-        from snake_game import SnakeGame
+        from game_engine import SnakeEngine
         from ai_controller import AIController
         
-        # 创建游戏实例
-        game = SnakeGame(400, 400, 20)
-        print(f"  - 游戏窗口: {game.width}x{game.height}")
+        # 创建无界面游戏实例（不需要显示窗口）
+        game = SnakeEngine(20, 20)
         print(f"  - 网格大小: {game.grid_width}x{game.grid_height}")
         print(f"  - 蛇初始位置: {game.get_head_position()}")
         print(f"  - 食物位置: {game.food}")
@@ -94,14 +164,889 @@ def test_game_creation():
         
         print(f"  - 最终得分: {game.score}")
         print("  ✅ 游戏创建测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 游戏创建测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_headless_games():
+    """测试无界面批量对局"""
+    print("\n🤖 测试无界面批量对局...")
+    
+    try:
+        import time
+        from game_engine import SnakeEngine, Direction
+        from ai_controller import AIController
+        
+        game = SnakeEngine(10, 10)
+        ai = AIController(game)
+        ai.algorithm = "greedy"
+        
+        games = 200
+        start = time.time()
+        for _ in range(games):
+            game.reset()
+            while not game.game_over and game.move_count < 500:
+                game.move(ai.get_best_direction())
+            # 规则检查：蛇身不重叠且都在棋盘内
+            assert len(set(game.snake)) == len(game.snake)
+            assert all(0 <= x < 10 and 0 <= y < 10 for x, y in game.snake)
+            # 占用表与蛇身保持一致
+            assert sum(game._occupied) == len(game.snake)
+            assert all(game.is_occupied(pos) for pos in game.snake)
+            assert game.free_cell_count() + len(game.snake) == 100
+        elapsed = time.time() - start
+        
+        # 反向移动会被忽略
+        game.reset()
+        game.set_snake([(5, 5), (4, 5)])
+        game.direction = Direction.RIGHT
+        game.move(Direction.LEFT)
+        assert game.get_head_position() == (6, 5)
+        
+        # 填满棋盘时以胜利结束，且食物生成不会卡死
+        game = SnakeEngine(2, 2)
+        game.set_snake([(0, 1), (0, 0), (1, 0)])
+        game.direction = Direction.DOWN
+        game.food = (1, 1)
+        game.move(Direction.RIGHT)
+        assert game.won and game.game_over and game.food is None
+        assert game.free_cell_count() == 0
+        
+        print(f"  - {games}局用时: {elapsed:.2f}秒 ({games / max(elapsed, 1e-9):.0f} 局/秒)")
+        print("  ✅ 无界面批量对局测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 无界面批量对局测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_batch_env():
+    """测试批量环境与SnakeEngine规则一致"""
+    print("\n🧮 测试批量环境...")
+    
+    try:
+        import random
+        from batch_env import BatchSnakeEnv, DIRECTIONS
+        from game_engine import SnakeEngine
+        
+        num_envs = 64
+        env = BatchSnakeEnv(num_envs, 6, 5, seed=1)
+        engines = [SnakeEngine(6, 5) for _ in range(num_envs)]
+        
+        def sync_food(i):
+            # 食物随机生成方式不同，逐局同步批量环境的食物位置
+            engines[i].food = env.get_game_state(i)['food']
+        
+        for i in range(num_envs):
+            sync_food(i)
+        
+        for _ in range(300):
+            actions = [random.randrange(4) for _ in range(num_envs)]
+            alive = env.step(actions)
+            for i, engine in enumerate(engines):
+                assert engine.move(DIRECTIONS[actions[i]]) == bool(alive[i])
+                sync_food(i)
+                state = env.get_game_state(i)
+                expected = engine.get_game_state()
+                for key in ('snake', 'direction', 'score', 'game_over', 'won', 'move_count'):
+                    assert state[key] == expected[key], key
+            # 批量重置已结束的游戏
+            finished = env.done.copy()
+            env.reset(finished)
+            for i in range(num_envs):
+                if finished[i]:
+                    engines[i].reset()
+                    sync_food(i)
+        
+        print(f"  - {num_envs}局并行推进300步，与SnakeEngine逐步一致")
+        print("  ✅ 批量环境测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 批量环境测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_pathfinding():
+    """测试A*寻路返回合法的最短路径"""
+    print("\n🧭 测试A*寻路...")
+    
+    try:
+        import random
+        from collections import deque
+        from game_engine import SnakeEngine
+        from ai_controller import AIController
+        
+        width, height = 15, 12
+        ai = AIController(SnakeEngine(width, height))
+        rng = random.Random(7)
+        
+        def bfs_length(start, goal, obstacles):
+            queue = deque([(start, 1)])
+            seen = {start}
+            while queue:
+                (x, y), length = queue.popleft()
+                if (x, y) == goal:
+                    return length
+                for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+                    if (0 <= nx < width and 0 <= ny < height and
+                            (nx, ny) not in obstacles and (nx, ny) not in seen):
+                        seen.add((nx, ny))
+                        queue.append(((nx, ny), length + 1))
+            return None
+        
+        for _ in range(100):
+            obstacles = {(rng.randrange(width), rng.randrange(height)) for _ in range(40)}
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            obstacles -= {start, goal}
+            path = ai.a_star_pathfinding(start, goal, obstacles)
+            expected = bfs_length(start, goal, obstacles)
+            if expected is None:
+                assert path is None
+                continue
+            assert len(path) == expected
+            assert path[0] == start and path[-1] == goal
+            for a, b in zip(path, path[1:]):
+                assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+                assert b not in obstacles
+        
+        # 路径缓存：跟随缓存路径时不会撞上蛇身
+        game = SnakeEngine(width, height)
+        ai = AIController(game)
+        ai.algorithm = "astar"
+        for _ in range(5):
+            game.reset()
+            while not game.game_over and game.move_count < 500:
+                direction = ai.get_best_direction()
+                assert game.is_valid_position(game.get_next_position(direction)) or not ai.get_safe_directions()
+                game.move(direction)
+        stats = ai.get_cache_stats()
+        assert stats["plan_cache_hits"] > 0
+        print(f"  - 路径缓存命中率: {stats['hit_rate']:.0%}")
+        
+        # 虚拟蛇检查与逐步模拟的结果一致
+        from game_engine import Direction
+        deltas = {direction.value: direction for direction in Direction}
+        checked = unsafe = 0
+        game.reset()
+        while not game.game_over and game.move_count < 3000:
+            head_x, head_y = game.get_head_position()
+            path = ai.food_path(head_y * width + head_x, ai._plan_obstacles())
+            if path and len(path) > 1:
+                virtual = SnakeEngine.from_state(game.get_game_state())
+                for a, b in zip(path, path[1:]):
+                    virtual.move(deltas[(b % width - a % width, b // width - a // width)])
+                assert virtual.score == game.score + 1 and not virtual.game_over or virtual.won
+                if not virtual.won:
+                    new_head = path[-1]
+                    new_tail_x, new_tail_y = virtual.snake[-1]
+                    new_tail = new_tail_y * width + new_tail_x
+                    reachable = {new_head}
+                    queue = deque([new_head])
+                    found = False
+                    while queue and not found:
+                        cell = queue.popleft()
+                        for direction in Direction:
+                            x, y = cell % width + direction.value[0], cell // width + direction.value[1]
+                            if not (0 <= x < width and 0 <= y < height):
+                                continue
+                            neighbor = y * width + x
+                            if neighbor == new_tail and cell != new_head:
+                                found = True
+                                break
+                            if neighbor not in reachable and not virtual.get_occupancy()[neighbor]:
+                                reachable.add(neighbor)
+                                queue.append(neighbor)
+                    assert ai.virtual_snake_is_safe(path) == found
+                    checked += 1
+                    unsafe += not found
+            game.move(ai.get_best_direction())
+        print(f"  - 虚拟蛇检查: {checked}条路径，其中{unsafe}条不安全")
+        print("  ✅ A*寻路测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ A*寻路测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_food_field():
+    """测试食物距离场的增量更新始终是真实距离的下界"""
+    print("\n🗺️  测试食物距离场...")
+    
+    try:
+        import random
+        from collections import deque
+        from game_engine import SnakeEngine, neighbor_table
+        from ai_controller import AIController
+        
+        def bfs_field(game):
+            width = game.grid_width
+            cell_count = width * game.grid_height
+            blocked = bytearray(game.get_occupancy())
+            tail_x, tail_y = game.snake[-1]
+            blocked[tail_y * width + tail_x] = 0
+            food = game.food[1] * width + game.food[0]
+            field = [cell_count] * cell_count
+            field[food] = 0
+            queue = deque([food])
+            neighbors = neighbor_table(width, game.grid_height)
+            while queue:
+                current = queue.popleft()
+                for neighbor in neighbors[current]:
+                    if not blocked[neighbor] and field[neighbor] > field[current] + 1:
+                        field[neighbor] = field[current] + 1
+                        queue.append(neighbor)
+            return field, blocked
+        
+        random.seed(3)
+        game = SnakeEngine(12, 9)
+        ai = AIController(game)
+        ai.algorithm = "astar"
+        checks = 0
+        while not game.game_over and game.move_count < 1000:
+            field = game.food_distance_field()
+            expected, blocked = bfs_field(game)
+            cell_count = len(expected)
+            for cell in range(cell_count):
+                if blocked[cell]:
+                    continue
+                # 下界；距离场里到不了的格子一定到不了
+                assert field[cell] <= expected[cell]
+                assert field[cell] < cell_count or expected[cell] == cell_count
+            checks += 1
+            
+            # 沿距离场下降得到的路径是最短路径
+            head_x, head_y = game.get_head_position()
+            path = ai.food_path(head_y * game.grid_width + head_x, blocked)
+            if path is not None:
+                assert len(path) - 1 == min(expected[cell] for cell in neighbor_table(12, 9)[path[0]]
+                                            if not blocked[cell]) + 1
+            game.move(ai.get_best_direction())
+        
+        # 食物直接改变位置时重新计算
+        game.food = game.generate_food() if not game.game_over else None
+        if game.food is not None:
+            assert list(game.food_distance_field()) == bfs_field(game)[0]
+        print(f"  - 检查了{checks}步，得分{game.score}")
+        print("  ✅ 食物距离场测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 食物距离场测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_async_planner():
+    """测试后台线程AI的截止时间和超时回退"""
+    print("\n⏱️  测试后台规划...")
+    
+    try:
+        from game_engine import SnakeEngine, Direction
+        from ai_controller import AsyncAIController
+        
+        # 快照可以还原出相同的引擎状态
+        game = SnakeEngine(10, 10)
+        game.set_snake([(3, 3), (2, 3), (1, 3)])
+        copy = SnakeEngine.from_state(game.get_game_state())
+        assert list(copy.snake) == list(game.snake) and copy.food == game.food
+        assert copy.is_occupied((2, 3)) and copy.free_cell_count() == game.free_cell_count()
+        
+        # 步数随快照恢复；只有恰好走了一步的快照才让状态版本号连续
+        game.move(Direction.RIGHT)
+        version = copy.state_version
+        copy.load_state(game.get_game_state())
+        assert copy.move_count == game.move_count == 1
+        assert copy.state_version == version + 1
+        game.move(Direction.RIGHT)
+        game.move(Direction.DOWN)
+        version = copy.state_version
+        copy.load_state(game.get_game_state())
+        assert copy.move_count == 3 and copy.state_version == version + 2
+        
+        # 宽松的截止时间：正常对局
+        game = SnakeEngine(10, 10)
+        ai = AsyncAIController(game, deadline_ms=1000)
+        for _ in range(300):
+            if game.game_over:
+                break
+            game.move(ai.get_best_direction())
+        assert ai.decisions > 0
+        assert ai._worker_engine.move_count == game.move_count - 1 or game.game_over
+        print(f"  - 宽松截止时间: 得分{game.score}, 超时{ai.deadline_misses}次")
+        ai.close()
+        
+        # 截止时间为0：几乎每步都超时，回退方向仍然不会撞墙或撞到自己
+        game = SnakeEngine(10, 10)
+        ai = AsyncAIController(game, deadline_ms=0)
+        for _ in range(50):
+            if game.game_over:
+                break
+            direction = ai.get_best_direction()
+            assert isinstance(direction, Direction)
+            assert game.is_valid_position(game.get_next_position(direction)) or not game.get_possible_moves()
+            game.move(direction)
+        assert ai.deadline_misses > 0
+        print(f"  - 零截止时间: 移动{game.move_count}步, 超时{ai.deadline_misses}次")
+        ai.close()
+        
+        # 超时回退：只沿食物未变、不撞蛇身的旧路径前进
+        game = SnakeEngine(10, 10)
+        game.set_snake([(3, 3), (2, 3), (1, 3), (1, 4), (1, 5)])
+        game.food = (6, 3)
+        game.direction = Direction.RIGHT
+        ai = AsyncAIController(game, deadline_ms=0)
+        ai._fallback_plan.extend([3 * 10 + 4, 3 * 10 + 5, 3 * 10 + 6])
+        ai._fallback_food = (6, 3)
+        assert ai._miss() == Direction.RIGHT and list(ai._fallback_plan) == [34, 35, 36]
+        ai._fallback_food = (8, 8)
+        ai._miss()
+        assert not ai._fallback_plan
+        ai._fallback_plan.extend([4 * 10 + 3, 4 * 10 + 2, 3 * 10 + 2])
+        ai._fallback_food = game.food
+        ai._miss()
+        assert not ai._fallback_plan
+        ai.close()
+        
+        # 配置变化只记录下来，由工作线程在下一次决策前应用到它的AI上
+        game = SnakeEngine(10, 10)
+        ai = AsyncAIController(game, deadline_ms=1000)
+        game.move(ai.get_best_direction())
+        worker_plan = ai._worker_ai._plan
+        from config import game_config
+        assert all(getattr(reference(), '__self__', None) is not ai._worker_ai
+                   for _, reference in game_config._subscribers)
+        ai.on_config_changed({"ai.think_time": 0.0, "ai.lookahead_table_size": 1024})
+        ai._worker_ai._lookahead = object()
+        assert ai._config_changes and ai._worker_ai._lookahead is not None
+        game.move(ai.get_best_direction())
+        assert not ai._config_changes and ai._worker_ai._lookahead is None
+        assert ai._worker_ai._plan is worker_plan
+        ai.close()
+        
+        print("  ✅ 后台规划测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 后台规划测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_reachable_area():
+    """测试可达空间计算与逐方向BFS结果一致"""
+    print("\n🌊 测试可达空间计算...")
+    
+    try:
+        from collections import deque
+        from game_engine import SnakeEngine, Direction
+        from ai_controller import AIController
+        
+        def reference_area(game, direction):
+            next_pos = game.get_next_position(direction)
+            if not game.is_valid_position(next_pos):
+                return 0
+            visited = set(game.snake)
+            if next_pos != game.food:
+                visited.discard(game.snake[-1])
+            visited.add(next_pos)
+            queue = deque([next_pos])
+            count = 0
+            while queue:
+                x, y = queue.popleft()
+                for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+                    if (0 <= nx < game.grid_width and 0 <= ny < game.grid_height and
+                            (nx, ny) not in visited):
+                        visited.add((nx, ny))
+                        queue.append((nx, ny))
+                        count += 1
+            return count
+        
+        game = SnakeEngine(12, 10)
+        ai = AIController(game)
+        ai.algorithm = "greedy"
+        checked = 0
+        for _ in range(30):
+            game.reset()
+            while not game.game_over and game.move_count < 300:
+                for direction in Direction:
+                    assert ai.simulate_move(direction) == reference_area(game, direction)
+                    checked += 1
+                game.move(ai.get_best_direction())
+        
+        print(f"  - 校验了 {checked} 个方向")
+        print("  ✅ 可达空间测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 可达空间测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_hamiltonian():
+    """测试哈密顿回路策略能填满棋盘"""
+    print("\n🔁 测试哈密顿回路策略...")
+    
+    try:
+        from game_engine import SnakeEngine
+        from ai_controller import AIController, hamiltonian_cycle
+        
+        for width, height in [(6, 6), (5, 6), (8, 5)]:
+            # 回路经过每个格子一次，相邻序号的格子在网格上相邻
+            order = hamiltonian_cycle(width, height)
+            cells = sorted(range(width * height), key=lambda cell: order[cell])
+            for a, b in zip(cells, cells[1:] + cells[:1]):
+                assert abs(a % width - b % width) + abs(a // width - b // width) == 1
+            
+            game = SnakeEngine(width, height)
+            ai = AIController(game)
+            ai.algorithm = "hamiltonian"
+            for _ in range(5):
+                game.reset()
+                while not game.game_over:
+                    game.move(ai.get_best_direction())
+                assert game.won, (width, height, game.score)
+            print(f"  - {width}x{height}: 5局全部填满棋盘")
+        
+        assert hamiltonian_cycle(5, 5) is None
+        print("  ✅ 哈密顿回路策略测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 哈密顿回路策略测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_lookahead():
+    """测试前瞻搜索的可撤销状态和对局表现"""
+    print("\n🔭 测试前瞻搜索策略...")
+    
+    try:
+        import random
+        from game_engine import SnakeEngine
+        from ai_controller import AIController, neighbor_table
+        from ai_search import LookaheadSearch
+        
+        # do/undo 之后占用表、蛇身、食物和局面哈希都恢复原样
+        game = SnakeEngine(8, 8)
+        game.set_snake([(3, 3), (2, 3), (1, 3), (1, 4)])
+        game.food = (4, 3)
+        search = LookaheadSearch(8, 8, neighbor_table(8, 8), seed=1)
+        search._load(game)
+        before = (bytes(search._occupied), list(search._body), search._food, search._hash,
+                  [search._entered[cell] for cell in search._body])
+        rng = random.Random(5)
+        for _ in range(200):
+            undo_stack = []
+            for _ in range(rng.randint(1, 6)):
+                moves = search._ordered_moves(0)
+                if not moves:
+                    break
+                cell = rng.choice(moves)
+                undo_stack.append((cell, search._do(cell)))
+                assert search._hash == search._compute_hash()
+            for cell, (_, tail, stamp) in reversed(undo_stack):
+                search._undo(cell, tail, stamp)
+            assert (bytes(search._occupied), list(search._body), search._food, search._hash,
+                    [search._entered[cell] for cell in search._body]) == before
+        
+        # 覆盖相同格子、蛇头相同但顺序不同的两条蛇，局面哈希不同
+        hashes = set()
+        for snake in ([(0, 0), (1, 0), (1, 1), (0, 1), (0, 2), (1, 2)],
+                      [(0, 0), (1, 0), (1, 1), (1, 2), (0, 2), (0, 1)]):
+            game.set_snake([(x + 3, y + 3) for x, y in snake])
+            game.food = (7, 7)
+            search._load(game)
+            hashes.add(search._hash)
+        assert len(hashes) == 2
+        
+        # 长蛇每个节点的洪水填充都很慢，每个节点都检查截止时间：预算为0时
+        # 第一个节点就超时，不会先搜完一批节点
+        game = SnakeEngine(40, 40)
+        game.set_snake([(x if y % 2 == 0 else 39 - x, y) for y in range(30, -1, -1) for x in range(40)])
+        game.food = (0, 35)
+        search = LookaheadSearch(40, 40, neighbor_table(40, 40), seed=1)
+        assert search.search(game, 0.0) is None
+        assert search.nodes == 1 and search.completed_depth == 0, (search.nodes, search.completed_depth)
+        assert search.search(game, 1.0, max_depth=1) is not None and search.completed_depth == 1
+
+        # 小预算下对局：每步都在时间预算内给出方向
+        game = SnakeEngine(8, 8)
+        ai = AIController(game)
+        ai.algorithm = "lookahead"
+        while not game.game_over and game.move_count < 300:
+            game.move(ai.get_best_direction())
+        assert game.score >= 10, game.score
+        print(f"  - 8x8: 得分{game.score}, 最后一步搜索深度{ai._lookahead.completed_depth}")
+        
+        print("  ✅ 前瞻搜索策略测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 前瞻搜索策略测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_rollout():
+    """测试蒙特卡洛推演的局面编码、本进程推演和进程池推演"""
+    print("\n🎲 测试蒙特卡洛推演策略...")
+    
+    try:
+        from game_engine import SnakeEngine
+        from ai_controller import AIController
+        from ai_rollout import encode_state, decode_state, evaluate_moves, resolve_workers, AUTO_WORKER_LIMIT
+        
+        # 局面编码往返不变
+        game = SnakeEngine(8, 8)
+        game.set_snake([(3, 3), (2, 3), (1, 3), (1, 4)])
+        game.food = (4, 3)
+        width, height, food, body = decode_state(encode_state(game))
+        assert (width, height, food) == (8, 8, 3 * 8 + 4)
+        assert [(cell % width, cell // width) for cell in body] == list(game.snake)
+        
+        # 第一步吃到食物的方向每局得1分；每个工作进程各推演24局，样本数随进程数增长
+        state = encode_state(game)
+        for workers in (1, 2):
+            right, up = evaluate_moves(state, [3 * 8 + 4, 2 * 8 + 3], 24, 1, workers)
+            assert right == 24.0 * workers and up == 0.0, (workers, right, up)
+        
+        # 自动的工作进程数有上限；超时只统计按时完成的进程，都没完成时返回None
+        assert 1 <= resolve_workers(0) <= AUTO_WORKER_LIMIT and resolve_workers(3) == 3
+        assert evaluate_moves(state, [3 * 8 + 4, 2 * 8 + 3], 24, 1, 2, timeout=0.0) is None
+        right, up = evaluate_moves(state, [3 * 8 + 4, 2 * 8 + 3], 24, 1, 2, timeout=60.0)
+        assert right == 48.0 and up == 0.0, (right, up)
+        
+        # 本进程推演对局：使用临时配置，不改动全局配置和 game_config.json
+        import os
+        import tempfile
+        import ai_controller
+        from config import GameConfig
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = GameConfig(os.path.join(temp_dir, "config.json"))
+            config.set("ai.rollout_workers", 1)
+            global_config = ai_controller.game_config
+            ai_controller.game_config = config
+            try:
+                game = SnakeEngine(8, 8)
+                ai = AIController(game)
+                ai.algorithm = "rollout"
+                while not game.game_over and game.move_count < 200:
+                    game.move(ai.get_best_direction())
+            finally:
+                ai_controller.game_config = global_config
+                config.flush()
+        assert game.score >= 5, game.score
+        print(f"  - 8x8: 得分{game.score}")
+        
+        print("  ✅ 蒙特卡洛推演策略测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 蒙特卡洛推演策略测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_particles():
+    """测试粒子池的数量上限和寿命回收"""
+    print("\n🎆 测试粒子系统...")
+    
+    try:
+        from particle_system import ParticleSystem
+        
+        particles = ParticleSystem(limit=50)
+        emitted = particles.emit(100, 100, 80, [(255, 0, 0), (255, 215, 0)],
+                                 speed=(50, 150), lifetime=(0.5, 1.0))
+        assert emitted == 50 and len(particles) == 50
+        assert particles.emit(100, 100, 10, [(255, 0, 0)], speed=(1, 2), lifetime=(1, 2)) == 0
+        
+        # 粒子按寿命逐步回收
+        particles.update(0.75)
+        assert 0 <= len(particles) < 50
+        assert (particles.lifetime[:len(particles)] > 0).all()
+        particles.update(1.0)
+        assert len(particles) == 0
+        
+        print("  ✅ 粒子系统测试通过")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ 粒子系统测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_trail():
+    """测试轨迹环形缓冲区的容量上限、年龄分档和过期清理"""
+    print("\n🌠 测试轨迹效果...")
+
+    try:
+        import os
+        import time
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        from snake_game import SnakeGame, TRAIL_CAPACITY, TRAIL_LIFETIME
+
+        game = SnakeGame(400, 300, 20)
+        game.trail_positions.clear()
+
+        # 超过容量：只保留最新的TRAIL_CAPACITY条，最旧的从左端挤出
+        # 相邻两条相差 TRAIL_LIFETIME/32 秒，最新的32条未过期；年龄取半步避开分档边界
+        overflow = 16
+        count = TRAIL_CAPACITY + overflow
+        step = TRAIL_LIFETIME / 32
+        now = time.time()
+        entries = [((i % 20, i // 20), now - (count - 1 - i + 0.5) * step) for i in range(count)]
+        for entry in entries:
+            game.trail_positions.append(entry)
+        assert list(game.trail_positions) == entries[overflow:]
+
+        # 按年龄选择透明度分档：最新的用第0档，每4条升一档，过期的不绘制
+        game.frame_time = now
+        tiles = game.get_trail_tiles()
+        blits = game.get_trail_blits()
+        alive = entries[-32:]
+        assert [position for _, position in blits] == [(x * 20 + 2, y * 20 + 2) for (x, y), _ in alive]
+        assert [tiles.index(tile) for tile, _ in blits] == [(31 - k) // 4 for k in range(32)]
+
+        # 过期清理：只从左端弹出已过期的条目，剩下的都在寿命之内
+        game.update_visual_effects(0.0)
+        remaining = list(game.trail_positions)
+        assert remaining == [entry for entry in entries[overflow:] if game.frame_time - entry[1] < TRAIL_LIFETIME]
+        assert 0 < len(remaining) <= 32 and len(game.get_trail_blits()) == len(remaining)
+
+        print(f"  - 容量{TRAIL_CAPACITY}, 推入{count}条, 清理后剩余{len(remaining)}条")
+        print("  ✅ 轨迹效果测试通过")
+        return True
+
+    except Exception as e:
+        print(f"  ❌ 轨迹效果测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_render_cache():
+    """测试LRU渲染缓存的命中和淘汰"""
+    print("\n🗂️  测试渲染缓存...")
+    
+    try:
+        from render_cache import LRUCache
         
-        # 清理pygame
+        cache = LRUCache(maxsize=2)
+        assert cache.get('a', lambda: 1) == 1
+        assert cache.get('b', lambda: 2) == 2
+        assert cache.get('a', lambda: 0) == 1  # 命中，'a'变为最近使用
+        cache.get('c', lambda: 3)              # 淘汰最久未使用的'b'
+        assert 'a' in cache and 'c' in cache and 'b' not in cache
+        assert len(cache) == 2 and cache.hits == 1 and cache.misses == 3
+        
+        # 文字缓存：相同的 (字体, 文本, 颜色) 复用同一个Surface
         import pygame
-        pygame.quit()
+        from render_cache import TextCache
+        pygame.font.init()
+        font = pygame.font.Font(None, 24)
+        texts = TextCache(maxsize=8)
+        first = texts.render(font, "Score: 1", (255, 255, 255))
+        assert texts.render(font, "Score: 1", (255, 255, 255)) is first
+        assert texts.render(font, "Score: 2", (255, 255, 255)) is not first
+        assert texts.hits == 1 and texts.misses == 2
+        
+        # 分数动画：染色结果与直接用该颜色渲染一致，并且不往共享文字缓存里塞新条目
+        import os
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        from snake_game import SnakeGame
+        from render_cache import text_cache
+        from config import get_text
+        game = SnakeGame(400, 300, 20)
+        game.get_ui_blits()
+        cached = len(text_cache)
+        for step in range(1, 50):
+            game.score_animation = step / 50
+            score_text = game.get_ui_blits()[0][0]
+            assert len(text_cache) == cached
+        fade = int(255 * (1 - game.score_animation))
+        expected = game.font.render(f"{get_text('score')}: {game.score}", True, (255, fade, fade))
+        assert pygame.image.tobytes(score_text, "RGBA") == pygame.image.tobytes(expected, "RGBA")
+        
+        print("  ✅ 渲染缓存测试通过")
         return True
         
     except Exception as e:
-        print(f"  ❌ 游戏创建测试失败: {e}")
+        print(f"  ❌ 渲染缓存测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_background_layer():
+    """测试背景层缓存在窗口尺寸、主题和视觉配置变化后重建"""
+    print("\n🖼️  测试背景层缓存...")
+
+    try:
+        import os
+        import tempfile
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import snake_game
+        from snake_game import SnakeGame
+        from config import GameConfig
+
+        game = SnakeGame(400, 300, 20)
+        layer = game.get_background_layer()
+        assert game.get_background_layer() is layer
+
+        # 窗口尺寸和格子大小变化：按新尺寸重新绘制
+        game.width, game.height = 320, 240
+        resized = game.get_background_layer()
+        assert resized is not layer and resized.get_size() == (320, 240)
+        game.cell_size = 16
+        regridded = game.get_background_layer()
+        assert regridded is not resized
+        assert regridded.get_at((16, 8)) == game.DARK_GRAY and resized.get_at((16, 8)) != game.DARK_GRAY
+
+        # 主题和其他视觉配置变化：使用临时配置，不改动全局配置和 game_config.json
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = GameConfig(os.path.join(temp_dir, "config.json"))
+            config.set("colors.theme", "dark")
+            global_config = snake_game.game_config
+            snake_game.game_config = config
+            try:
+                game._force_full_redraw = False
+                game.on_config_changed({"colors.theme": "dark"})
+                assert game.theme_name == "dark" and game._force_full_redraw
+                themed = game.get_background_layer()
+                assert themed is not regridded
+                assert game.get_background_layer() is themed
+                game.on_config_changed({"visual.enable_glow": False})
+                assert game.get_background_layer() is not themed
+            finally:
+                snake_game.game_config = global_config
+                config.flush()
+
+        print("  ✅ 背景层缓存测试通过")
+        return True
+
+    except Exception as e:
+        print(f"  ❌ 背景层缓存测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_interpolation():
+    """测试蛇头蛇尾的插值位置和固定步长的单帧步数上限"""
+    print("\n⏱️  测试插值和固定步长...")
+
+    try:
+        import os
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        from snake_game import SnakeGame
+        from game_engine import Direction
+        from main import run_fixed_steps
+
+        # 普通移动：蛇头从(5,5)滑向(6,5)，蛇尾从(3,5)滑向(4,5)
+        game = SnakeGame(400, 300, 20)
+        game.engine.set_snake([(5, 5), (4, 5), (3, 5)])
+        game.engine.food = (0, 0)
+        game.engine.direction = Direction.RIGHT
+        game.move(Direction.RIGHT)
+        expected = {
+            0.0: ((2, 3.0, 5.0), (0, 5.0, 5.0)),
+            0.5: ((2, 3.5, 5.0), (0, 5.5, 5.0)),
+            1.0: (None, (0, 6.0, 5.0)),
+        }
+        for interpolation, pieces in expected.items():
+            game.interpolation = interpolation
+            assert game.get_moving_pieces() == pieces, (interpolation, game.get_moving_pieces())
+
+        # 吃到食物：蛇尾不动，只有蛇头插值
+        game.engine.food = (7, 5)
+        game.move(Direction.RIGHT)
+        game.interpolation = 0.5
+        assert game.get_moving_pieces() == (None, (0, 6.5, 5.0)), game.get_moving_pieces()
+
+        # 固定步长：剩余时间留给下一帧，超过单帧上限或游戏结束时丢弃积压
+        calls = []
+        def step():
+            calls.append(1)
+            return True
+        accumulator, steps = run_fixed_steps(0.35, 0.1, 50, step)
+        assert steps == 3 and len(calls) == 3 and abs(accumulator - 0.05) < 1e-9
+        accumulator, steps = run_fixed_steps(10.0, 0.1, 5, step)
+        assert steps == 5 and accumulator == 0.0
+        def step_until_game_over():
+            calls.append(1)
+            return len(calls) < 2
+        calls.clear()
+        accumulator, steps = run_fixed_steps(10.0, 0.1, 50, step_until_game_over)
+        assert steps == 2 and accumulator == 0.0
+        accumulator, steps = run_fixed_steps(0.05, 0.1, 50, step)
+        assert steps == 0 and accumulator == 0.05
+
+        print("  ✅ 插值和固定步长测试通过")
+        return True
+
+    except Exception as e:
+        print(f"  ❌ 插值和固定步长测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+def test_dirty_render():
+    """测试脏矩形模式的每一帧与整屏重绘逐像素一致"""
+    print("\n🧩 测试脏矩形渲染...")
+
+    try:
+        import os
+        import random
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import pygame
+        from snake_game import SnakeGame
+        from ai_controller import AIController
+
+        random.seed(3)
+        game = SnakeGame(400, 300, 20)
+        game.render_mode = "dirty"
+        ai = AIController(game)
+        # 记录每个脏矩形帧提交的矩形数量
+        submitted = []
+        update = pygame.display.update
+        pygame.display.update = lambda rects: submitted.append(len(rects))
+        try:
+            for _ in range(120):
+                if game.game_over:
+                    break
+                game.move(ai.get_best_direction())
+                # 粒子帧整屏重绘，清掉粒子以覆盖脏矩形路径
+                game.particles.clear()
+                for interpolation in (0.0, 0.5, 1.0):
+                    game.draw(interpolation)
+                    dirty = game.screen.copy()
+                    game.draw_full()
+                    assert pygame.image.tobytes(dirty, "RGB") == pygame.image.tobytes(game.screen, "RGB")
+        finally:
+            pygame.display.update = update
+
+        # 蛇身颜色按段固定：中间的蛇身不在脏区域里，矩形数量不随蛇长增长
+        max_rects = max(submitted) - len(game.background_stars)
+        assert len(submitted) > 100 and len(game.snake) > 5
+        assert max_rects < 30, max_rects
+        print(f"  - 蛇长{len(game.snake)}, 脏矩形帧{len(submitted)}, 除星星外最多{max_rects}个矩形")
+
+        # 整屏模式保持原来从蛇头到蛇尾按比例过渡的渐变色
+        game.render_mode = "full"
+        game.draw_full()
+        for index in (1, len(game.snake) // 2, len(game.snake) - 1):
+            x, y = game.snake[index]
+            ratio = index / len(game.snake)
+            expected = (int(100 * ratio), int(200 - 100 * ratio), int(50 + 100 * ratio))
+            center = (x * 20 + 10, y * 20 + 10)
+            assert tuple(game.screen.get_at(center))[:3] == expected, (index, game.screen.get_at(center))
+
+        print("  ✅ 脏矩形渲染测试通过")
+        return True
+
+    except Exception as e:
+        print(f"  ❌ 脏矩形渲染测试失败: {e}")
         traceback.print_exc()
         return False
 
@@ -149,11 +1094,93 @@ def test_stats():
         print(f"  - 本次会话游戏: {session['games_played']}")
         print(f"  - 本次会话最佳: {session['best_score']}")
         
+        # 追加日志：每局只追加一行，重启后快照 + 日志重放得到相同的统计
+        import json
+        import os
+        import tempfile
+        from game_stats import GameStats
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats_file = os.path.join(temp_dir, "stats.json")
+            stats = GameStats(stats_file)
+            stats.compact_every = 5
+            for score in (3, 12, 7):
+                stats.start_game()
+                stats.end_game(score, score + 1)
+            assert not os.path.exists(stats_file)
+            assert len(stats.read_log()) == 3
+            replayed = GameStats(stats_file).get_all_time_stats()
+            assert replayed == stats.get_all_time_stats()
+            assert replayed["total_games"] == 3 and replayed["highest_score"] == 12
+            assert "score_10" in replayed["achievements"]
+            
+            # 写了一半的日志行被跳过
+            with open(stats.log_file, 'a', encoding='utf-8') as f:
+                f.write('{"seq": 4, "type": "ga')
+            assert GameStats(stats_file).get_all_time_stats() == replayed
+            
+            # 累积到 compact_every 条后压缩进快照并清空日志
+            stats = GameStats(stats_file)
+            stats.compact_every = 5
+            for score in (1, 2):
+                stats.start_game()
+                stats.end_game(score, score + 1)
+            assert stats.read_log() == []
+            with open(stats_file, encoding='utf-8') as f:
+                assert json.load(f)["last_seq"] == 5
+            assert GameStats(stats_file).get_all_time_stats()["total_games"] == 5
+            
+            stats.reset_stats()
+            assert GameStats(stats_file).get_all_time_stats()["total_games"] == 0
+
+        # SQLite后端：不截断历史，查询结果与JSON后端一致
+        from game_stats import SQLiteGameStats, SCORE_HISTORY_LIMIT
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_file = os.path.join(temp_dir, "stats.db")
+            json_stats = GameStats(os.path.join(temp_dir, "stats.json"))
+            stats = SQLiteGameStats(db_file)
+            assert stats.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert not hasattr(stats, "stats_file") and not hasattr(stats, "log_file")
+            for score in (3, 12, 7, 12, 0):
+                for backend in (stats, json_stats):
+                    backend.start_game()
+                    backend.end_game(score, score + 1)
+            expected = json_stats.get_all_time_stats()
+            actual = stats.get_all_time_stats()
+            for key in ("total_games", "total_score", "highest_score", "average_score",
+                        "achievements", "games_by_date"):
+                assert actual[key] == expected[key], key
+            assert [r["score"] for r in stats.get_recent_scores(3)] == [7, 12, 0]
+            assert [r["score"] for r in stats.get_best_scores(3)] == [12, 12, 7]
+            for percentile in (0, 25, 50, 100):
+                assert stats.get_score_percentile(percentile) == json_stats.get_score_percentile(percentile)
+            assert stats.get_daily_stats() == json_stats.get_daily_stats()
+            assert stats.get_daily_stats("2000-01-01")["games"] == 0
+            stats.close()
+
+            # 重新打开后汇总一致，历史超过 SCORE_HISTORY_LIMIT 也不截断
+            stats = SQLiteGameStats(db_file)
+            assert stats.get_all_time_stats()["achievements"] == expected["achievements"]
+            for _ in range(SCORE_HISTORY_LIMIT):
+                stats.append_record({"type": "game", "score": 1, "length": 2, "duration": 1.0,
+                                     "moves": 10, "timestamp": "2000-01-01T00:00:00"})
+            assert stats.get_all_time_stats()["total_games"] == SCORE_HISTORY_LIMIT + 5
+            assert stats.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0] == SCORE_HISTORY_LIMIT + 5
+            assert stats.get_best_scores(1)[0]["score"] == 12
+            assert stats.get_daily_stats("2000-01-01")["games"] == SCORE_HISTORY_LIMIT
+
+            stats.reset_stats()
+            stats.close()
+            stats = SQLiteGameStats(db_file)
+            assert stats.get_all_time_stats()["total_games"] == 0
+            assert stats.get_best_scores() == []
+            stats.close()
+
         print("  ✅ 统计系统测试通过")
         return True
         
     except Exception as e:
         print(f"  ❌ 统计系统测试失败: {e}")
+        traceback.print_exc()
         return False
 
 def main():
@@ -165,6 +1192,21 @@ def main():
         ("模块导入", test_imports),
         ("配置系统", test_config),
         ("游戏创建", test_game_creation),
+        ("无界面对局", test_headless_games),
+        ("批量环境", test_batch_env),
+        ("A*寻路", test_pathfinding),
+        ("食物距离场", test_food_field),
+        ("后台规划", test_async_planner),
+        ("可达空间", test_reachable_area),
+        ("哈密顿回路", test_hamiltonian),
+        ("前瞻搜索", test_lookahead),
+        ("蒙特卡洛推演", test_rollout),
+        ("粒子系统", test_particles),
+        ("轨迹效果", test_trail),
+        ("渲染缓存", test_render_cache),
+        ("背景层缓存", test_background_layer),
+        ("插值和固定步长", test_interpolation),
+        ("脏矩形渲染", test_dirty_render),
         ("音效系统", test_audio),
         ("统计系统", test_stats)
     ]